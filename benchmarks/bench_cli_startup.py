@@ -0,0 +1,91 @@
+"""
+Benchmark: CLI startup time with lazy vs eager command imports.
+
+Each measurement is a fresh interpreter; the best of --repeat runs is
+reported. "eager" reproduces the old module-level imports of the CLI
+(pipeline, batch runner and report builder).
+
+With --budget-ms, the cumulative `-X importtime` of trialflow_agro.cli.main
+(best of --repeat) is checked against the budget and the script exits
+non-zero when it is exceeded. The test suite only checks that no heavy
+module is imported, as wall-clock budgets are machine dependent.
+
+Usage:
+    python benchmarks/bench_cli_startup.py --repeat 5
+    python benchmarks/bench_cli_startup.py --budget-ms 250
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import subprocess
+import sys
+import time
+
+CASES = {
+    "eager imports": (
+        "import trialflow_agro.batch, trialflow_agro.pipeline, "
+        "trialflow_agro.reporting.report_builder, trialflow_agro.cli.main"
+    ),
+    "cli import": "import trialflow_agro.cli.main",
+    "--help": (
+        "from trialflow_agro.cli.main import app\n"
+        "try:\n    app(['--help'])\nexcept SystemExit:\n    pass"
+    ),
+}
+
+
+def best_of(code: str, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True, capture_output=True)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def cli_import_us(repeat: int) -> int:
+    """Best cumulative import time of the CLI module, in microseconds."""
+    times = []
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", CASES["cli import"]],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        match = re.search(
+            r"import time:\s+\d+ \|\s+(\d+) \|\s*trialflow_agro\.cli\.main$",
+            proc.stderr,
+            re.MULTILINE,
+        )
+        times.append(int(match.group(1)))
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=None,
+        help="Fail if importing the CLI module takes longer than this.",
+    )
+    args = parser.parse_args()
+
+    baseline = best_of("pass", args.repeat)
+    print(f"interpreter startup : {baseline:8.3f} s")
+    for name, code in CASES.items():
+        print(f"{name:<20}: {best_of(code, args.repeat):8.3f} s")
+
+    if args.budget_ms is not None:
+        took_ms = cli_import_us(args.repeat) / 1000
+        print(f"cli import (importtime): {took_ms:.1f} ms, budget {args.budget_ms} ms")
+        if took_ms > args.budget_ms:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark: all-pairs product comparisons via one pivot + matrix products
+vs a nested loop over product pairs.
+
+Usage:
+    python benchmarks/bench_comparisons.py --fields 200000 --products 30
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import time
+
+import numpy as np
+import pandas as pd
+
+from trialflow_agro.inference.comparisons import PairedComparisons
+from trialflow_agro.inference.moments import compute_moments
+
+
+def make_frame(fields: int, products: int, per_field: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    field = np.repeat(np.arange(fields), per_field)
+    product = rng.integers(0, products, size=len(field))
+    return pd.DataFrame(
+        {
+            "field_id": field,
+            "year": 2024,
+            "product": pd.Categorical([f"P{p:02d}" for p in product]),
+            "yield": 60.0 + 0.1 * product + rng.normal(0, 5, size=len(field)),
+        }
+    )
+
+
+def loop_comparisons(df: pd.DataFrame) -> dict:
+    """One merge per product pair, as the baseline."""
+    cells = (
+        df.groupby(["field_id", "year", "product"], observed=True)["yield"]
+        .mean()
+        .reset_index()
+    )
+    by_product = {p: g.drop(columns="product") for p, g in cells.groupby("product")}
+    out = {}
+    for a, b in itertools.combinations(sorted(by_product), 2):
+        joined = by_product[a].merge(by_product[b], on=["field_id", "year"])
+        diff = joined["yield_x"] - joined["yield_y"]
+        if len(diff):
+            out[(a, b)] = (len(diff), diff.mean(), (diff > 0).mean())
+    return out
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fields", type=int, default=200_000)
+    parser.add_argument("--products", type=int, default=30)
+    parser.add_argument("--per-field", type=int, default=6)
+    args = parser.parse_args()
+
+    df = make_frame(args.fields, args.products, args.per_field)
+
+    loop, t_loop = timed(loop_comparisons, df)
+
+    def vectorized(df):
+        moments = compute_moments(df, ["field_id", "year", "product"])
+        return PairedComparisons().run_moments(moments)
+
+    fast, t_fast = timed(vectorized, df)
+    assert len(fast) == len(loop)
+
+    print(f"fields={args.fields} products={args.products} pairs={len(fast)}")
+    print(f"  per-pair merges : {t_loop:8.3f} s")
+    print(f"  single pivot    : {t_fast:8.3f} s")
+    print(f"  speedup         : {t_loop / t_fast:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
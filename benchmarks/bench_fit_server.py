@@ -0,0 +1,109 @@
+"""
+Benchmark: repeated small re-analyses via `fit` processes vs `serve`.
+
+Runs the same dataset with alternating `model.groups`, either as a fresh
+`trialflow-agro fit` process per config (interpreter startup, imports and
+parsing every time) or as POST /fit requests to an in-process FitServer
+with a warm dataset cache.
+
+Usage:
+    python benchmarks/bench_fit_server.py --rows 500000 --requests 6
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from trialflow_agro.server import FitClient, FitServer
+
+FIT_CODE = (
+    "import sys; from trialflow_agro.cli.main import app; app(['fit', sys.argv[1]])"
+)
+GROUPINGS = [["product"], ["product", "region"], ["field_id"]]
+
+
+def make_dataset(path: Path, rows: int, seed: int = 0) -> None:
+    rng = np.random.default_rng(seed)
+    fields = rng.integers(0, 2000, size=rows)
+    pd.DataFrame(
+        {
+            "field_id": [f"F{i}" for i in fields],
+            "farm_id": [f"Farm{i // 20}" for i in fields],
+            "region": [f"R{i // 400}" for i in fields],
+            "year": rng.choice([2022, 2023, 2024], size=rows),
+            "product": rng.choice(["A", "B", "C", "D"], size=rows),
+            "yield": rng.normal(60.0, 8.0, size=rows),
+        }
+    ).to_csv(path, index=False)
+
+
+def config(data: Path, out: Path, groups) -> dict:
+    return {
+        "data": {"path": str(data)},
+        "model": {"id": "bench", "groups": groups, "min_records_per_group": 1},
+        "output": {"directory": str(out), "save_intermediate": False},
+        "cache": {"enabled": False},
+    }
+
+
+def run_processes(tmp: Path, data: Path, requests: int) -> float:
+    start = time.perf_counter()
+    for i in range(requests):
+        path = tmp / f"config_{i}.yml"
+        cfg = config(data, tmp / f"out_{i}", GROUPINGS[i % len(GROUPINGS)])
+        path.write_text(yaml.safe_dump(cfg))
+        subprocess.run(
+            [sys.executable, "-c", FIT_CODE, str(path)],
+            check=True,
+            capture_output=True,
+        )
+    return time.perf_counter() - start
+
+
+def run_server(tmp: Path, data: Path, requests: int) -> float:
+    server = FitServer(port=0, workers=1)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    server.ready.wait()
+    client = FitClient(port=server.port)
+    try:
+        start = time.perf_counter()
+        for i in range(requests):
+            groups = GROUPINGS[i % len(GROUPINGS)]
+            client.fit(config(data, tmp / f"out_{i}", groups))
+        return time.perf_counter() - start
+    finally:
+        server.stop()
+        thread.join()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--requests", type=int, default=6)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp = Path(tmp_dir)
+        data = tmp / "trial.csv"
+        make_dataset(data, args.rows)
+        processes = run_processes(tmp, data, args.requests)
+        served = run_server(tmp, data, args.requests)
+
+    print(f"rows={args.rows:,} requests={args.requests}")
+    print(f"fit processes : {processes:8.2f} s ({processes / args.requests:.3f} s/fit)")
+    print(f"fit server    : {served:8.2f} s ({served / args.requests:.3f} s/fit)")
+
+
+if __name__ == "__main__":
+    main()
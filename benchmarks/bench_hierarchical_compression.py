@@ -0,0 +1,101 @@
+"""
+Benchmark: hierarchical fit on raw rows vs per-cell sufficient statistics.
+
+Usage:
+    python benchmarks/bench_hierarchical_compression.py --rows 200000 --fields 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from trialflow_agro.config.schema import ModelConfig
+from trialflow_agro.inference.moments import compute_moments
+from trialflow_agro.models.hierarchical import TrialModel
+
+
+def make_frame(rows: int, fields: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    field = rng.integers(0, fields, size=rows)
+    farm = field // 5
+    region = farm % 4
+    product = rng.integers(0, 4, size=rows)
+    site = rng.normal(0, 4, size=fields)[field]
+    return pd.DataFrame(
+        {
+            "region": [f"R{i}" for i in region],
+            "farm_id": [f"Farm{i}" for i in farm],
+            "field_id": [f"F{i}" for i in field],
+            "product": np.array(["A", "B", "C", "D"])[product],
+            "yield": 60.0 + 2.0 * product + site + rng.normal(0, 8, size=rows),
+        }
+    )
+
+
+def row_level_model(model: TrialModel, df: pd.DataFrame):
+    """Same model with one likelihood term per row, as the baseline."""
+    import pymc as pm
+
+    levels = model.spec.hierarchical.random_effects
+    level_idx, coords = model._nested_levels(df, levels)
+    product_idx, products = pd.factorize(df["product"], sort=True)
+    coords["product"] = list(products)
+    y = df["yield"].to_numpy()
+    z = (y - y.mean()) / y.std()
+
+    with pm.Model(coords=coords) as pm_model:
+        mu = pm.Normal("product_z", 0.0, 2.5, dims="product")[product_idx]
+        for level in levels:
+            tau = pm.HalfNormal(f"tau_{level}", sigma=1.0)
+            offset = pm.Normal(f"z_{level}", 0.0, 1.0, dims=level)
+            mu = mu + (tau * offset)[level_idx[level]]
+        pm.Normal("yield", mu=mu, sigma=pm.HalfNormal("tau", 1.0), observed=z)
+    return pm_model
+
+
+def timed_advi(pm_model, iterations: int) -> float:
+    import pymc as pm
+
+    start = time.perf_counter()
+    with pm_model:
+        pm.fit(
+            iterations,
+            method="advi",
+            obj_optimizer=pm.adam(learning_rate=0.01),
+            random_seed=0,
+            progressbar=False,
+        )
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--fields", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=2_000)
+    args = parser.parse_args()
+
+    df = make_frame(args.rows, args.fields)
+    model = TrialModel(ModelConfig(backend="hierarchical"))
+
+    start = time.perf_counter()
+    cells = compute_moments(df, model.moment_groups())
+    compressed = model.build(cells)
+    t_compress = time.perf_counter() - start
+
+    t_rows = timed_advi(row_level_model(model, df), args.iterations)
+    t_cells = timed_advi(compressed, args.iterations)
+
+    print(f"rows={len(df)} cells={len(cells)} advi_iterations={args.iterations}")
+    print(f"  row-level fit          : {t_rows:8.3f} s")
+    print(f"  compression + build    : {t_compress:8.3f} s")
+    print(f"  sufficient-stat fit    : {t_cells:8.3f} s")
+    print(f"  speedup                : {t_rows / (t_compress + t_cells):8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
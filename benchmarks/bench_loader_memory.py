@@ -0,0 +1,80 @@
+"""
+Benchmark: memory and load time of TrialDataLoader with column projection
+and compact dtypes vs reading every column with inferred dtypes.
+
+Usage:
+    python benchmarks/bench_loader_memory.py --rows 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from trialflow_agro.data.loaders import TrialDataLoader
+from trialflow_agro.inference.moments import compute_moments
+
+
+def write_dataset(path: Path, rows: int, seed: int = 0) -> None:
+    rng = np.random.default_rng(seed)
+    field = rng.integers(0, max(rows // 50, 1), size=rows)
+    pd.DataFrame(
+        {
+            "field_id": [f"F{i}" for i in field],
+            "farm_id": [f"Farm{i // 10}" for i in field],
+            "region": rng.choice(["North", "South", "East", "West"], size=rows),
+            "year": rng.integers(2018, 2025, size=rows),
+            "product": rng.choice([f"Hybrid_{c}" for c in "ABCDEFGH"], size=rows),
+            "yield": rng.normal(60.0, 8.0, size=rows),
+            "treatment": rng.choice(["standard", "high_n"], size=rows),
+            "soil_class": rng.choice(["Loam", "Clay", "Sand"], size=rows),
+            "lat": rng.uniform(38.0, 42.0, size=rows),
+            "lon": rng.uniform(-96.0, -90.0, size=rows),
+        }
+    ).to_csv(path, index=False)
+
+
+def measure(label: str, load) -> pd.DataFrame:
+    start = time.perf_counter()
+    df = load()
+    t_load = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compute_moments(df, ["product", "region"])
+    t_group = time.perf_counter() - start
+
+    mb = df.memory_usage(deep=True).sum() / 1e6
+    print(f"  {label:<22} {mb:9.1f} MB  load {t_load:6.2f} s  groupby {t_group:6.3f} s")
+    return df
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=500_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "trial.csv"
+        write_dataset(path, args.rows)
+
+        print(f"rows={args.rows}")
+        measure("all columns, inferred", lambda: pd.read_csv(path))
+        measure(
+            "projected, float64",
+            lambda: TrialDataLoader(columns=["product", "region"]).load(path),
+        )
+        measure(
+            "projected, float32",
+            lambda: TrialDataLoader(
+                columns=["product", "region"], yield_dtype="float32"
+            ).load(path),
+        )
+
+
+if __name__ == "__main__":
+    main()
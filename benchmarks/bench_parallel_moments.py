@@ -0,0 +1,63 @@
+"""
+Benchmark: scaling of hash-partitioned parallel group moments over cores.
+
+Usage:
+    python benchmarks/bench_parallel_moments.py --rows 5000000 --groups 500000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from trialflow_agro.inference.moments import compute_moments
+
+
+def make_frame(rows: int, groups: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "field_id": pd.Categorical(
+                np.char.add("F", rng.integers(0, groups, rows).astype(str))
+            ),
+            "product": pd.Categorical(rng.choice(list("ABCDEFGH"), rows)),
+            "yield": rng.normal(60.0, 8.0, rows),
+        }
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--groups", type=int, default=200_000)
+    parser.add_argument("--max-jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--backend", choices=["thread", "process"], default="thread")
+    args = parser.parse_args()
+
+    df = make_frame(args.rows, args.groups)
+    group_cols = ["field_id", "product"]
+
+    start = time.perf_counter()
+    serial = compute_moments(df, group_cols)
+    t_serial = time.perf_counter() - start
+    print(f"rows={args.rows} groups={len(serial)} backend={args.backend}")
+    print(f"  n_jobs= 1  {t_serial:7.3f} s  speedup  1.00x")
+
+    n_jobs = 2
+    while n_jobs <= args.max_jobs:
+        start = time.perf_counter()
+        parallel = compute_moments(df, group_cols, n_jobs=n_jobs, backend=args.backend)
+        elapsed = time.perf_counter() - start
+        pd.testing.assert_frame_equal(parallel, serial, check_exact=True)
+        print(
+            f"  n_jobs={n_jobs:2d}  {elapsed:7.3f} s  speedup {t_serial / elapsed:5.2f}x"
+        )
+        n_jobs *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark: array-backed summary tables vs per-group Pydantic results.
+
+Times and traces peak memory of building the summaries from a moment table
+and serializing them, for
+- pydantic: TrialInferenceResult of GroupSummary objects, model_dump + json
+- tables: TrialInferenceTables, to_dict + json
+- arrow: TrialInferenceTables to Arrow (the Parquet results path)
+
+Usage:
+    python benchmarks/bench_result_tables.py --groups 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from trialflow_agro.inference.fit import TrialInference
+
+
+def make_frame(groups: int, rows_per_group: int = 5, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    rows = groups * rows_per_group
+    field = np.repeat(np.arange(groups), rows_per_group)
+    return pd.DataFrame(
+        {
+            "field_id": [f"F{i}" for i in field],
+            "product": rng.choice(["A", "B", "C", "D"], size=rows),
+            "yield": rng.normal(60.0, 8.0, size=rows),
+        }
+    )
+
+
+def pydantic_path(engine: TrialInference, moments: pd.DataFrame) -> str:
+    result = engine.run_moments(moments)
+    return json.dumps(result.model_dump(mode="json"))
+
+
+def tables_path(engine: TrialInference, moments: pd.DataFrame) -> str:
+    return json.dumps(engine.summarize_moments(moments).to_dict())
+
+
+def arrow_path(engine: TrialInference, moments: pd.DataFrame) -> int:
+    import pyarrow as pa
+
+    tables = engine.summarize_moments(moments)
+    return pa.Table.from_pydict(tables.by_groups.arrow_columns()).nbytes
+
+
+def measure(fn, *args):
+    """Wall time of an untraced call, then peak traced memory of a second."""
+    start = time.perf_counter()
+    out = fn(*args)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return out, elapsed, peak / 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--groups", type=int, default=100_000)
+    args = parser.parse_args()
+
+    df = make_frame(args.groups)
+    engine = TrialInference(groups=["field_id"], min_records_per_group=1)
+    moments = engine.compute_moments(df)
+
+    legacy, t_legacy, m_legacy = measure(pydantic_path, engine, moments)
+    fast, t_fast, m_fast = measure(tables_path, engine, moments)
+    _, t_arrow, m_arrow = measure(arrow_path, engine, moments)
+    assert legacy == fast
+
+    print(f"groups={args.groups} cells={len(moments)}")
+    print(f"  pydantic + json : {t_legacy:8.3f} s  peak {m_legacy:8.1f} MB")
+    print(f"  tables + json   : {t_fast:8.3f} s  peak {m_fast:8.1f} MB")
+    print(f"  tables + arrow  : {t_arrow:8.3f} s  peak {m_arrow:8.1f} MB")
+    print(f"  json speedup    : {t_legacy / t_fast:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
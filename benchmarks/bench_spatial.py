@@ -0,0 +1,146 @@
+"""
+Benchmark: spatial zone assignment and Moran's I on yield-monitor points.
+
+Times, for --points records over a grid of --fields square field polygons,
+- grid: projection + grid-cell assignment
+- polygons: bulk STRtree join against the field boundaries
+- row-by-row: the legacy approach, a point-in-polygon test of every point
+  against every candidate polygon (timed on --baseline-points points and
+  extrapolated)
+- moran: Moran's I on sparse KNN weights over a --moran-points subsample
+
+Usage:
+    python benchmarks/bench_spatial.py --points 2000000 --fields 400
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from trialflow_agro.config.schema import SpatialConfig
+from trialflow_agro.inference.spatial import SpatialAnalysis
+
+LAT0, LON0 = 41.0, -93.0
+FIELD_DEG = 0.005
+
+
+def make_points(n: int, side: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    lat = LAT0 + rng.uniform(0, side * FIELD_DEG, n)
+    lon = LON0 + rng.uniform(0, side * FIELD_DEG, n)
+    trend = np.sin(lat * 400) + np.cos(lon * 300)
+    return pd.DataFrame(
+        {
+            "product": rng.choice(["A", "B", "C"], n),
+            "yield": 60 + 5 * trend + rng.normal(0, 2, n),
+            "lat": lat,
+            "lon": lon,
+        }
+    )
+
+
+def write_fields(path: Path, side: int) -> None:
+    features = []
+    for i in range(side):
+        for j in range(side):
+            lon0, lat0 = LON0 + i * FIELD_DEG, LAT0 + j * FIELD_DEG
+            lon1, lat1 = lon0 + FIELD_DEG, lat0 + FIELD_DEG
+            ring = [
+                [lon0, lat0],
+                [lon1, lat0],
+                [lon1, lat1],
+                [lon0, lat1],
+                [lon0, lat0],
+            ]
+            features.append(
+                {
+                    "type": "Feature",
+                    "properties": {"field": f"F{i}_{j}"},
+                    "geometry": {"type": "Polygon", "coordinates": [ring]},
+                }
+            )
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": features}))
+
+
+def row_by_row(df: pd.DataFrame, boundaries: Path) -> list:
+    import geopandas as gpd
+    from shapely.geometry import Point
+
+    polygons = gpd.read_file(boundaries)
+    zones = []
+    for lat, lon in zip(df["lat"], df["lon"]):
+        point = Point(lon, lat)
+        zones.append(
+            next(
+                (
+                    f
+                    for f, g in zip(polygons["field"], polygons.geometry)
+                    if g.contains(point)
+                ),
+                None,
+            )
+        )
+    return zones
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    out = fn(*args)
+    return time.perf_counter() - start, out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--points", type=int, default=2_000_000)
+    parser.add_argument("--fields", type=int, default=400)
+    parser.add_argument("--baseline-points", type=int, default=2_000)
+    parser.add_argument("--moran-points", type=int, default=200_000)
+    args = parser.parse_args()
+
+    side = max(1, int(round(args.fields**0.5)))
+    df = make_points(args.points, side)
+    with tempfile.TemporaryDirectory() as tmp:
+        boundaries = Path(tmp) / "fields.geojson"
+        write_fields(boundaries, side)
+
+        grid = SpatialAnalysis(SpatialConfig(enabled=True, cell_size=50.0))
+        polygons = SpatialAnalysis(
+            SpatialConfig(
+                enabled=True,
+                zones="polygons",
+                boundaries=boundaries,
+                zone_column="field",
+                moran_max_points=args.moran_points,
+            )
+        )
+        grid_s, (grid_zones, _) = timed(grid.zones, df)
+        poly_s, (poly_zones, _) = timed(polygons.zones, df)
+        moran_s, moran = timed(polygons.morans_i, df, poly_zones)
+        sample = df.iloc[: args.baseline_points]
+        base_s, _ = timed(row_by_row, sample, boundaries)
+
+    scale = args.points / len(sample)
+    print(
+        f"points={args.points:,} fields={side * side} "
+        f"moran_points={moran.n:,} k={moran.k_neighbors}"
+    )
+    print(
+        f"grid zones      : {grid_s:8.2f} s ({len(grid_zones.zone.categories):,} cells)"
+    )
+    print(f"polygon STRtree : {poly_s:8.2f} s ({poly_zones.n_assigned:,} assigned)")
+    print(
+        f"row-by-row      : {base_s * scale:8.2f} s (extrapolated from "
+        f"{len(sample):,} points)"
+    )
+    print(f"moran's I       : {moran_s:8.2f} s (I = {moran.statistic:.3f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+"""
+Benchmark suite: end-to-end stage timings and peak memory on synthetic data.
+
+For each --rows size, writes a seeded synthetic trial dataset (see
+`trialflow_agro.data.synthetic`) as CSV and Parquet, then times and
+memory-profiles every stage of a fit:
+
+- load_csv / load_parquet: TrialDataLoader.load
+- inference: TrialInference.run
+- diagnostics: compute_diagnostics
+- write_json / write_parquet: writing the results document / tables
+- render_json / render_parquet: ReportBuilder.render from either output
+
+Wall time is the best of --repeat runs. Peak memory is the stage's rise in
+process peak RSS over the RSS it started from (Linux resets the peak via
+/proc/self/clear_refs; elsewhere tracemalloc's peak, which misses Arrow
+allocations, is used instead).
+
+Results are compared against a stored baseline (benchmarks/baselines/
+suite.json) and the script exits non-zero when a stage got slower or
+bigger than --tolerance allows; --save-baseline records new numbers.
+Compare only baselines recorded on the same machine.
+
+Usage:
+    python benchmarks/bench_suite.py --rows 1e4 1e5 1e6
+    python benchmarks/bench_suite.py --rows 1e7 --formats parquet --repeat 1
+    python benchmarks/bench_suite.py --save-baseline
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from trialflow_agro.config.schema import TrialflowConfig
+from trialflow_agro.data.loaders import TrialDataLoader
+from trialflow_agro.data.synthetic import SyntheticTrialSpec, write_synthetic
+from trialflow_agro.inference.diagnostics import (
+    DiagnosticsAccumulator,
+    compute_diagnostics,
+)
+from trialflow_agro.inference.fit import TrialInference
+from trialflow_agro.reporting.report_builder import ReportBuilder
+from trialflow_agro.results import write_parquet_results
+
+BASELINE = Path(__file__).parent / "baselines" / "suite.json"
+GROUPS = ["field_id", "year", "product"]
+# Differences below these are noise, never regressions
+MIN_SECONDS = 0.02
+MIN_MB = 16.0
+
+Measurement = Dict[str, float]
+
+
+def _status_mb(key: str) -> float:
+    with open("/proc/self/status", encoding="ascii") as f:
+        for line in f:
+            if line.startswith(key):
+                return int(line.split()[1]) / 1024
+    raise KeyError(key)
+
+
+def _libc():
+    import ctypes
+    import ctypes.util
+
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6")
+        libc.mallopt, libc.malloc_trim
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+def _can_reset_peak() -> bool:
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as f:
+            f.write("5")
+        _status_mb("VmHWM:")
+    except OSError:
+        return False
+    return _libc() is not None
+
+
+class StageRunner:
+    """Times and memory-profiles named stages."""
+
+    def __init__(self, repeat: int) -> None:
+        self.repeat = max(1, repeat)
+        self.memory_method = "rss" if _can_reset_peak() else "tracemalloc"
+        self._libc = _libc() if self.memory_method == "rss" else None
+        if self._libc is not None:
+            # glibc: a fixed mmap threshold (M_MMAP_THRESHOLD) returns large
+            # buffers to the OS on free, so each stage's arrays raise RSS
+            self._libc.mallopt(-3, 1 << 20)
+
+    def peak_mb(self, fn: Callable[[], object]) -> float:
+        gc.collect()
+        if self._libc is not None:
+            self._libc.malloc_trim(0)
+            start = _status_mb("VmRSS:")
+            with open("/proc/self/clear_refs", "w", encoding="ascii") as f:
+                f.write("5")
+            fn()
+            return max(_status_mb("VmHWM:") - start, 0.0)
+        tracemalloc.start()
+        try:
+            fn()
+            return tracemalloc.get_traced_memory()[1] / 1e6
+        finally:
+            tracemalloc.stop()
+
+    def measure(self, fn: Callable[[], object]) -> Tuple[object, Measurement]:
+        """Run `fn` --repeat times; returns its result and the measurement."""
+        best = float("inf")
+        for _ in range(self.repeat):
+            gc.collect()
+            start = time.perf_counter()
+            result = fn()
+            best = min(best, time.perf_counter() - start)
+            del result
+        # Memory in a separate run, so tracing never inflates the timing
+        holder: List[object] = []
+        peak = self.peak_mb(lambda: holder.append(fn()))
+        return holder[0], {"seconds": round(best, 4), "peak_mb": round(peak, 1)}
+
+
+def dataset(data_dir: Path, rows: int, fmt: str, seed: int) -> Path:
+    path = data_dir / f"synthetic_{rows}_s{seed}.{fmt}"
+    if not path.exists():
+        start = time.perf_counter()
+        write_synthetic(SyntheticTrialSpec(rows=rows, seed=seed), path)
+        print(f"  generated {path.name} in {time.perf_counter() - start:.2f} s")
+    return path
+
+
+def run_size(
+    runner: StageRunner,
+    data_dir: Path,
+    out_dir: Path,
+    rows: int,
+    formats: List[str],
+    seed: int,
+) -> Dict[str, Measurement]:
+    measured: Dict[str, Measurement] = {}
+    df: Optional[pd.DataFrame] = None
+    for fmt in formats:
+        path = dataset(data_dir, rows, fmt, seed)
+        df, measured[f"load_{fmt}"] = runner.measure(
+            partial(TrialDataLoader().load, path)
+        )
+
+    cfg = TrialflowConfig(
+        data={"path": path},
+        model={"groups": GROUPS},
+        output={"directory": out_dir, "results_format": "both"},
+    )
+    engine = TrialInference(groups=GROUPS, min_records_per_group=5)
+    # partial, not a closure: `df` is deleted below to free it before the
+    # write stages
+    _, measured["inference"] = runner.measure(partial(engine.run, df))
+    diagnostics, measured["diagnostics"] = runner.measure(
+        partial(compute_diagnostics, df)
+    )
+
+    # What the pipeline writes: the array-backed tables and plot data
+    tables = engine.summarize_moments(engine.compute_moments(df), df)
+    accumulator = DiagnosticsAccumulator()
+    accumulator.update(df)
+    plots = {"yield_histogram": accumulator.yield_histogram()}
+    config = cfg.model_dump(mode="json")
+    del df
+    gc.collect()
+
+    json_dir, parquet_dir = out_dir / "json", out_dir / "parquet"
+    json_dir.mkdir(parents=True, exist_ok=True)
+
+    def write_json() -> None:
+        document = {
+            "config": config,
+            "inference": tables.to_dict(),
+            "diagnostics": diagnostics,
+            "plots": plots,
+            "timings": None,
+        }
+        (json_dir / "results.json").write_text(
+            json.dumps(document, indent=2), encoding="utf-8"
+        )
+
+    _, measured["write_json"] = runner.measure(write_json)
+    _, measured["write_parquet"] = runner.measure(
+        lambda: write_parquet_results(parquet_dir, config, tables, diagnostics, plots)
+    )
+    for kind, results_dir in (("json", json_dir), ("parquet", parquet_dir)):
+        builder = ReportBuilder(results_dir)
+        _, measured[f"render_{kind}"] = runner.measure(
+            lambda: builder.render(out_path=results_dir / "report.html")
+        )
+    return measured
+
+
+def environment(memory_method: str) -> Dict[str, object]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "pyarrow": pa.__version__,
+        "memory_method": memory_method,
+    }
+
+
+def compare(
+    results: Dict[str, Dict[str, Measurement]],
+    baseline: Dict[str, Dict[str, Measurement]],
+    tolerance: float,
+) -> List[str]:
+    """Print current vs baseline numbers; returns the regressions."""
+    regressions: List[str] = []
+    print(
+        f"\n{'rows':>10} {'stage':<15}{'seconds':>10}{'base':>10}{'ratio':>8}"
+        f"{'peak MB':>10}{'base':>10}"
+    )
+    for rows, stages in results.items():
+        for stage, now in stages.items():
+            base = baseline.get(rows, {}).get(stage)
+            flags = []
+            if base is not None:
+                ratio = now["seconds"] / max(base["seconds"], 1e-9)
+                if (
+                    now["seconds"] > base["seconds"] * (1 + tolerance)
+                    and now["seconds"] - base["seconds"] > MIN_SECONDS
+                ):
+                    flags.append("SLOWER")
+                if (
+                    now["peak_mb"] > base["peak_mb"] * (1 + tolerance)
+                    and now["peak_mb"] - base["peak_mb"] > MIN_MB
+                ):
+                    flags.append("BIGGER")
+                base_s = f"{base['seconds']:.3f}"
+                base_mb = f"{base['peak_mb']:.1f}"
+                ratio_s = f"{ratio:.2f}x"
+            else:
+                base_s = base_mb = ratio_s = "-"
+            print(
+                f"{int(rows):>10,} {stage:<15}{now['seconds']:>10.3f}{base_s:>10}"
+                f"{ratio_s:>8}{now['peak_mb']:>10.1f}{base_mb:>10}"
+                f"  {' '.join(flags)}"
+            )
+            regressions.extend(f"{rows} {stage} {flag}" for flag in flags)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--rows",
+        type=lambda s: int(float(s)),
+        nargs="+",
+        default=[10_000, 100_000, 1_000_000],
+        help="Dataset sizes (e.g. 1e4 1e6).",
+    )
+    parser.add_argument(
+        "--formats", nargs="+", choices=["csv", "parquet"], default=["csv", "parquet"]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--data-dir",
+        type=Path,
+        default=None,
+        help="Keep generated datasets here and reuse them across runs.",
+    )
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed relative slowdown / memory growth over the baseline.",
+    )
+    args = parser.parse_args()
+
+    runner = StageRunner(args.repeat)
+    results: Dict[str, Dict[str, Measurement]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.data_dir or Path(tmp) / "data"
+        data_dir.mkdir(parents=True, exist_ok=True)
+        for rows in args.rows:
+            print(f"rows={rows:,}")
+            results[str(rows)] = run_size(
+                runner,
+                data_dir,
+                Path(tmp) / f"out_{rows}",
+                rows,
+                args.formats,
+                args.seed,
+            )
+
+    baseline: Dict[str, object] = {}
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    regressions = compare(results, baseline.get("results", {}), args.tolerance)
+
+    if args.save_baseline:
+        merged = dict(baseline.get("results", {}))
+        merged.update(results)
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        document = {
+            "environment": environment(runner.memory_method),
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "results": merged,
+        }
+        args.baseline.write_text(
+            json.dumps(document, indent=2) + "\n", encoding="utf-8"
+        )
+        print(f"\nBaseline written to {args.baseline}")
+        return
+    if (
+        baseline
+        and baseline.get("environment", {}).get("memory_method") != runner.memory_method
+    ):
+        print("\nNote: baseline peak memory was measured differently.")
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.tolerance:.0%}:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import json
+import math
+from pathlib import Path
+
+import pandas as pd
+import pytest
+import yaml
+from typer.testing import CliRunner
+
+from trialflow_agro.cli.main import app
+from trialflow_agro.intermediate import IntermediateStore
+from trialflow_agro.pipeline import Pipeline
+
+runner = CliRunner()
+
+
+def _results(out_dir: Path) -> dict:
+    return json.loads((out_dir / "results.json").read_text())
+
+
+def test_fit_append_matches_full_refit(demo_config_path: Path, tmp_path: Path):
+    cfg = yaml.safe_load(demo_config_path.read_text())
+    full = pd.read_csv(cfg["data"]["path"])
+    new_records = pd.DataFrame(
+        {
+            "field_id": ["F103", "F101"],
+            "farm_id": ["Farm3", "Farm1"],
+            "region": ["East", "North"],
+            "year": [2025, 2025],
+            "product": ["C", "A"],
+            "yield": [70.0, 58.0],
+        }
+    )
+    delta_path = tmp_path / "new_records.csv"
+    new_records.to_csv(delta_path, index=False)
+
+    out_dir = tmp_path / "appended"
+    assert (
+        runner.invoke(app, ["fit", str(demo_config_path), "-o", str(out_dir)]).exit_code
+        == 0
+    )
+    result = runner.invoke(
+        app,
+        ["fit", str(demo_config_path), "-o", str(out_dir), "--append", str(delta_path)],
+    )
+    assert result.exit_code == 0, result.output
+
+    # Reference: a full fit over history + new records
+    combined_path = tmp_path / "combined.csv"
+    pd.concat([full, new_records]).to_csv(combined_path, index=False)
+    cfg["data"]["path"] = str(combined_path)
+    combined_config = tmp_path / "combined.yml"
+    combined_config.write_text(yaml.safe_dump(cfg))
+    Pipeline(config_path=combined_config, output_dir=tmp_path / "full").run()
+
+    appended, expected = _results(out_dir), _results(tmp_path / "full")
+    assert appended["diagnostics"] == expected["diagnostics"]
+    for level in ["by_product", "by_groups"]:
+        got, want = appended["inference"][level], expected["inference"][level]
+        assert [g["group_values"] for g in got] == [w["group_values"] for w in want]
+        for g, w in zip(got, want):
+            assert g["n"] == w["n"]
+            assert math.isclose(g["mean_yield"], w["mean_yield"])
+            assert (g["std_yield"] is None) == (w["std_yield"] is None)
+            if g["std_yield"] is not None:
+                assert math.isclose(g["std_yield"], w["std_yield"])
+
+    # The appended state no longer describes the configured file alone
+    Pipeline(config_path=demo_config_path, output_dir=out_dir).run()
+    assert _results(out_dir)["diagnostics"]["n_records"] == len(full)
+
+
+def test_fit_append_requires_previous_state(demo_config_path: Path, tmp_path: Path):
+    result = runner.invoke(
+        app,
+        [
+            "fit",
+            str(demo_config_path),
+            "-o",
+            str(tmp_path / "empty"),
+            "--append",
+            str(demo_config_path),
+        ],
+    )
+    assert result.exit_code != 0
+    assert isinstance(result.exception, FileNotFoundError)
+
+
+def test_fit_append_rejects_inconsistent_state(demo_config_path: Path, tmp_path: Path):
+    cfg = yaml.safe_load(demo_config_path.read_text())
+    delta_path = tmp_path / "new_records.csv"
+    pd.read_csv(cfg["data"]["path"]).head(3).to_csv(delta_path, index=False)
+    out_dir = tmp_path / "out"
+    Pipeline(config_path=demo_config_path, output_dir=out_dir).run()
+
+    # The configured file and already merged files would be counted twice
+    for path in [Path(cfg["data"]["path"]), delta_path]:
+        pipeline = Pipeline(config_path=demo_config_path, output_dir=out_dir)
+        if path == delta_path:
+            pipeline.append(delta_path)
+        with pytest.raises(ValueError, match="already part of the persisted state"):
+            pipeline.append(path)
+
+    # State built with other settings
+    cfg["data"]["yield_dtype"] = "float32"
+    other = tmp_path / "float32.yml"
+    other.write_text(yaml.safe_dump(cfg))
+    with pytest.raises(ValueError, match="yield dtype"):
+        Pipeline(config_path=other, output_dir=out_dir).append(delta_path)
+
+    cleaned = tmp_path / "cleaned"
+    cfg["data"]["yield_dtype"] = "float64"
+    cfg["cleaning"] = {"enabled": True}
+    cleaning = tmp_path / "cleaning.yml"
+    cleaning.write_text(yaml.safe_dump(cfg))
+    Pipeline(config_path=cleaning, output_dir=cleaned).run()
+    with pytest.raises(ValueError, match="cleaned records"):
+        Pipeline(config_path=demo_config_path, output_dir=cleaned).append(delta_path)
+
+
+def test_check_append_requires_a_store(demo_data: Path, tmp_path: Path):
+    store = IntermediateStore(tmp_path / "out" / "intermediate")
+    with pytest.raises(FileNotFoundError, match="No persisted state found"):
+        store.check_append(demo_data, "float64")
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+import yaml
+from typer.testing import CliRunner
+
+from trialflow_agro.batch import BatchPipeline
+from trialflow_agro.cli.main import app
+from trialflow_agro.data.loaders import TrialDataLoader
+from trialflow_agro.pipeline import Pipeline
+
+
+def _make_configs(
+    base: Path, config_dir: Path, n: int, n_datasets: int = 1
+) -> list[Path]:
+    config_dir.mkdir()
+    cfg = yaml.safe_load(base.read_text())
+    data = Path(cfg["data"]["path"])
+    paths = []
+    for i in range(n):
+        copy = data.with_name(f"data_{i % n_datasets}.csv")
+        copy.write_bytes(data.read_bytes())
+        cfg["data"]["path"] = str(copy)
+        cfg["model"]["groups"] = ["product"] if i % 2 else ["product", "region"]
+        cfg["output"]["directory"] = str(config_dir.parent / f"out_{i}")
+        path = config_dir / f"trial_{i}.yml"
+        path.write_text(yaml.safe_dump(cfg))
+        paths.append(path)
+    return paths
+
+
+def test_batch_shares_one_dataset_per_data_path(
+    demo_config_path: Path, tmp_path: Path, monkeypatch
+):
+    paths = _make_configs(demo_config_path, tmp_path / "configs", 3)
+
+    loads = []
+    original = TrialDataLoader.load
+
+    def counting_load(self, path):
+        loads.append(path)
+        return original(self, path)
+
+    monkeypatch.setattr(TrialDataLoader, "load", counting_load)
+    summary = BatchPipeline(paths, workers=1).run()
+
+    assert len(loads) == 1
+    assert summary.n_ok == 3 and summary.n_error == 0
+    assert [run.config for run in summary.runs] == [str(p) for p in paths]
+    for i in range(3):
+        assert (tmp_path / f"out_{i}" / "results.json").exists()
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_cli_fit_batch_writes_summary(
+    demo_config_path: Path, tmp_path: Path, workers: int
+):
+    config_dir = tmp_path / "configs"
+    # two datasets, so the process pool gets two tasks
+    _make_configs(demo_config_path, config_dir, 2, n_datasets=2)
+    (config_dir / "broken.yml").write_text(yaml.safe_dump({"data": {}}))
+    summary_path = tmp_path / "summary.json"
+
+    result = CliRunner().invoke(
+        app,
+        [
+            "fit-batch",
+            str(config_dir),
+            "--workers",
+            str(workers),
+            "--summary",
+            str(summary_path),
+        ],
+    )
+
+    assert result.exit_code == 1  # the broken config fails the batch
+    summary = json.loads(summary_path.read_text())
+    assert (summary["n_ok"], summary["n_error"]) == (2, 1)
+    statuses = {Path(run["config"]).name: run["status"] for run in summary["runs"]}
+    assert statuses == {"broken.yml": "error", "trial_0.yml": "ok", "trial_1.yml": "ok"}
+
+
+def test_batch_fans_shared_configs_out_across_workers(
+    demo_config_path: Path, tmp_path: Path
+):
+    paths = _make_configs(demo_config_path, tmp_path / "configs", 4)
+
+    summary = BatchPipeline(paths, workers=2).run()
+
+    assert summary.n_ok == 4 and summary.n_error == 0
+    # One load of the dataset, shared by every config
+    assert len({run.shared_load_seconds for run in summary.runs}) == 1
+    assert len({run.data_path for run in summary.runs}) == 1
+
+    serial_dir = tmp_path / "serial"
+    serial_dir.mkdir()
+    for i, path in enumerate(paths):
+        pipeline = Pipeline(config_path=path, output_dir=serial_dir / str(i))
+        pipeline.run()
+        batch = json.loads((tmp_path / f"out_{i}" / "results.json").read_text())
+        assert batch["inference"] == pipeline.results["inference"]
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+from trialflow_agro.config.schema import BootstrapConfig
+from trialflow_agro.inference.bootstrap import bootstrap_mean_ci
+from trialflow_agro.inference.fit import TrialInference
+from trialflow_agro.inference.moments import compute_moments
+from trialflow_agro.pipeline import Pipeline
+
+
+def _frame(seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    sizes = {"A": 40, "B": 40, "C": 25, "D": 1}
+    product = np.repeat(list(sizes), list(sizes.values()))
+    return pd.DataFrame(
+        {
+            "product": product,
+            "region": rng.choice(["North", "South"], size=len(product)),
+            "yield": rng.normal(60.0, 5.0, size=len(product)),
+        }
+    )
+
+
+def test_interval_brackets_mean_with_expected_width():
+    df = _frame()
+    ci = bootstrap_mean_ci(df, ["product"], n_resamples=2000)
+
+    stats = df.groupby("product")["yield"].agg(["mean", "std", "count"])
+    for product in ["A", "B", "C"]:
+        low, high = ci.loc[product]
+        mean, std, n = stats.loc[product]
+        assert low < mean < high
+        assert high - low == pytest.approx(2 * 1.96 * std / np.sqrt(n), rel=0.2)
+    # a single record has no interval
+    assert ci.loc["D"].isna().all()
+
+
+def test_results_independent_of_budget_and_workers():
+    df = _frame()
+    reference = bootstrap_mean_ci(df, ["product", "region"], n_resamples=300)
+
+    for kwargs in [
+        {"max_bytes": 4096},
+        {"n_jobs": 2, "backend": "thread"},
+        {"n_jobs": 2, "backend": "process", "max_bytes": 4096},
+    ]:
+        ci = bootstrap_mean_ci(df, ["product", "region"], n_resamples=300, **kwargs)
+        pd.testing.assert_frame_equal(ci, reference)
+
+
+def test_index_matches_moment_table():
+    df = _frame()
+    df.loc[df.index[:3], "yield"] = np.nan
+    ci = bootstrap_mean_ci(df, ["product", "region"])
+
+    assert ci.index.equals(compute_moments(df, ["product", "region"]).index)
+
+
+def test_inference_adds_intervals_to_summaries():
+    engine = TrialInference(
+        groups=["product", "region"],
+        min_records_per_group=1,
+        bootstrap=BootstrapConfig(enabled=True, n_resamples=200),
+    )
+    result = engine.run(_frame())
+
+    by_product = {s.group_values["product"]: s for s in result.by_product}
+    assert by_product["A"].mean_ci_low < by_product["A"].mean_yield
+    assert by_product["D"].mean_ci_low is None
+    assert all(s.mean_ci_high is not None for s in result.by_groups if s.n > 1)
+    assert result.overall.mean_ci_low is None
+
+    with pytest.raises(ValueError, match="need the records"):
+        engine.run_moments(engine.compute_moments(_frame()))
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_pipeline_writes_intervals(tmp_path, demo_data, streaming):
+    config = {
+        "data": {"path": str(demo_data), "streaming": streaming, "chunk_size": 2},
+        "model": {
+            "groups": ["product"],
+            "min_records_per_group": 1,
+            "bootstrap": {"enabled": True, "n_resamples": 100},
+        },
+        "output": {"directory": str(tmp_path / "results")},
+    }
+    config_path = tmp_path / "bootstrap.yml"
+    config_path.write_text(yaml.safe_dump(config))
+
+    Pipeline(config_path=config_path).run()
+
+    results = json.loads((tmp_path / "results" / "results.json").read_text())
+    for summary in results["inference"]["by_product"]:
+        assert (
+            summary["mean_ci_low"] <= summary["mean_yield"] <= summary["mean_ci_high"]
+        )
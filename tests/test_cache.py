@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import yaml
+
+from trialflow_agro.cache import ResultCache
+from trialflow_agro.pipeline import Pipeline
+
+
+def _enable_cache(config_path: Path, cache_dir: Path) -> None:
+    cfg = yaml.safe_load(config_path.read_text())
+    cfg["cache"] = {"enabled": True, "directory": str(cache_dir)}
+    config_path.write_text(yaml.safe_dump(cfg))
+
+
+def test_pipeline_cache_hit_and_invalidation(
+    demo_config_path: Path, demo_data: Path, tmp_path: Path
+):
+    _enable_cache(demo_config_path, tmp_path / "cache")
+
+    first = Pipeline(config_path=demo_config_path, output_dir=tmp_path / "a")
+    first.run()
+    assert first.cache_status == "miss"
+
+    second = Pipeline(config_path=demo_config_path, output_dir=tmp_path / "b")
+    second.run()
+    assert second.cache_status == "hit"
+    assert second.cache_stats == {"hits": 1, "misses": 1}
+    assert (tmp_path / "b" / "results.json").read_bytes() == (
+        tmp_path / "a" / "results.json"
+    ).read_bytes()
+
+    # Changing the data contents invalidates the entry
+    demo_data.write_text(demo_data.read_text().replace("60.0", "61.0"))
+    third = Pipeline(config_path=demo_config_path, output_dir=tmp_path / "c")
+    third.run()
+    assert third.cache_status == "miss"
+
+    # --no-cache bypasses the cache entirely
+    bypass = Pipeline(
+        config_path=demo_config_path, output_dir=tmp_path / "d", use_cache=False
+    )
+    bypass.run()
+    assert bypass.cache_status is None
+
+
+def test_cache_evicts_least_recently_used(tmp_path: Path):
+    cache = ResultCache(tmp_path / "cache", max_bytes=250)
+    results = tmp_path / "results.json"
+    results.write_bytes(b"x" * 100)
+
+    cache.put("old", results)
+    cache.put("mid", results)
+    assert cache.get("old", tmp_path / "restored.json")  # refresh "old"
+    cache.put("new", results)
+
+    entries = {p.stem for p in (tmp_path / "cache" / "entries").glob("*.json")}
+    assert entries == {"old", "new"}
+
+
+def test_cache_is_skipped_without_written_results(
+    demo_config_path: Path, tmp_path: Path
+):
+    _enable_cache(demo_config_path, tmp_path / "cache")
+
+    in_memory = Pipeline(
+        config_path=demo_config_path, output_dir=tmp_path / "a", write_results=False
+    )
+    in_memory.run()
+    assert in_memory.cache_status is None
+    assert not (tmp_path / "a" / "results.json").exists()
+
+    first = Pipeline(config_path=demo_config_path, output_dir=tmp_path / "b")
+    first.run()
+    hit = Pipeline(config_path=demo_config_path, output_dir=tmp_path / "c")
+    hit.run()
+    assert hit.cache_status == "hit"
+    assert hit.results == first.results
+    assert hit.results["inference"] == in_memory.results["inference"]
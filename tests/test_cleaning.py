@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+from trialflow_agro.config.schema import CleaningConfig
+from trialflow_agro.data.cleaning import RecordCleaner
+from trialflow_agro.pipeline import Pipeline
+
+
+def _yield_monitor(n: int = 4000, seed: int = 0) -> pd.DataFrame:
+    """Two fields of dense points with a few stop (0) and spike artifacts."""
+    rng = np.random.default_rng(seed)
+    field = rng.choice(["F1", "F2"], n)
+    df = pd.DataFrame(
+        {
+            "field_id": field,
+            "farm_id": "Farm1",
+            "region": "North",
+            "year": 2024,
+            "product": np.where(field == "F1", "A", "B"),
+            "yield": np.where(field == "F1", 60.0, 80.0) + rng.normal(0, 2, n),
+            "lat": 41.0 + rng.uniform(0, 0.002, n),
+            "lon": -93.0 + rng.uniform(0, 0.002, n) + np.where(field == "F1", 0, 0.01),
+        }
+    )
+    df.loc[:19, "yield"] = 0.0
+    df.loc[20:29, "yield"] = 400.0
+    df.loc[30:34, ["lat", "lon"]] = np.nan
+    return df
+
+
+@pytest.mark.parametrize("method", ["mad", "iqr"])
+def test_outlier_filters_are_per_field(method: str):
+    df = _yield_monitor()
+    # A yield of 75 is typical in F2 but an outlier in F1
+    df.loc[100:104, ["field_id", "yield"]] = ["F1", 75.0]
+    cleaner = RecordCleaner(CleaningConfig(enabled=True, outliers=method))
+    cleaned, report = cleaner.clean(df)
+
+    assert not cleaned["yield"].isin([0.0, 400.0, 75.0]).any()
+    assert report.steps[0].name == f"outliers_{method}"
+    assert (
+        report.rows_out == len(cleaned) == report.rows_in - report.steps[0].rows_removed
+    )
+    # Nothing typical is dropped wholesale
+    assert len(cleaned) > 0.95 * len(df)
+
+
+@pytest.mark.parametrize("thin_method", ["first", "mean"])
+def test_thinning_keeps_one_record_per_cell_and_field(thin_method: str):
+    df = _yield_monitor().astype({"field_id": "category", "yield": "float32"})
+    cleaner = RecordCleaner(
+        CleaningConfig(
+            enabled=True,
+            min_yield=1.0,
+            outliers="none",
+            thin_cell_size=50.0,
+            thin_method=thin_method,
+        )
+    )
+    cleaned, report = cleaner.clean(df)
+
+    assert [s.name for s in report.steps] == ["yield_range", "thinning"]
+    assert report.steps[0].rows_removed == 20
+    # ~170 m x 220 m per field in 50 m cells: at most 5 x 6 cells per
+    # field, plus the 5 records without coordinates
+    located = cleaned["lat"].notna()
+    assert (~located).sum() == 5
+    assert located.sum() <= 2 * 30
+    assert report.rows_in / report.rows_out > 50
+    assert cleaned.dtypes.to_dict() == df.dtypes.to_dict()
+    by_field = cleaned[located].groupby("field_id", observed=True)["yield"].median()
+    assert by_field["F1"] == pytest.approx(60.0, abs=3)
+    assert by_field["F2"] == pytest.approx(80.0, abs=3)
+
+
+def test_pipeline_reports_cleaning_and_reuses_matching_intermediates(
+    demo_config_path: Path, tmp_path: Path
+):
+    data = tmp_path / "monitor.csv"
+    _yield_monitor().to_csv(data, index=False)
+    cfg = yaml.safe_load(demo_config_path.read_text())
+    cfg["data"]["path"] = str(data)
+    cfg["cleaning"] = {"enabled": True, "min_yield": 1.0, "thin_cell_size": 50.0}
+    demo_config_path.write_text(yaml.safe_dump(cfg))
+    out = tmp_path / "out"
+
+    Pipeline(config_path=demo_config_path, output_dir=out).run()
+    results = json.loads((out / "results.json").read_text())
+    cleaning = results["diagnostics"]["cleaning"]
+    assert [s["name"] for s in cleaning["steps"]] == [
+        "yield_range",
+        "outliers_mad",
+        "thinning",
+    ]
+    assert results["diagnostics"]["n_records"] == cleaning["rows_out"] < 100
+    assert results["inference"]["overall"]["n"] == cleaning["rows_out"]
+
+    # Stored artifacts are reused for the same cleaning settings only
+    again = Pipeline(config_path=demo_config_path, output_dir=out)
+    again.run()
+    assert json.loads((out / "results.json").read_text())["diagnostics"] == (
+        results["diagnostics"]
+    )
+    cfg["cleaning"]["enabled"] = False
+    demo_config_path.write_text(yaml.safe_dump(cfg))
+    Pipeline(config_path=demo_config_path, output_dir=out).run()
+    raw = json.loads((out / "results.json").read_text())["diagnostics"]
+    assert raw["n_records"] == 4000 and "cleaning" not in raw
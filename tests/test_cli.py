@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import json
+import pstats
 from pathlib import Path
 
 from typer.testing import CliRunner
@@ -54,3 +56,34 @@ def test_cli_report_creates_html(demo_config_path: Path, tmp_path: Path):
     assert result.exit_code == 0
     assert report_path.exists()
     assert "<html" in report_path.read_text().lower()
+
+
+def test_cli_fit_profile_prints_timings_and_dumps_pstats(
+    demo_config_path: Path, tmp_path: Path
+):
+    out_dir = tmp_path / "cli_results"
+    stats_path = tmp_path / "fit.pstats"
+    result = runner.invoke(
+        app,
+        [
+            "fit",
+            str(demo_config_path),
+            "--out",
+            str(out_dir),
+            "--profile",
+            "--pstats",
+            str(stats_path),
+        ],
+    )
+
+    assert result.exit_code == 0
+    for stage in ("config", "load", "aggregate", "inference", "write", "total"):
+        assert stage in result.output
+    assert pstats.Stats(str(stats_path)).total_calls > 0
+
+    timings = json.loads((out_dir / "results.json").read_text())["timings"]
+    stages = {s["name"]: s for s in timings["stages"]}
+    assert list(stages) == ["config", "load", "aggregate", "inference"]
+    assert stages["load"]["rows"] == stages["aggregate"]["rows"] == 4
+    assert stages["inference"]["groups"] == 2
+    assert stages["aggregate"]["wall_seconds"] >= 0
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+from pydantic import ValidationError
+
+from trialflow_agro.config.schema import ComparisonConfig
+from trialflow_agro.inference.comparisons import PairedComparisons
+from trialflow_agro.inference.fit import TrialInference
+from trialflow_agro.inference.moments import compute_moments
+
+
+def _frame(seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    rows = []
+    for field in range(120):
+        for year in [2023, 2024]:
+            for product in rng.choice(list("ABCD"), size=3, replace=False):
+                for _ in range(2):
+                    effect = {"A": 0.0, "B": 1.0, "C": 2.0, "D": 3.0}[product]
+                    rows.append(
+                        (f"F{field}", year, product, 60 + effect + rng.normal(0, 2))
+                    )
+    return pd.DataFrame(rows, columns=["field_id", "year", "product", "yield"])
+
+
+def test_pairs_match_naive_pivot():
+    df = _frame()
+    moments = compute_moments(df, ["field_id", "year", "product"])
+    comparisons = PairedComparisons().run_moments(moments)
+
+    cell_means = df.groupby(["field_id", "year", "product"])["yield"].mean().unstack()
+    assert len(comparisons) == 6
+    for c in comparisons:
+        diff = (cell_means[c.product_a] - cell_means[c.product_b]).dropna()
+        assert c.n == len(diff)
+        assert c.mean_diff == pytest.approx(diff.mean())
+        assert c.std_diff == pytest.approx(diff.std())
+        assert c.win_rate == pytest.approx((diff > 0).mean())
+
+
+def test_ties_count_half_and_min_pairs():
+    df = pd.DataFrame(
+        {
+            "field_id": ["F1", "F1", "F2", "F2", "F3"],
+            "year": [2024] * 5,
+            "product": ["A", "B", "A", "B", "C"],
+            "yield": [60.0, 60.0, 65.0, 62.0, 70.0],
+        }
+    )
+    moments = compute_moments(df, ["field_id", "year", "product"])
+    (comparison,) = PairedComparisons(min_pairs=2).run_moments(moments)
+
+    assert (comparison.product_a, comparison.product_b) == ("A", "B")
+    assert comparison.win_rate == 0.75
+    assert comparison.mean_diff == 1.5
+
+
+def test_inference_includes_comparisons():
+    engine = TrialInference(
+        groups=["product"],
+        min_records_per_group=1,
+        comparisons=ComparisonConfig(enabled=True),
+    )
+    assert engine.finest_grouping() == ["product", "field_id", "year"]
+
+    result = engine.run(_frame())
+    d_vs_a = next(
+        c for c in result.comparisons if (c.product_a, c.product_b) == ("A", "D")
+    )
+    assert d_vs_a.mean_diff == pytest.approx(-3.0, abs=0.5)
+
+
+def test_empty_pair_on_is_rejected():
+    with pytest.raises(ValidationError):
+        ComparisonConfig(enabled=True, pair_on=[])
+    with pytest.raises(ValueError, match="pair_on"):
+        PairedComparisons(pair_on=[])
@@ -2,6 +2,9 @@ from __future__ import annotations
 
 from pathlib import Path
 
+import pandas as pd
+import pytest
+
 from trialflow_agro.config.schema import ConfigLoader
 from trialflow_agro.data.loaders import TrialDataLoader
 
@@ -23,3 +26,71 @@ def test_trial_data_loader_basic(demo_data: Path):
     # Must at least include all REQUIRED_COLUMNS
     for col in ["field_id", "farm_id", "region", "year", "product", "yield"]:
         assert col in df.columns
+
+
+def test_trial_data_loader_projects_and_compacts_columns(tmp_path: Path):
+    path = tmp_path / "wide.csv"
+    pd.DataFrame(
+        {
+            "field_id": ["F1", "F2"],
+            "farm_id": ["Farm1", "Farm1"],
+            "region": ["North", "South"],
+            "year": [2023, 2024],
+            "product": ["A", "B"],
+            "yield": [60.0, 61.5],
+            "soil_class": ["Loam", "Clay"],
+            "notes": ["x", "y"],
+        }
+    ).to_csv(path, index=False)
+
+    df = TrialDataLoader(columns=["soil_class"], yield_dtype="float32").load(path)
+
+    assert list(df.columns) == [
+        "field_id",
+        "farm_id",
+        "region",
+        "year",
+        "product",
+        "yield",
+        "soil_class",
+    ]
+    assert isinstance(df["product"].dtype, pd.CategoricalDtype)
+    assert df["year"].dtype == "int16"
+    assert df["yield"].dtype == "float32"
+
+
+def test_trial_data_loader_validates_every_row(tmp_path: Path):
+    n = 200
+    df = pd.DataFrame(
+        {
+            "field_id": [f"F{i}" for i in range(n)],
+            "farm_id": "Farm1",
+            "region": "North",
+            "year": 2024,
+            "product": "A",
+            "yield": 60.0,
+            "lat": 40.0,
+        }
+    )
+    # bad rows well past any sampled prefix; a missing yield is valid
+    df.loc[120, "yield"] = None
+    df["year"] = df["year"].astype(object)
+    df.loc[150, "year"] = "twenty"
+    df.loc[[160, 170], "lat"] = 95.0
+    path = tmp_path / "bad.csv"
+    df.to_csv(path, index=False)
+
+    with pytest.raises(ValueError) as excinfo:
+        TrialDataLoader().load(path)
+
+    msg = str(excinfo.value)
+    assert "yield" not in msg
+    assert "column 'year' is not coercible to int: 1 row(s)" in msg
+    assert (
+        "column 'lat' is outside [-90, 90]: 2 row(s), first at index [160, 170]" in msg
+    )
+
+    # Without the invalid rows the file loads, keeping the blank yield
+    df.drop(index=[150, 160, 170]).to_csv(path, index=False)
+    loaded = TrialDataLoader().load(path)
+    assert loaded["yield"].isna().sum() == 1
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+from trialflow_agro.config.schema import ModelConfig
+from trialflow_agro.inference.moments import compute_moments
+from trialflow_agro.models.hierarchical import TrialModel
+
+pytest.importorskip("pymc")
+
+
+def _frame(seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    rows = []
+    for region, farms in {"North": ["Farm1", "Farm2"], "South": ["Farm3"]}.items():
+        for farm in farms:
+            for field in ["F1", "F2"]:
+                for product, effect in {"A": 0.0, "B": 5.0}.items():
+                    for _ in range(4):
+                        rows.append(
+                            {
+                                "field_id": field,
+                                "farm_id": farm,
+                                "region": region,
+                                "year": 2024,
+                                "product": product,
+                                "yield": 60.0 + effect + rng.normal(0, 1),
+                            }
+                        )
+    return pd.DataFrame(rows)
+
+
+def test_random_effect_levels_are_nested():
+    model = TrialModel(ModelConfig(backend="hierarchical"))
+    idx, coords = model._nested_levels(_frame(), ["region", "farm_id", "field_id"])
+
+    # "F1" exists on every farm: one unit per farm
+    assert len(coords["field_id"]) == 6
+    assert coords["field_id"][0] == "North/Farm1/F1"
+    assert idx["field_id"].max() == 5
+
+
+def test_sufficient_statistic_likelihood_matches_rows():
+    """Cell-level likelihood differs from the row-level one by a constant."""
+    from scipy import stats
+
+    df = _frame()
+    model = TrialModel(ModelConfig(backend="hierarchical"))
+    pm_model = model.build(compute_moments(df, model.moment_groups()))
+    logp = pm_model.compile_logp()
+
+    y = df["yield"].to_numpy()
+    z = (y - y.mean()) / y.std()
+    product_idx = (df["product"] == "B").to_numpy().astype(int)
+
+    def loglik_from_cells(product_z, tau):
+        # model log density minus the priors of the changed parameters
+        point = dict(
+            pm_model.initial_point(),
+            product_z=np.asarray(product_z),
+            tau_log__=np.log(tau),
+        )
+        prior = stats.norm(0, 2.5).logpdf(product_z).sum()
+        prior += stats.halfnorm().logpdf(tau) + np.log(tau)  # log-transform
+        return logp(point) - prior
+
+    def loglik_from_rows(product_z, tau):
+        mu = np.asarray(product_z)[product_idx]
+        return stats.norm(mu, tau).logpdf(z).sum()
+
+    a, b = ([0.0, 0.0], 1.0), ([-0.7, 0.9], 0.4)
+    assert loglik_from_cells(*a) - loglik_from_cells(*b) == pytest.approx(
+        loglik_from_rows(*a) - loglik_from_rows(*b)
+    )
+
+
+def test_advi_fit_recovers_product_effects():
+    from trialflow_agro.inference.bayes import fit_hierarchical
+
+    model = TrialModel(
+        ModelConfig(
+            backend="hierarchical",
+            hierarchical={"method": "advi", "advi_iterations": 3000, "draws": 200},
+        )
+    )
+    result = fit_hierarchical(model, compute_moments(_frame(), model.moment_groups()))
+
+    means = {e.name: e.mean for e in result.product_means}
+    assert means["product_mean[B]"] - means["product_mean[A]"] == pytest.approx(
+        5.0, abs=1.0
+    )
+    assert result.random_effects == ["region", "farm_id", "field_id"]
+    assert (result.n_observations, result.n_cells) == (48, 12)
+    assert result.sampling.iterations == 3000
+    assert result.sampling.loss_history
+    assert result.wall_time_seconds > 0
+
+
+def test_nuts_records_sampling_progress():
+    from trialflow_agro.inference.bayes import fit_hierarchical
+
+    model = TrialModel(
+        ModelConfig(
+            backend="hierarchical",
+            hierarchical={
+                "method": "nuts",
+                "draws": 50,
+                "tune": 50,
+                "chains": 2,
+                "cores": 1,
+            },
+        )
+    )
+    result = fit_hierarchical(model, compute_moments(_frame(), model.moment_groups()))
+
+    assert result.sampling.draws_per_chain == [50, 50]
+    assert result.sampling.divergences is not None
+    assert result.sampling.max_r_hat is not None
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_pipeline_writes_hierarchical_results(tmp_path: Path, streaming: bool):
+    from trialflow_agro.pipeline import Pipeline
+
+    data_path = tmp_path / "trials.csv"
+    _frame().to_csv(data_path, index=False)
+    config = {
+        "data": {"path": str(data_path), "streaming": streaming, "chunk_size": 10},
+        "model": {
+            "groups": ["product"],
+            "min_records_per_group": 1,
+            "backend": "hierarchical",
+            "hierarchical": {"advi_iterations": 500, "draws": 50},
+        },
+        "output": {"directory": str(tmp_path / "results")},
+    }
+    config_path = tmp_path / "config.yml"
+    config_path.write_text(yaml.safe_dump(config))
+
+    Pipeline(config_path=config_path).run()
+
+    results = json.loads((tmp_path / "results" / "results.json").read_text())
+    hierarchical = results["inference"]["hierarchical"]
+    assert hierarchical["method"] == "advi"
+    assert hierarchical["n_observations"] == len(_frame())
+    assert len(hierarchical["product_means"]) == 2
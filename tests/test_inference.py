@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import math
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from trialflow_agro.config.schema import QuantileConfig
+from trialflow_agro.inference import moments
+from trialflow_agro.inference.fit import TrialInference
+from trialflow_agro.inference.moments import (
+    MomentAccumulator,
+    compute_moments,
+    rollup_moments,
+)
+
+
+def _frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "product": ["A", "A", "A", "B", "B", "C"],
+            "region": ["North", "North", "South", "South", "South", "North"],
+            "yield": [60.0, 62.0, 70.0, 65.0, None, 55.0],
+        }
+    )
+
+
+def test_grouped_summaries_match_pandas():
+    result = TrialInference(groups=["product", "region"], min_records_per_group=1).run(
+        _frame()
+    )
+
+    by_groups = {
+        (s.group_values["product"], s.group_values["region"]): s
+        for s in result.by_groups
+    }
+    a_north = by_groups[("A", "North")]
+    assert a_north.n == 2
+    assert a_north.mean_yield == 61.0
+    assert math.isclose(a_north.std_yield, pd.Series([60.0, 62.0]).std())
+    assert (a_north.min_yield, a_north.max_yield) == (60.0, 62.0)
+
+    # single non-null record: no std; NaN yields are excluded from n
+    assert by_groups[("B", "South")].n == 1
+    assert by_groups[("B", "South")].std_yield is None
+
+
+def test_min_records_filter_uses_group_size():
+    result = TrialInference(groups=["product"], min_records_per_group=2).run(_frame())
+
+    assert [s.group_values["product"] for s in result.by_product] == ["A", "B"]
+
+
+def test_rollup_matches_direct_aggregation():
+    df = _frame()
+    moments = compute_moments(df, ["product", "region"])
+
+    rolled = rollup_moments(moments, ["product"])
+    direct = compute_moments(df, ["product"])
+    pd.testing.assert_frame_equal(rolled, direct, check_dtype=False)
+
+    overall = rollup_moments(moments, []).iloc[0]
+    assert overall["count"] == 5
+    assert math.isclose(overall["m2"], df["yield"].var() * 4)
+
+
+@pytest.mark.parametrize("backend", ["thread", "process"])
+def test_parallel_moments_identical_to_serial(backend: str):
+    rng = np.random.default_rng(0)
+    n = 5_000
+    df = pd.DataFrame(
+        {
+            "field_id": pd.Categorical(rng.integers(0, 700, n).astype(str)),
+            "product": rng.choice(["A", "B", "C", None], n),
+            "yield": rng.normal(60.0, 8.0, n),
+        }
+    )
+    df.loc[rng.integers(0, n, 50), "yield"] = np.nan
+
+    serial = compute_moments(df, ["field_id", "product"])
+    parallel = compute_moments(df, ["field_id", "product"], n_jobs=4, backend=backend)
+
+    pd.testing.assert_frame_equal(parallel, serial, check_exact=True)
+
+
+def test_moment_accumulator_reuses_one_pool(monkeypatch):
+    rng = np.random.default_rng(1)
+    n = 3_000
+    df = pd.DataFrame(
+        {
+            "field_id": rng.integers(0, 300, n).astype(str),
+            "yield": rng.normal(60.0, 8.0, n),
+        }
+    )
+    pools = []
+    make_pool = moments.make_pool
+
+    def counting_make_pool(n_jobs, backend):
+        pools.append(make_pool(n_jobs, backend))
+        return pools[-1]
+
+    monkeypatch.setattr(moments, "make_pool", counting_make_pool)
+    with closing(MomentAccumulator(["field_id"], n_jobs=2)) as accumulator:
+        for start in range(0, n, 500):
+            accumulator.update(df.iloc[start : start + 500])
+
+    assert len(pools) == 1
+    assert pools[0]._shutdown
+    pd.testing.assert_frame_equal(
+        accumulator.result(), compute_moments(df, ["field_id"])
+    )
+
+
+def test_tables_serialize_like_pydantic_result():
+    df = _frame()
+    engine = TrialInference(
+        groups=["product", "region"],
+        min_records_per_group=1,
+        quantiles=QuantileConfig(levels=[0.5]),
+    )
+    tables = engine.summarize_moments(engine.compute_moments(df), df)
+
+    result = tables.to_result()
+    assert tables.to_dict() == result.model_dump(mode="json")
+    assert [s.model_dump() for s in result.by_groups] == [
+        s.model_dump() for s in engine.run(df).by_groups
+    ]
+    assert result.by_groups[0].quantiles == {"0.5": 61.0}
+
+
+def test_empty_data_gives_an_empty_overall_summary():
+    empty = _frame().iloc[:0]
+    engine = TrialInference(groups=["product", "region"])
+
+    for result in (engine.run(empty), engine.run_chunks([empty])):
+        assert result.overall.n == 0
+        assert math.isnan(result.overall.mean_yield)
+        assert result.overall.std_yield is None
+        assert result.by_product == [] and result.by_groups == []
+
+    out = engine.summarize_moments(engine.compute_moments(empty)).to_dict()
+    assert out["overall"]["n"] == 0
+    assert math.isnan(out["overall"]["min_yield"])
+    assert len(rollup_moments(compute_moments(empty, ["product"]), [])) == 1
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+import yaml
+
+from trialflow_agro.data.loaders import TrialDataLoader
+from trialflow_agro.pipeline import Pipeline
+
+
+def _write_config(path: Path, base: Path, output=None, **model) -> Path:
+    cfg = yaml.safe_load(base.read_text())
+    cfg["model"].update(model)
+    cfg["output"].update(output or {})
+    path.write_text(yaml.safe_dump(cfg))
+    return path
+
+
+def _inference(out_dir: Path) -> dict:
+    return json.loads((out_dir / "results.json").read_text())["inference"]
+
+
+def test_intermediates_are_written(demo_config_path: Path, tmp_path: Path):
+    out_dir = tmp_path / "out"
+    Pipeline(config_path=demo_config_path, output_dir=out_dir).run()
+
+    intermediate = out_dir / "intermediate"
+    for name in ["manifest.json", "moments.parquet"]:
+        assert (intermediate / name).exists()
+    # The typed dataset copy is opt-in
+    assert not (intermediate / "data.parquet").exists()
+
+    config = _write_config(
+        tmp_path / "save_data.yml", demo_config_path, output={"save_data": True}
+    )
+    Pipeline(config_path=config, output_dir=out_dir).run()
+    assert (intermediate / "data.parquet").exists()
+
+
+@pytest.mark.parametrize(
+    "model",
+    [
+        {"min_records_per_group": 2},  # served from stored moments
+        {"groups": ["region", "year"]},  # needs the typed Parquet
+    ],
+)
+def test_later_runs_skip_raw_data(
+    demo_config_path: Path, tmp_path: Path, monkeypatch, model
+):
+    out_dir = tmp_path / "out"
+    saving = _write_config(
+        tmp_path / "save_data.yml", demo_config_path, output={"save_data": True}
+    )
+    Pipeline(config_path=saving, output_dir=out_dir).run()
+
+    config = _write_config(tmp_path / "changed.yml", demo_config_path, **model)
+    expected_dir = tmp_path / "fresh"
+    Pipeline(config_path=config, output_dir=expected_dir).run()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("raw data should not be read")
+
+    monkeypatch.setattr(TrialDataLoader, "load", fail)
+    Pipeline(config_path=config, output_dir=out_dir).run()
+
+    assert _inference(out_dir) == _inference(expected_dir)
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+from trialflow_agro.config.schema import QuantileConfig
+from trialflow_agro.inference.fit import TrialInference
+from trialflow_agro.inference.quantiles import (
+    compute_sketch,
+    exact_quantiles,
+    merge_sketches,
+    sketch_quantiles,
+)
+from trialflow_agro.pipeline import Pipeline
+
+LEVELS = [0.0, 0.1, 0.5, 0.9, 1.0]
+
+
+def _frame(seed: int = 0, rows: int = 3000) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "product": rng.choice(["A", "B", "C"], size=rows),
+            "region": rng.choice(["North", "South"], size=rows),
+            "yield": rng.lognormal(4.0, 0.5, size=rows),
+        }
+    )
+    df.loc[:4, "yield"] = np.nan
+    df.loc[5, "yield"] = -2.5
+    df.loc[6, "yield"] = 0.0
+    return df
+
+
+def _chunks(df: pd.DataFrame, n: int) -> list[pd.DataFrame]:
+    bounds = np.linspace(0, len(df), n + 1).astype(int)
+    return [df.iloc[lo:hi] for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+
+def test_exact_quantiles_match_pandas():
+    df = _frame()
+    table = exact_quantiles(df, ["product"], LEVELS)
+
+    expected = df.groupby("product")["yield"].quantile(0.9)
+    np.testing.assert_allclose(table["0.9"].to_numpy(), expected.to_numpy())
+
+
+def test_sketch_is_within_relative_error():
+    df = _frame()
+    table = sketch_quantiles(
+        compute_sketch(df, ["product", "region"], relative_error=0.01),
+        ["product"],
+        LEVELS,
+        relative_error=0.01,
+    )
+
+    for product, values in df.dropna().groupby("product")["yield"]:
+        ordered = np.sort(values.to_numpy())
+        for q in LEVELS:
+            exact = ordered[int(np.floor(q * (len(ordered) - 1)))]
+            assert abs(table.loc[product, f"{q:g}"] - exact) <= 0.01 * abs(exact)
+
+
+def test_sketches_merge_exactly():
+    df = _frame()
+    whole = compute_sketch(df, ["product"])
+    parts = merge_sketches(
+        [compute_sketch(part, ["product"]) for part in _chunks(df, 4)]
+    )
+
+    pd.testing.assert_frame_equal(parts, whole)
+
+
+@pytest.mark.parametrize("method", ["exact", "sketch"])
+def test_inference_reports_quantiles(method):
+    df = _frame()
+    engine = TrialInference(
+        groups=["product", "region"],
+        min_records_per_group=1,
+        quantiles=QuantileConfig(levels=[0.5], method=method),
+    )
+    result = engine.run(df)
+
+    median = df["yield"].median()
+    assert result.overall.quantiles["0.5"] == pytest.approx(median, rel=0.02)
+    assert all(s.quantiles["0.5"] is not None for s in result.by_groups)
+
+
+def test_chunked_run_uses_sketch():
+    df = _frame()
+    engine = TrialInference(
+        groups=["product"],
+        min_records_per_group=1,
+        quantiles=QuantileConfig(levels=[0.5]),
+    )
+    streamed = engine.run_chunks(_chunks(df, 5))
+    in_memory = engine.run(df)
+
+    for a, b in zip(streamed.by_product, in_memory.by_product):
+        assert a.quantiles["0.5"] == pytest.approx(b.quantiles["0.5"], rel=0.02)
+
+
+def test_streaming_pipeline_writes_quantiles(tmp_path, demo_data):
+    config = {
+        "data": {"path": str(demo_data), "streaming": True, "chunk_size": 2},
+        "model": {
+            "groups": ["product"],
+            "min_records_per_group": 1,
+            "quantiles": {"levels": [0.5]},
+        },
+        "output": {"directory": str(tmp_path / "results")},
+    }
+    config_path = tmp_path / "quantiles.yml"
+    config_path.write_text(yaml.safe_dump(config))
+
+    Pipeline(config_path=config_path).run()
+
+    results = json.loads((tmp_path / "results" / "results.json").read_text())
+    medians = {
+        s["group_values"]["product"]: s["quantiles"]["0.5"]
+        for s in results["inference"]["by_product"]
+    }
+    # lower-rank median of [60, 62] and [63, 65], within 1%
+    assert medians["A"] == pytest.approx(60.0, rel=0.01)
+    assert medians["B"] == pytest.approx(63.0, rel=0.01)
+
+
+@pytest.mark.parametrize("groups", [["treatment"], ["product", "treatment"]])
+def test_missing_group_keys_get_quantiles(groups):
+    df = _frame()
+    treatment = pd.Series(np.resize(["low", "high", None], len(df)), dtype="category")
+    df["treatment"] = treatment
+    # Distinct levels per treatment, so misaligned rows would show
+    df["yield"] = df["yield"] + treatment.map({"low": 0.0, "high": 100.0}).astype(
+        "float64"
+    ).fillna(200.0)
+    config = QuantileConfig(enabled=True, levels=[0.5])
+
+    by_method = {}
+    for method in ("exact", "sketch"):
+        engine = TrialInference(
+            groups=groups,
+            min_records_per_group=1,
+            quantiles=config.model_copy(update={"method": method}),
+        )
+        by_method[method] = engine.run(df).by_groups
+
+    # Expected medians, keyed with missing treatments as "-"
+    keyed = df.assign(treatment=df["treatment"].astype(object).fillna("-"))
+    expected = keyed.groupby(groups)["yield"].median().to_dict()
+    for method, summaries in by_method.items():
+        assert len(summaries) == len(expected)
+        for summary in summaries:
+            values = {
+                k: "-" if pd.isna(v) else v for k, v in summary.group_values.items()
+            }
+            key = tuple(values[col] for col in groups)
+            key = key[0] if len(key) == 1 else key
+            median = summary.quantiles["0.5"]
+            assert median is not None
+            if pd.isna(summary.group_values["treatment"]):
+                assert median > 200
+            rel = 1e-9 if method == "exact" else config.relative_error
+            assert median == pytest.approx(expected[key], rel=rel)
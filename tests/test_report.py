@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from xml.etree import ElementTree
+
+import pandas as pd
+import pytest
+import yaml
+
+from trialflow_agro.inference.diagnostics import DiagnosticsAccumulator
+from trialflow_agro.pipeline import Pipeline
+from trialflow_agro.reporting.report_builder import ReportBuilder
+
+
+def _fit(config_path: Path, out: Path, results_format: str = "json") -> Path:
+    cfg = yaml.safe_load(config_path.read_text())
+    cfg["model"]["groups"] = ["field_id"]
+    cfg["output"]["results_format"] = results_format
+    config_path.write_text(yaml.safe_dump(cfg))
+    Pipeline(config_path=config_path, output_dir=out).run()
+    return out
+
+
+def _first_column(html: str, table_id: str) -> list[str]:
+    table = html.split(f'<table id="{table_id}"')[1].split("</table>")[0]
+    return re.findall(r"<tr><td>([^<]*)</td>", table)
+
+
+@pytest.mark.parametrize("results_format", ["json", "parquet"])
+def test_report_truncates_to_sorted_top_rows(
+    demo_config_path: Path, tmp_path: Path, results_format: str
+):
+    out = _fit(demo_config_path, tmp_path / "out", results_format)
+    report = tmp_path / "report.html"
+    ReportBuilder(out, max_rows=1, sort_by="mean_yield").render(report)
+
+    html = report.read_text()
+    # F101 (mean 61) is the lowest-yielding field
+    assert _first_column(html, "by_groups") == ["F101"]
+    assert "Showing 1 of 2 rows, sorted by mean_yield (ascending)." in html
+    assert "<script>" not in html
+
+    ReportBuilder(out, max_rows=1, sort_by="mean_yield", descending=True).render(report)
+    assert _first_column(report.read_text(), "by_groups") == ["F102"]
+
+
+def test_report_pages_rows_into_json_chunks(demo_config_path: Path, tmp_path: Path):
+    out = _fit(demo_config_path, tmp_path / "out", "parquet")
+    report = tmp_path / "report.html"
+    ReportBuilder(out, max_rows=1, chunks=True).render(report)
+
+    html = report.read_text()
+    assert 'data-pages="2" data-src="report_data/by_groups"' in html
+    assert "Page 1 of 2" in html
+    chunk = json.loads((tmp_path / "report_data" / "by_groups-2.json").read_text())
+    assert [row[0] for row in chunk["rows"]] == ["F102"]
+
+
+def test_report_rejects_unknown_sort_column(demo_config_path: Path, tmp_path: Path):
+    out = _fit(demo_config_path, tmp_path / "out")
+    with pytest.raises(ValueError, match="Unknown sort column"):
+        ReportBuilder(out, sort_by="nope").render(tmp_path / "report.html")
+
+
+def test_yield_histogram_is_mergeable_and_persisted():
+    df = pd.DataFrame(
+        {
+            "product": ["A"] * 6,
+            "yield": [50.0, 55.0, 60.0, None, 61.0, 70.0],
+        }
+    )
+    whole = DiagnosticsAccumulator()
+    whole.update(df)
+    parts = DiagnosticsAccumulator()
+    parts.update(df.iloc[:3])
+    parts = DiagnosticsAccumulator.from_state(json.loads(json.dumps(parts.state())))
+    parts.update(df.iloc[3:])
+
+    histogram = whole.yield_histogram(n_bins=4)
+    assert histogram == parts.yield_histogram(n_bins=4)
+    assert sum(histogram["counts"]) == 5
+    assert len(histogram["edges"]) == 5
+    assert histogram["edges"][0] == pytest.approx(50.0, rel=0.01)
+    assert histogram["edges"][-1] == pytest.approx(70.0, rel=0.01)
+
+
+@pytest.mark.parametrize("results_format", ["json", "parquet"])
+def test_report_embeds_svg_charts(
+    demo_config_path: Path, tmp_path: Path, results_format: str
+):
+    out = _fit(demo_config_path, tmp_path / "out", results_format)
+    report = tmp_path / "report.html"
+    ReportBuilder(out).render(report)
+
+    html = report.read_text()
+    charts = re.findall(r"<svg .*?</svg>", html, flags=re.DOTALL)
+    assert len(charts) == 2
+    for chart in charts:
+        ElementTree.fromstring(chart)
+    assert "Yield distribution" in charts[0]
+    assert "Mean yield by product (mean ± 1 sd)" in charts[1]
+    assert "http" not in html.replace('xmlns="http://www.w3.org/2000/svg"', "")
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pandas as pd
+import pytest
+import yaml
+
+from trialflow_agro.pipeline import Pipeline
+from trialflow_agro.reporting.report_builder import ReportBuilder
+from trialflow_agro.results import MANIFEST_NAME, ResultsReader
+
+
+def _set_output(config_path: Path, **output) -> None:
+    cfg = yaml.safe_load(config_path.read_text())
+    cfg["output"].update(output)
+    cfg["model"]["groups"] = ["region", "product"]
+    cfg["model"]["quantiles"] = {"levels": [0.5]}
+    config_path.write_text(yaml.safe_dump(cfg))
+
+
+def test_parquet_results_match_json(demo_config_path: Path, tmp_path: Path):
+    _set_output(demo_config_path, results_format="both")
+    out = tmp_path / "out"
+    Pipeline(config_path=demo_config_path, output_dir=out).run()
+
+    results = json.loads((out / "results.json").read_text())
+    reader = ResultsReader(out)
+    assert reader.manifest["overall"] == results["inference"]["overall"]
+    assert reader.manifest["diagnostics"] == results["diagnostics"]
+    assert set(reader.table_names()) == {"by_product", "by_groups"}
+
+    rows = reader.rows("by_groups")
+    expected = results["inference"]["by_groups"]
+    assert [(r["region"], r["product"]) for r in rows] == [
+        (s["group_values"]["region"], s["group_values"]["product"]) for s in expected
+    ]
+    assert [r["mean_yield"] for r in rows] == [s["mean_yield"] for s in expected]
+    assert [r["yield_q0.5"] for r in rows] == [s["quantiles"]["0.5"] for s in expected]
+
+    # Column projection and batched reads
+    projected = reader.table("by_product", columns=["product", "n"])
+    assert projected.column_names == ["product", "n"]
+    batches = list(reader.iter_batches("by_groups", batch_size=1, columns=["n"]))
+    assert sum(b.num_rows for b in batches) == len(expected)
+
+
+def test_parquet_only_output_and_report(demo_config_path: Path, tmp_path: Path):
+    out = tmp_path / "out"
+    _set_output(demo_config_path, results_format="json")
+    Pipeline(config_path=demo_config_path, output_dir=out).run()
+    assert (out / "results.json").exists()
+
+    # Switching format removes the stale results.json
+    _set_output(demo_config_path, results_format="parquet")
+    Pipeline(config_path=demo_config_path, output_dir=out).run()
+    assert not (out / "results.json").exists()
+    assert (out / MANIFEST_NAME).exists()
+
+    report = tmp_path / "report.html"
+    ReportBuilder(out).render(report)
+    html = report.read_text()
+    assert "Per-Product Summary" in html
+    assert "yield_q0.5" in html
+
+
+def test_reader_unknown_table(demo_config_path: Path, tmp_path: Path):
+    _set_output(demo_config_path, results_format="parquet")
+    out = tmp_path / "out"
+    Pipeline(config_path=demo_config_path, output_dir=out).run()
+
+    reader = ResultsReader(out)
+    assert reader.rows("comparisons") == []
+    with pytest.raises(KeyError):
+        reader.table("comparisons")
+
+
+def test_parquet_results_keep_missing_group_keys(
+    demo_config_path: Path, demo_data: Path, tmp_path: Path
+):
+    df = pd.read_csv(demo_data)
+    df["treatment"] = ["T1", None, "T1", None]
+    df.to_csv(demo_data, index=False)
+    _set_output(demo_config_path, results_format="both")
+    cfg = yaml.safe_load(demo_config_path.read_text())
+    cfg["model"]["groups"] = ["product", "treatment"]
+    demo_config_path.write_text(yaml.safe_dump(cfg))
+    out = tmp_path / "out"
+    Pipeline(config_path=demo_config_path, output_dir=out).run()
+
+    expected = json.loads((out / "results.json").read_text())["inference"]
+    rows = ResultsReader(out).rows("by_groups")
+    assert [(r["product"], r["treatment"]) for r in rows] == [
+        ("A", "T1"),
+        ("A", None),
+        ("B", "T1"),
+        ("B", None),
+    ]
+    assert [r["n"] for r in rows] == [s["n"] for s in expected["by_groups"]]
+
+    report = tmp_path / "report.html"
+    ReportBuilder(out).render(report)
+    assert "Per-Product Summary" in report.read_text()
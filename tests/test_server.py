@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+
+import pytest
+import yaml
+
+from trialflow_agro.data.loaders import TrialDataLoader
+from trialflow_agro.server import FitClient, FitServer, UnixFitClient
+
+
+@pytest.fixture
+def server():
+    srv = FitServer(port=0, workers=2, cache_entries=2)
+    thread = threading.Thread(target=srv.run, daemon=True)
+    thread.start()
+    assert srv.ready.wait(10)
+    yield srv
+    srv.stop()
+    thread.join(10)
+
+
+def _config(demo_config_path: Path) -> dict:
+    return yaml.safe_load(demo_config_path.read_text())
+
+
+def test_fit_reuses_cached_dataset_across_groupings(
+    server: FitServer, demo_config_path: Path, monkeypatch
+):
+    loads = []
+    original = TrialDataLoader.load
+
+    def counting_load(self, path):
+        loads.append(path)
+        return original(self, path)
+
+    monkeypatch.setattr(TrialDataLoader, "load", counting_load)
+    client = FitClient(port=server.port)
+    cfg = _config(demo_config_path)
+
+    first = client.fit(cfg)
+    cfg["model"]["groups"] = ["product", "region"]
+    second = client.fit(cfg)
+
+    assert (first["dataset_cache"], second["dataset_cache"]) == ("miss", "hit")
+    assert len(loads) == 1
+    assert len(first["results"]["inference"]["by_groups"]) == 2
+    groups = second["results"]["inference"]["by_groups"]
+    assert {tuple(g["group_values"].values()) for g in groups} == {
+        ("A", "North"),
+        ("B", "South"),
+    }
+    # Nothing is written unless requested
+    assert not Path(cfg["output"]["directory"]).exists()
+    assert client.health()["cache"]["hits"] == 1
+
+
+def test_modified_dataset_is_reloaded(server: FitServer, demo_config_path: Path):
+    client = FitClient(port=server.port)
+    cfg = _config(demo_config_path)
+    client.fit(cfg)
+
+    data = Path(cfg["data"]["path"])
+    data.write_text(data.read_text().replace("60.0", "70.0"))
+    stat = data.stat()
+    os.utime(data, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    result = client.fit(cfg)
+    assert result["dataset_cache"] == "miss"
+    assert result["results"]["inference"]["overall"]["max_yield"] == 70.0
+    assert client.health()["cache"]["entries"] == 1
+
+
+def test_write_and_errors(server: FitServer, demo_config_path: Path):
+    client = FitClient(port=server.port)
+    cfg = _config(demo_config_path)
+    client.fit(cfg, write=True)
+    assert (Path(cfg["output"]["directory"]) / "results.json").exists()
+
+    cfg["model"]["groups"] = ["not_a_column"]
+    status, body = client.request("POST", "/fit", {"config": cfg})
+    assert status == 400 and "error" in body
+
+    cfg["data"]["path"] = "missing.csv"
+    status, _ = client.request("POST", "/fit", {"config": cfg})
+    assert status == 404
+    assert client.request("GET", "/nope")[0] == 404
+
+
+@pytest.mark.skipif(os.name != "posix", reason="Unix sockets")
+def test_unix_socket(demo_config_path: Path, tmp_path: Path):
+    socket_path = tmp_path / "fit.sock"
+    srv = FitServer(socket_path=socket_path)
+    thread = threading.Thread(target=srv.run, daemon=True)
+    thread.start()
+    assert srv.ready.wait(10)
+    try:
+        result = UnixFitClient(socket_path).fit(_config(demo_config_path))
+        assert result["status"] == "ok"
+    finally:
+        srv.stop()
+        thread.join(10)
+    assert not socket_path.exists()
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+from trialflow_agro.config.schema import SpatialConfig
+from trialflow_agro.inference.spatial import SpatialAnalysis, morans_i
+from trialflow_agro.pipeline import Pipeline
+from trialflow_agro.reporting.report_builder import ReportBuilder
+
+
+def _dense_morans_i(coords: np.ndarray, values: np.ndarray, k: int) -> float:
+    d = np.linalg.norm(coords[:, None] - coords[None], axis=2)
+    np.fill_diagonal(d, np.inf)
+    w = np.zeros_like(d)
+    nearest = np.argsort(d, axis=1)[:, :k]
+    np.put_along_axis(w, nearest, 1.0 / k, axis=1)
+    z = values - values.mean()
+    return len(z) / w.sum() * (z @ w @ z) / (z @ z)
+
+
+def test_morans_i_matches_dense_and_detects_clustering():
+    rng = np.random.default_rng(1)
+    coords = rng.uniform(0, 1000, size=(300, 2))
+    noise = rng.normal(size=300)
+    trend = coords[:, 0] / 100 + noise * 0.1
+
+    result = morans_i(coords, noise, k=6)
+    assert result.statistic == pytest.approx(_dense_morans_i(coords, noise, 6))
+    assert result.expected == pytest.approx(-1 / 299)
+    assert result.p_value > 0.01
+
+    clustered = morans_i(coords, trend, k=6)
+    assert clustered.statistic == pytest.approx(_dense_morans_i(coords, trend, 6))
+    assert clustered.statistic > 0.8 and clustered.p_value < 1e-6
+
+
+def _spatial_frame(n: int = 400, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    lat = 41.0 + rng.uniform(0, 0.01, n)
+    lon = -93.0 + rng.uniform(0, 0.01, n)
+    df = pd.DataFrame(
+        {
+            "field_id": "F1",
+            "farm_id": "Farm1",
+            "region": "North",
+            "year": 2024,
+            "product": rng.choice(["A", "B"], n),
+            "yield": 60 + (lon + 93.0) * 1000 + rng.normal(0, 0.5, n),
+            "lat": lat,
+            "lon": lon,
+        }
+    )
+    df.loc[:4, ["lat", "lon"]] = np.nan
+    return df
+
+
+def _write_boundaries(path: Path) -> None:
+    def square(lon0, lat0, lon1, lat1):
+        return [[[lon0, lat0], [lon1, lat0], [lon1, lat1], [lon0, lat1], [lon0, lat0]]]
+
+    features = [
+        {
+            "type": "Feature",
+            "properties": {"name": name},
+            "geometry": {"type": "Polygon", "coordinates": square(*bounds)},
+        }
+        for name, bounds in [
+            ("west", (-93.0, 41.0, -92.995, 41.01)),
+            ("east", (-92.995, 41.0, -92.992, 41.01)),
+        ]
+    ]
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": features}))
+
+
+def test_polygon_zones_match_point_in_polygon(tmp_path: Path):
+    boundaries = tmp_path / "fields.geojson"
+    _write_boundaries(boundaries)
+    df = _spatial_frame()
+    analysis = SpatialAnalysis(
+        SpatialConfig(
+            enabled=True,
+            zones="polygons",
+            boundaries=boundaries,
+            zone_column="name",
+            crs="EPSG:4326",
+        )
+    )
+    zones, _ = analysis.zones(df)
+
+    expected = np.where(
+        df["lon"] <= -92.995, "west", np.where(df["lon"] <= -92.992, "east", "-")
+    )
+    expected[df["lat"].isna().to_numpy()] = "-"
+    assigned = pd.Series(zones.zone).astype(object).fillna("-")
+    assert assigned.tolist() == expected.tolist()
+    assert zones.n_unassigned == int((expected == "-").sum())
+
+
+@pytest.mark.parametrize("results_format", ["json", "parquet"])
+def test_pipeline_spatial_summaries_and_report(
+    demo_config_path: Path, tmp_path: Path, results_format: str
+):
+    data = tmp_path / "spatial.csv"
+    _spatial_frame().to_csv(data, index=False)
+    cfg = yaml.safe_load(demo_config_path.read_text())
+    cfg["data"]["path"] = str(data)
+    cfg["model"]["spatial"] = {
+        "enabled": True,
+        "cell_size": 250.0,
+        "group_by": ["product"],
+    }
+    cfg["output"]["results_format"] = results_format
+    demo_config_path.write_text(yaml.safe_dump(cfg))
+    out = tmp_path / "out"
+
+    pipeline = Pipeline(config_path=demo_config_path, output_dir=out)
+    pipeline.run()
+
+    report = tmp_path / "report.html"
+    ReportBuilder(out).render(report)
+    html = report.read_text()
+    assert "Spatial Zones" in html and "morans_i" in html
+
+    if results_format == "json":
+        spatial = json.loads((out / "results.json").read_text())["inference"]["spatial"]
+        zones = spatial["zones"]
+    else:
+        from trialflow_agro.results import ResultsReader
+
+        reader = ResultsReader(out)
+        spatial = reader.manifest["spatial"]
+        zones = reader.rows("spatial_zones")
+    assert spatial["crs"] == "EPSG:32615"
+    assert spatial["n_unassigned"] == 5
+    assert sum(z["n"] for z in zones) == spatial["n_assigned"] == 395
+    # A west-east yield trend within one field: strongly autocorrelated
+    assert spatial["moran"]["statistic"] > 0.5
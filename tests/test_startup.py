@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+import yaml
+
+from trialflow_agro.pipeline import Pipeline
+
+# The import time budget is checked by benchmarks/bench_cli_startup.py
+# --budget-ms; wall-clock assertions would be flaky here
+HEAVY_MODULES = ["pandas", "numpy", "pyarrow", "pymc", "arviz", "geopandas"]
+
+
+def _python(code: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def test_cli_import_is_lazy():
+    proc = _python("import trialflow_agro.cli.main")
+    imported = set()
+    for line in proc.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+\d+ \|\s*(\S+)", line)
+        if match:
+            imported.add(match.group(1))
+
+    assert "trialflow_agro.cli.main" in imported
+    assert not [m for m in HEAVY_MODULES if m in imported]
+
+
+def test_package_root_is_lazy():
+    proc = _python(
+        "import sys, trialflow_agro\n"
+        "assert 'pandas' not in sys.modules\n"
+        "assert trialflow_agro.Pipeline.__name__ == 'Pipeline'\n"
+        "print('pandas' in sys.modules)"
+    )
+    assert proc.stdout.strip() == "True"
+
+
+@pytest.mark.parametrize("results_format", ["json", "parquet"])
+def test_report_command_does_not_import_pandas(
+    demo_config_path: Path, tmp_path: Path, results_format: str
+):
+    cfg = yaml.safe_load(demo_config_path.read_text())
+    cfg["output"]["results_format"] = results_format
+    demo_config_path.write_text(yaml.safe_dump(cfg))
+    out = tmp_path / "out"
+    Pipeline(config_path=demo_config_path, output_dir=out).run()
+
+    report = tmp_path / "report.html"
+    args = ["report", str(out), "--out", str(report), "--sort-by", "mean_yield"]
+    proc = _python(
+        "import sys\n"
+        "from trialflow_agro.cli.main import app\n"
+        f"app({args!r}, standalone_mode=False)\n"
+        "print(sorted(m for m in sys.modules if m.split('.')[0] == 'pandas'))"
+    )
+    assert proc.stdout.strip().splitlines()[-1] == "[]"
+    assert report.exists()
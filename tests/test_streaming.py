@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import json
+import math
+from pathlib import Path
+
+import pandas as pd
+import pytest
+import yaml
+
+from trialflow_agro.data.loaders import TrialDataLoader
+from trialflow_agro.inference.fit import TrialInference
+from trialflow_agro.pipeline import Pipeline
+
+
+def _assert_same_summaries(a, b):
+    assert len(a) == len(b)
+    for x, y in zip(a, b):
+        assert x.group_values == y.group_values
+        assert x.n == y.n
+        assert math.isclose(x.mean_yield, y.mean_yield)
+        assert (x.std_yield is None) == (y.std_yield is None)
+        if x.std_yield is not None:
+            assert math.isclose(x.std_yield, y.std_yield)
+        assert (x.min_yield, x.max_yield) == (y.min_yield, y.max_yield)
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+def test_chunked_inference_matches_in_memory(demo_data: Path, suffix: str):
+    path = demo_data
+    if suffix == ".parquet":
+        path = demo_data.with_suffix(".parquet")
+        pd.read_csv(demo_data).to_parquet(path, index=False)
+
+    loader = TrialDataLoader()
+    engine = TrialInference(groups=["product", "region"], min_records_per_group=1)
+
+    expected = engine.run(loader.load(path))
+    streamed = engine.run_chunks(loader.iter_chunks(path, chunk_size=3))
+
+    _assert_same_summaries([expected.overall], [streamed.overall])
+    _assert_same_summaries(expected.by_product, streamed.by_product)
+    _assert_same_summaries(expected.by_groups, streamed.by_groups)
+
+
+def test_pipeline_streaming_mode(demo_config_path: Path, tmp_path: Path):
+    cfg = yaml.safe_load(demo_config_path.read_text())
+    cfg["data"].update({"streaming": True, "chunk_size": 1})
+    streaming_config = tmp_path / "streaming.yml"
+    streaming_config.write_text(yaml.safe_dump(cfg))
+
+    Pipeline(config_path=demo_config_path, output_dir=tmp_path / "a").run()
+    Pipeline(config_path=streaming_config, output_dir=tmp_path / "b").run()
+
+    in_memory = json.loads((tmp_path / "a" / "results.json").read_text())
+    streamed = json.loads((tmp_path / "b" / "results.json").read_text())
+    assert streamed["diagnostics"] == in_memory["diagnostics"]
+    assert streamed["inference"] == in_memory["inference"]
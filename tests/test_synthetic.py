@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from typer.testing import CliRunner
+
+from trialflow_agro.cli.main import app
+from trialflow_agro.data import synthetic
+from trialflow_agro.data.loaders import TrialDataLoader
+from trialflow_agro.data.schema import OPTIONAL_COLUMNS, REQUIRED_COLUMNS
+from trialflow_agro.data.synthetic import (
+    SyntheticTrialSpec,
+    generate_trial_data,
+    iter_synthetic,
+    write_synthetic,
+)
+from trialflow_agro.inference.fit import TrialInference
+
+
+def test_generator_is_seeded_and_blockwise(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(synthetic, "BLOCK_ROWS", 1000)
+    spec = SyntheticTrialSpec(rows=2500, seed=7)
+    df = generate_trial_data(spec)
+
+    assert [len(b) for b in iter_synthetic(spec)] == [1000, 1000, 500]
+    pd.testing.assert_frame_equal(df, generate_trial_data(spec))
+    assert not df.equals(generate_trial_data(spec.model_copy(update={"seed": 8})))
+    # A longer dataset extends a shorter one with the same seed
+    longer = generate_trial_data(spec.model_copy(update={"rows": 3000}))
+    pd.testing.assert_frame_equal(longer.iloc[:2500], df)
+
+
+def test_generated_structure_and_missingness():
+    spec = SyntheticTrialSpec(
+        rows=50_000, regions=3, farms=12, fields=60, missing_optional=0.1
+    )
+    df = generate_trial_data(spec)
+
+    assert list(df.columns) == [*REQUIRED_COLUMNS, *OPTIONAL_COLUMNS]
+    assert not df[REQUIRED_COLUMNS].isna().any().any()
+    # Fields nest in farms, farms in regions
+    assert (df.groupby("field_id", observed=True)["farm_id"].nunique() == 1).all()
+    assert (df.groupby("farm_id", observed=True)["region"].nunique() == 1).all()
+    assert df["field_id"].nunique() == 60
+    # Each field-year holds a strip trial of products_per_field products
+    per_field_year = df.groupby(["field_id", "year"], observed=True)["product"]
+    assert (per_field_year.nunique() == spec.products_per_field).all()
+    for col in ("treatment", "variety", "soil_class"):
+        assert df[col].isna().mean() == pytest.approx(0.1, abs=0.01)
+    assert df["lat"].isna().mean() == pytest.approx(0.005, abs=0.002)
+    assert (df["lat"].isna() == df["lon"].isna()).all()
+
+    # Product effects are recoverable from the summaries
+    result = TrialInference(groups=["product"]).run(df)
+    means = [s.mean_yield for s in result.by_product]
+    assert np.ptp(means) > 1.0
+
+
+@pytest.mark.parametrize("suffix", ["csv", "parquet"])
+def test_written_files_load_and_validate(tmp_path: Path, suffix: str):
+    spec = SyntheticTrialSpec(rows=3000, seed=1)
+    path = write_synthetic(spec, tmp_path / f"trial.{suffix}")
+
+    loaded = TrialDataLoader().load(path)
+    expected = generate_trial_data(spec)
+    assert len(loaded) == 3000
+    np.testing.assert_allclose(loaded["yield"], expected["yield"])
+    assert loaded["variety"].astype(object).equals(expected["variety"].astype(object))
+
+
+def test_cli_generate(tmp_path: Path):
+    out = tmp_path / "synthetic.parquet"
+    result = CliRunner().invoke(
+        app, ["generate", str(out), "--rows", "500", "--seed", "3"]
+    )
+
+    assert result.exit_code == 0, result.output
+    assert len(TrialDataLoader().load(out)) == 500
+
+    bad = CliRunner().invoke(app, ["generate", str(tmp_path / "synthetic.txt")])
+    assert bad.exit_code == 1
+    assert "Unsupported format" in bad.output
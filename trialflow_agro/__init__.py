@@ -1,9 +1,41 @@
 """
 trialflow-agro
 A reproducible workflow framework for analyzing on-farm agricultural trials.
+
+The main entry points are available from the package root and imported on
+first access, so `import trialflow_agro` stays cheap.
 """
 
 from __future__ import annotations
 
-__all__ = ["__version__"]
+import importlib
+
+__all__ = [
+    "BatchPipeline",
+    "Pipeline",
+    "ReportBuilder",
+    "ResultsReader",
+    "TrialInference",
+    "__version__",
+]
 __version__ = "0.1.0"
+
+_LAZY = {
+    "BatchPipeline": "trialflow_agro.batch",
+    "Pipeline": "trialflow_agro.pipeline",
+    "ReportBuilder": "trialflow_agro.reporting.report_builder",
+    "ResultsReader": "trialflow_agro.results",
+    "TrialInference": "trialflow_agro.inference.fit",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted([*globals(), *_LAZY])
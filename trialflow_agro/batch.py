@@ -0,0 +1,282 @@
+"""
+Batch execution of many trialflow-agro configs.
+
+Configs reading the same dataset share one load: the dataset is loaded
+and validated once, with the columns all of them need, and every config
+then runs as its own task against that copy. With a process pool the
+shared copy is written as a typed Parquet file that each worker reads
+(once per worker) instead of the raw data file.
+"""
+
+from __future__ import annotations
+
+import glob
+import json
+import tempfile
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Literal, Optional, Sequence, Tuple, TypeVar
+
+import pandas as pd
+from pydantic import BaseModel, Field
+
+from trialflow_agro.config.schema import ConfigLoader
+from trialflow_agro.data.loaders import TrialDataLoader
+from trialflow_agro.pipeline import Pipeline
+
+T = TypeVar("T")
+
+# (resolved data path, yield dtype) identifying a shareable dataset
+_DataKey = Tuple[str, str]
+
+# Typed copies of shared datasets already read by this (worker) process
+_DATASETS: Dict[str, pd.DataFrame] = {}
+
+
+class BatchRunStatus(BaseModel):
+    """Outcome of one config in a batch."""
+
+    config: str
+    status: Literal["ok", "error"]
+    seconds: float
+    output_dir: Optional[str] = None
+    data_path: Optional[str] = None
+    # Time spent loading the dataset, shared by all configs reading it
+    shared_load_seconds: Optional[float] = None
+    cache_status: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BatchSummary(BaseModel):
+    """Status and timing summary for a whole batch."""
+
+    workers: int
+    total_seconds: float
+    n_ok: int
+    n_error: int
+    runs: List[BatchRunStatus] = Field(default_factory=list)
+
+    def write(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.model_dump(mode="json"), indent=2))
+
+
+def discover_configs(source: str) -> List[Path]:
+    """Resolve a directory (all *.yml / *.yaml inside) or a glob pattern."""
+    path = Path(source)
+    if path.is_dir():
+        found = [*path.glob("*.yml"), *path.glob("*.yaml")]
+    else:
+        found = [Path(p) for p in glob.glob(source)]
+    return sorted(found)
+
+
+class _SharedDataset:
+    """A dataset read by several configs of a batch."""
+
+    def __init__(self, key: _DataKey) -> None:
+        self.key = key
+        self.configs: List[str] = []
+        self.columns: List[str] = []
+
+    def add(self, config_path: Path) -> None:
+        columns = Pipeline(config_path=config_path).data_columns()
+        self.configs.append(str(config_path))
+        for col in columns:
+            if col not in self.columns:
+                self.columns.append(col)
+
+
+class BatchPipeline:
+    """
+    Runs a batch of configs across a process pool.
+
+    - Configs reading the same data file (with the same dtype settings)
+      share one load of it, with the columns any of them needs
+    - Every config runs as its own task, so configs sharing a dataset
+      still spread across the workers
+    - Chunked (streaming) configs always read their data themselves
+    - A failing config is reported in the summary without stopping the batch
+    """
+
+    def __init__(self, config_paths: Sequence[Path], workers: int = 1) -> None:
+        self.config_paths = list(config_paths)
+        self.workers = max(1, workers)
+
+    def run(self) -> BatchSummary:
+        start = time.perf_counter()
+        unshared, shared, statuses = self._plan()
+
+        n_runs = len(unshared) + sum(len(d.configs) for d in shared)
+        if self.workers == 1 or n_runs <= 1:
+            statuses.extend(_run_config(path) for path in unshared)
+            for dataset in shared:
+                statuses.extend(_run_shared_serial(dataset))
+        else:
+            statuses.extend(self._run_pool(unshared, shared))
+
+        order = {str(p): i for i, p in enumerate(self.config_paths)}
+        statuses.sort(key=lambda s: order.get(s.config, len(order)))
+        n_ok = sum(s.status == "ok" for s in statuses)
+        return BatchSummary(
+            workers=self.workers,
+            total_seconds=time.perf_counter() - start,
+            n_ok=n_ok,
+            n_error=len(statuses) - n_ok,
+            runs=statuses,
+        )
+
+    def _plan(
+        self,
+    ) -> Tuple[List[str], List[_SharedDataset], List[BatchRunStatus]]:
+        """
+        Group configs by shared dataset.
+
+        Returns (unshared config paths, shared datasets, statuses of configs
+        that already failed to load).
+        """
+        datasets: Dict[_DataKey, _SharedDataset] = {}
+        unshared: List[str] = []
+        statuses: List[BatchRunStatus] = []
+
+        for path in self.config_paths:
+            cfg, exc = _attempt(ConfigLoader().load, path)
+            if exc is None and cfg.data.streaming:
+                unshared.append(str(path))
+            elif exc is None:
+                key = (str(cfg.data.path.resolve()), cfg.data.yield_dtype)
+                _, exc = _attempt(
+                    datasets.setdefault(key, _SharedDataset(key)).add, path
+                )
+            if exc is not None:
+                statuses.append(_error_status(path, 0.0, exc))
+
+        shared: List[_SharedDataset] = []
+        for dataset in datasets.values():
+            if len(dataset.configs) <= 1:
+                # Nothing to share; the pipeline loads just what it needs
+                unshared.extend(dataset.configs)
+            else:
+                shared.append(dataset)
+        return unshared, shared, statuses
+
+    def _run_pool(
+        self, unshared: List[str], shared: List[_SharedDataset]
+    ) -> List[BatchRunStatus]:
+        statuses: List[BatchRunStatus] = []
+        with (
+            tempfile.TemporaryDirectory() as tmp,
+            ProcessPoolExecutor(max_workers=self.workers) as pool,
+        ):
+            # Load each shared dataset once, in parallel with the other
+            # datasets, into a typed Parquet copy
+            spills = {
+                dataset.key: pool.submit(
+                    _spill,
+                    dataset.key,
+                    dataset.columns,
+                    str(Path(tmp) / f"dataset_{i}.parquet"),
+                )
+                for i, dataset in enumerate(shared)
+            }
+            runs: List[Future] = [pool.submit(_run_config, path) for path in unshared]
+            for dataset in shared:
+                spilled, exc = _attempt(spills[dataset.key].result)
+                if exc is not None:
+                    statuses.extend(
+                        _error_status(Path(p), 0.0, exc) for p in dataset.configs
+                    )
+                    continue
+                typed_path, load_seconds = spilled
+                runs.extend(
+                    pool.submit(
+                        _run_shared, path, dataset.key[0], typed_path, load_seconds
+                    )
+                    for path in dataset.configs
+                )
+            statuses.extend(run.result() for run in runs)
+        return statuses
+
+
+def _load(key: _DataKey, columns: List[str]) -> pd.DataFrame:
+    data_path, yield_dtype = key
+    return TrialDataLoader(columns=columns, yield_dtype=yield_dtype).load(
+        Path(data_path)
+    )
+
+
+def _spill(key: _DataKey, columns: List[str], typed_path: str) -> Tuple[str, float]:
+    """Worker entry point: load a shared dataset, write its typed copy."""
+    start = time.perf_counter()
+    _load(key, columns).to_parquet(typed_path, index=False)
+    return typed_path, time.perf_counter() - start
+
+
+def _run_shared(
+    config_path: str, data_path: str, typed_path: str, load_seconds: float
+) -> BatchRunStatus:
+    """Worker entry point: run one config on a shared dataset's typed copy."""
+    data = _DATASETS.get(typed_path)
+    if data is None:
+        data = _DATASETS[typed_path] = pd.read_parquet(typed_path)
+    return _run_config(config_path, data, data_path, load_seconds)
+
+
+def _run_shared_serial(dataset: _SharedDataset) -> List[BatchRunStatus]:
+    start = time.perf_counter()
+    data, exc = _attempt(_load, dataset.key, dataset.columns)
+    if exc is not None:
+        elapsed = time.perf_counter() - start
+        return [_error_status(Path(p), elapsed, exc) for p in dataset.configs]
+    load_seconds = time.perf_counter() - start
+    return [
+        _run_config(path, data, dataset.key[0], load_seconds)
+        for path in dataset.configs
+    ]
+
+
+def _run_config(
+    config_path: str,
+    data: Optional[pd.DataFrame] = None,
+    data_path: Optional[str] = None,
+    load_seconds: Optional[float] = None,
+) -> BatchRunStatus:
+    """Worker entry point: run one config, on `data` when it is shared."""
+    start = time.perf_counter()
+    pipeline = Pipeline(config_path=Path(config_path))
+    _, exc = _attempt(pipeline.run, data)
+    if exc is not None:
+        return _error_status(Path(config_path), time.perf_counter() - start, exc)
+    return BatchRunStatus(
+        config=config_path,
+        status="ok",
+        seconds=time.perf_counter() - start,
+        output_dir=str(pipeline.output_dir),
+        data_path=data_path,
+        shared_load_seconds=load_seconds,
+        cache_status=pipeline.cache_status,
+    )
+
+
+def _attempt(fn: Callable[..., T], *args) -> Tuple[Optional[T], Optional[Exception]]:
+    """
+    Call `fn`, returning (result, None) or (None, the exception raised).
+
+    A config can fail anywhere (YAML, data validation, the fit, writing);
+    the batch reports every such failure in its summary and carries on
+    with the other configs, so any Exception is caught here.
+    """
+    try:
+        return fn(*args), None
+    except Exception as exc:  # noqa: BLE001 - reported per config, see above
+        return None, exc
+
+
+def _error_status(path: Path, seconds: float, exc: Exception) -> BatchRunStatus:
+    return BatchRunStatus(
+        config=str(path),
+        status="error",
+        seconds=seconds,
+        error=f"{type(exc).__name__}: {exc}",
+    )
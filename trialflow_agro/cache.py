@@ -0,0 +1,155 @@
+"""
+Content-addressed result cache for trialflow-agro.
+
+A pipeline run is identified by:
+- a SHA-256 of the input data file contents (and of the spatial boundary
+  file, if any)
+- the validated TrialflowConfig (excluding cache settings)
+- the trialflow-agro version
+
+If all three match a previous run, the cached results.json is restored
+instead of recomputing. Content hashes are remembered per file together
+with its size and mtime, so unchanged files are not re-hashed.
+
+Entries live in a local directory and are evicted least-recently-used
+once the directory grows past its size budget.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional
+
+from trialflow_agro import __version__
+from trialflow_agro.config.schema import TrialflowConfig
+
+_HASH_BLOCK_SIZE = 1 << 20
+
+
+class ResultCache:
+    """
+    Local directory cache of results.json files keyed by run fingerprint.
+
+    Layout:
+    - entries/<key>.json   cached results
+    - fingerprints.json    path -> (size, mtime_ns, sha256) of hashed data files
+    - stats.json           cumulative hit / miss counters
+    """
+
+    def __init__(self, directory: Path, max_bytes: int) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._entries = directory / "entries"
+
+    def key(self, cfg: TrialflowConfig) -> str:
+        """Fingerprint of a run: data contents + config + package version."""
+        fingerprint = {
+            "data_sha256": self.file_digest(cfg.data.path),
+            "config": cfg.model_dump(mode="json", exclude={"cache"}),
+            "version": __version__,
+        }
+        spatial = cfg.model.spatial
+        if spatial.enabled and spatial.boundaries is not None:
+            fingerprint["boundaries_sha256"] = self.file_digest(spatial.boundaries)
+        payload = json.dumps(fingerprint, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, dest: Path) -> bool:
+        """Copy the cached results for `key` to `dest`; return whether it was a hit."""
+        entry = self._entries / f"{key}.json"
+        if not entry.exists():
+            self._record("misses")
+            return False
+
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(entry, dest)
+        # Refresh recency for LRU eviction
+        os.utime(entry)
+        self._record("hits")
+        return True
+
+    def put(self, key: str, results_path: Path) -> None:
+        """Store a results file under `key` and evict old entries if needed."""
+        self._entries.mkdir(parents=True, exist_ok=True)
+        _atomic_write(self._entries / f"{key}.json", results_path.read_bytes())
+        self._evict()
+
+    def stats(self) -> Dict[str, int]:
+        """Cumulative hit / miss counters for this cache directory."""
+        return _read_json(self.directory / "stats.json") or {"hits": 0, "misses": 0}
+
+    def file_digest(self, path: Path) -> str:
+        """
+        SHA-256 of a file's contents, reusing the stored digest when the
+        file's size and mtime are unchanged since it was last hashed.
+        """
+        index_path = self.directory / "fingerprints.json"
+        index = _read_json(index_path) or {}
+        name = str(path.resolve())
+
+        fingerprint = file_fingerprint(path, known=index.get(name))
+        if index.get(name) != fingerprint:
+            index[name] = fingerprint
+            _atomic_write(index_path, json.dumps(index).encode("utf-8"))
+        return fingerprint["sha256"]
+
+    def _record(self, counter: str) -> None:
+        stats = self.stats()
+        stats[counter] += 1
+        _atomic_write(self.directory / "stats.json", json.dumps(stats).encode("utf-8"))
+
+    def _evict(self) -> None:
+        entries = sorted(
+            (p.stat().st_mtime_ns, p.stat().st_size, p)
+            for p in self._entries.glob("*.json")
+        )
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+def file_fingerprint(path: Path, known: Optional[dict] = None) -> Dict[str, object]:
+    """
+    Size, mtime and SHA-256 of a file.
+
+    If `known` is a previous fingerprint of the same file with matching
+    size and mtime, its digest is reused instead of re-hashing the file.
+    """
+    st = path.stat()
+    if known and known["size"] == st.st_size and known["mtime_ns"] == st.st_mtime_ns:
+        return known
+
+    digest = hashlib.sha256()
+    with path.open("rb") as fh:
+        for block in iter(lambda: fh.read(_HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+
+    return {
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "sha256": digest.hexdigest(),
+    }
+
+
+def _read_json(path: Path) -> Optional[dict]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    """Write via a temp file + rename so concurrent readers never see partial data."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    with os.fdopen(fd, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp, path)
@@ -2,20 +2,24 @@
 Typer-based CLI entry point for trialflow-agro.
 
 Commands:
-- trialflow-agro fit    → run the analysis pipeline and write results.json
+- trialflow-agro fit       → run the analysis pipeline and write results.json
+- trialflow-agro fit-batch → run many configs across a process pool
 - trialflow-agro report → build a simple HTML report from results.json
+- trialflow-agro serve → serve fits over HTTP with a warm dataset cache
+- trialflow-agro generate → write a seeded synthetic trial dataset
+
+Commands import their dependencies when invoked, so `--help` and `report`
+do not load pandas or the inference stack.
 """
 
 from __future__ import annotations
 
+from functools import partial
 from pathlib import Path
 from typing import Optional
 
 import typer
 
-from trialflow_agro.pipeline import Pipeline
-from trialflow_agro.reporting.report_builder import ReportBuilder
-
 app = typer.Typer(
     name="trialflow-agro",
     help="Reproducible summary workflows for on-farm agricultural trials.",
@@ -35,6 +39,28 @@ def fit(
         help="Optional override for results directory "
         "(defaults to config.output.directory).",
     ),
+    cache: Optional[bool] = typer.Option(
+        None,
+        "--cache/--no-cache",
+        help="Reuse cached results for unchanged data + config "
+        "(defaults to config.cache.enabled).",
+    ),
+    append: Optional[Path] = typer.Option(
+        None,
+        "--append",
+        help="Merge new trial records (CSV/Parquet) into the persisted state "
+        "of a previous run and rewrite its results.json.",
+    ),
+    profile: bool = typer.Option(
+        False,
+        "--profile",
+        help="Print per-stage wall/CPU time, peak memory and row/group counts.",
+    ),
+    pstats: Optional[Path] = typer.Option(
+        None,
+        "--pstats",
+        help="Run under cProfile and write pstats output to this path.",
+    ),
 ) -> None:
     """
     Run the trialflow-agro analysis pipeline.
@@ -45,18 +71,98 @@ def fit(
     - compute overall / per-product / grouped summaries
     - compute basic diagnostics
     - write results.json under the chosen output directory
+
+    With --append, only the new records are read and merged into the
+    per-group state saved by a previous run (output.save_intermediate).
+
+    Stage timings are always written to the results; --profile also prints
+    them, and --pstats dumps a cProfile of the whole run (inspect it with
+    `python -m pstats` or snakeviz).
     """
+    from trialflow_agro.pipeline import Pipeline
+    from trialflow_agro.profiling import profiled
+
     typer.echo("[trialflow-agro] Starting fit workflow...")
     typer.echo(f"  Config: {config}")
     if out is not None:
         typer.echo(f"  Output override: {out}")
 
-    pipeline = Pipeline(config_path=config, output_dir=out)
-    pipeline.run()
+    pipeline = Pipeline(config_path=config, output_dir=out, use_cache=cache)
+    if append is not None:
+        typer.echo(f"  Appending records: {append}")
+        work = partial(pipeline.append, append)
+    else:
+        work = pipeline.run
+    if pstats is not None:
+        profiled(work, pstats)
+    else:
+        work()
+
+    if pipeline.cache_status is not None:
+        stats = pipeline.cache_stats or {}
+        typer.echo(
+            f"  Cache {pipeline.cache_status} "
+            f"(total: {stats.get('hits', 0)} hit(s), "
+            f"{stats.get('misses', 0)} miss(es))"
+        )
+
+    if profile and pipeline.timings is not None:
+        typer.echo(pipeline.timings.format())
+    if pstats is not None:
+        typer.echo(f"  cProfile stats written to: {pstats}")
 
     typer.echo(f"[trialflow-agro] Completed. Results written to: {pipeline.output_dir}")
 
 
+@app.command("fit-batch")
+def fit_batch(
+    configs: str = typer.Argument(
+        ...,
+        help="Directory of YAML configs, or a glob pattern (quote it).",
+    ),
+    workers: int = typer.Option(
+        1,
+        "--workers",
+        "-w",
+        min=1,
+        help="Number of worker processes.",
+    ),
+    summary: Path = typer.Option(
+        Path("batch_summary.json"),
+        "--summary",
+        help="Where to write the per-run status and timing summary.",
+    ),
+) -> None:
+    """
+    Run the analysis pipeline for many configs in parallel.
+
+    Configs that read the same data file share one parsed dataset.
+    Each config writes results.json to its own output directory.
+    """
+    from trialflow_agro.batch import BatchPipeline, discover_configs
+
+    paths = discover_configs(configs)
+    if not paths:
+        typer.echo(f"[trialflow-agro] No configs found for: {configs}", err=True)
+        raise typer.Exit(code=1)
+
+    typer.echo(
+        f"[trialflow-agro] Running {len(paths)} config(s) on {workers} worker(s)..."
+    )
+    result = BatchPipeline(paths, workers=workers).run()
+    result.write(summary)
+
+    for run in result.runs:
+        detail = run.output_dir if run.status == "ok" else run.error
+        typer.echo(f"  [{run.status:>5}] {run.seconds:7.2f}s  {run.config}  {detail}")
+    typer.echo(
+        f"[trialflow-agro] {result.n_ok} ok, {result.n_error} failed "
+        f"in {result.total_seconds:.2f}s. Summary written to: {summary}"
+    )
+    if result.n_error:
+        raise typer.Exit(code=1)
+
+
 @app.command()
 def report(
     results: Path = typer.Argument(
@@ -69,26 +175,154 @@ def report(
         "-o",
         help="Path for the generated HTML report.",
     ),
+    max_rows: int = typer.Option(
+        1000,
+        "--max-rows",
+        min=1,
+        help="Rows shown per table (the page size with --chunks).",
+    ),
+    sort_by: Optional[str] = typer.Option(
+        None,
+        "--sort-by",
+        help="Sort grouped tables by this column, e.g. mean_yield to show "
+        "the lowest-yielding groups first.",
+    ),
+    descending: bool = typer.Option(
+        False,
+        "--descending",
+        help="Sort in descending order.",
+    ),
+    chunks: bool = typer.Option(
+        False,
+        "--chunks",
+        help="Write rows past the first page as JSON pages next to the "
+        "report, loaded on demand by the page buttons.",
+    ),
 ) -> None:
     """
-    Build a simple HTML report from results.json.
+    Build an HTML report from results.json or the Parquet results.
 
     The report includes:
     - basic dataset diagnostics
     - overall yield summary
     - per-product summaries
     - optional grouped summaries (based on config.model.groups)
+
+    Large tables are truncated to --max-rows (optionally sorted with
+    --sort-by) or paged with --chunks.
     """
+    from trialflow_agro.reporting.report_builder import ReportBuilder
+
     typer.echo("[trialflow-agro] Building report...")
     typer.echo(f"  Results directory: {results}")
     typer.echo(f"  Output file:       {out}")
 
-    builder = ReportBuilder(results_dir=results)
+    builder = ReportBuilder(
+        results_dir=results,
+        max_rows=max_rows,
+        sort_by=sort_by,
+        descending=descending,
+        chunks=chunks,
+    )
     builder.render(out_path=out)
 
     typer.echo(f"[trialflow-agro] Report written to: {out}")
 
 
+@app.command()
+def serve(
+    host: str = typer.Option("127.0.0.1", "--host", help="Address to listen on."),
+    port: int = typer.Option(8765, "--port", "-p", help="TCP port to listen on."),
+    socket_path: Optional[Path] = typer.Option(
+        None,
+        "--socket",
+        help="Listen on this Unix socket instead of TCP.",
+    ),
+    workers: int = typer.Option(
+        2,
+        "--workers",
+        "-w",
+        min=1,
+        help="Number of fit worker threads.",
+    ),
+    cache_size: int = typer.Option(
+        4,
+        "--cache-size",
+        min=1,
+        help="Number of parsed datasets kept in memory.",
+    ),
+) -> None:
+    """
+    Serve fits over HTTP with a warm in-memory dataset cache.
+
+    POST /fit with {"config": {...}} returns the results document;
+    GET /health reports the dataset cache. Stop with Ctrl+C.
+    """
+    from trialflow_agro.server import FitServer
+
+    server = FitServer(
+        host=host,
+        port=port,
+        socket_path=socket_path,
+        workers=workers,
+        cache_entries=cache_size,
+    )
+    where = socket_path if socket_path is not None else f"http://{host}:{port}"
+    typer.echo(f"[trialflow-agro] Serving fits on {where} ({workers} worker(s))")
+    try:
+        server.run()
+    except KeyboardInterrupt:
+        typer.echo("[trialflow-agro] Server stopped.")
+
+
+@app.command()
+def generate(
+    out: Path = typer.Argument(
+        ...,
+        help="Output file (.csv or .parquet).",
+    ),
+    rows: int = typer.Option(100_000, "--rows", "-n", min=1, help="Records."),
+    fields: int = typer.Option(200, "--fields", min=1, help="Fields."),
+    farms: int = typer.Option(40, "--farms", min=1, help="Farms."),
+    regions: int = typer.Option(4, "--regions", min=1, help="Regions."),
+    years: int = typer.Option(3, "--years", min=1, help="Seasons."),
+    products: int = typer.Option(8, "--products", min=2, help="Products."),
+    missing: float = typer.Option(
+        0.02,
+        "--missing",
+        min=0.0,
+        max=1.0,
+        help="Share of missing optional column values.",
+    ),
+    seed: int = typer.Option(0, "--seed", help="Random seed."),
+) -> None:
+    """
+    Write a seeded synthetic trial dataset.
+
+    Regions, farms, fields (with locations), seasons and products in
+    strip trials, with realistic yield effects. Large datasets are written
+    in blocks, so 1e8 rows fit in bounded memory.
+    """
+    from trialflow_agro.data.synthetic import SyntheticTrialSpec, write_synthetic
+
+    spec = SyntheticTrialSpec(
+        rows=rows,
+        fields=fields,
+        farms=farms,
+        regions=regions,
+        years=years,
+        products=products,
+        missing_optional=missing,
+        seed=seed,
+    )
+    try:
+        write_synthetic(spec, out)
+    except ValueError as exc:
+        typer.echo(f"[trialflow-agro] {exc}", err=True)
+        raise typer.Exit(code=1) from exc
+    typer.echo(f"[trialflow-agro] Wrote {rows:,} records to: {out}")
+
+
 def main() -> None:
     """Console script entrypoint."""
     app()
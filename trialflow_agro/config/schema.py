@@ -3,16 +3,157 @@ Configuration models and loader for trialflow-agro.
 """
 
 from pathlib import Path
-from typing import List
+from typing import Annotated, List, Literal, Optional
 
 import yaml
-from pydantic import BaseModel, Field, ValidationError
+from pydantic import BaseModel, Field, ValidationError, model_validator
 
 
 class DataConfig(BaseModel):
     """Configuration for input trial dataset."""
 
     path: Path = Field(..., description="Path to the trial dataset (CSV or Parquet).")
+    streaming: bool = Field(
+        False,
+        description="Read the dataset in chunks and aggregate out-of-core "
+        "instead of loading it into memory at once.",
+    )
+    chunk_size: int = Field(
+        100_000,
+        description="Rows per CSV chunk / Parquet batch when streaming.",
+        ge=1,
+    )
+    yield_dtype: Literal["float32", "float64"] = Field(
+        "float64",
+        description="In-memory dtype for the yield column.",
+    )
+
+
+class HierarchicalConfig(BaseModel):
+    """Configuration for the Bayesian hierarchical (partial-pooling) model."""
+
+    random_effects: List[str] = Field(
+        default_factory=lambda: ["region", "farm_id", "field_id"],
+        description="Nested random-intercept levels, outermost first "
+        "(each level is nested within the previous ones).",
+    )
+    method: Literal["advi", "pathfinder", "nuts"] = Field(
+        "advi",
+        description="Inference method: 'advi' or 'pathfinder' for quick "
+        "approximate runs, 'nuts' for full MCMC.",
+    )
+    draws: int = Field(1000, description="Posterior draws (per chain for NUTS).", ge=1)
+    tune: int = Field(1000, description="NUTS tuning steps per chain.", ge=0)
+    chains: int = Field(4, description="Number of NUTS chains.", ge=1)
+    cores: Optional[int] = Field(
+        None,
+        description="Chains sampled in parallel (defaults to min(chains, CPUs)).",
+        ge=1,
+    )
+    target_accept: float = Field(0.9, description="NUTS target acceptance.", gt=0, lt=1)
+    advi_iterations: int = Field(
+        10_000, description="Optimization steps for ADVI.", ge=1
+    )
+    advi_learning_rate: float = Field(
+        0.01, description="Adam learning rate for ADVI.", gt=0
+    )
+    random_seed: Optional[int] = Field(0, description="Seed for reproducible fits.")
+
+
+class BootstrapConfig(BaseModel):
+    """Configuration for bootstrap confidence intervals of group mean yield."""
+
+    enabled: bool = Field(False, description="Add mean-yield CIs to summaries.")
+    n_resamples: int = Field(1000, description="Bootstrap resamples.", ge=1)
+    confidence: float = Field(0.95, description="Confidence level.", gt=0, lt=1)
+    random_seed: int = Field(0, description="Seed for reproducible intervals.")
+    memory_budget_mb: float = Field(
+        256.0,
+        description="Approximate memory per bootstrap task; larger buckets "
+        "of groups are split to stay within it.",
+        gt=0,
+    )
+
+
+class QuantileConfig(BaseModel):
+    """Configuration for per-group yield quantiles."""
+
+    levels: List[Annotated[float, Field(ge=0, le=1)]] = Field(
+        default_factory=list,
+        description="Quantiles to report per group (e.g. [0.1, 0.5, 0.9]); "
+        "empty disables them.",
+    )
+    method: Literal["auto", "exact", "sketch"] = Field(
+        "auto",
+        description="'exact' on in-memory records, 'sketch' for a mergeable "
+        "relative-error sketch, 'auto' for exact unless the data is streamed.",
+    )
+    relative_error: float = Field(
+        0.01, description="Relative error bound of sketch quantiles.", gt=0, lt=1
+    )
+
+
+class ComparisonConfig(BaseModel):
+    """Configuration for paired within-field product comparisons."""
+
+    enabled: bool = Field(False, description="Compare every product pair.")
+    pair_on: List[str] = Field(
+        default_factory=lambda: ["field_id", "year"],
+        description="Columns identifying a unit in which products are paired.",
+        min_length=1,
+    )
+    min_pairs: int = Field(
+        1, description="Minimum shared units to report a pair.", ge=1
+    )
+
+
+class SpatialConfig(BaseModel):
+    """Configuration for spatial zone summaries and autocorrelation."""
+
+    enabled: bool = Field(False, description="Summarize yield by spatial zone.")
+    zones: Literal["grid", "polygons"] = Field(
+        "grid",
+        description="'grid' for square cells, 'polygons' for the zones in "
+        "`boundaries`.",
+    )
+    cell_size: float = Field(
+        100.0, description="Grid cell edge, in units of `crs` (metres).", gt=0
+    )
+    boundaries: Optional[Path] = Field(
+        None,
+        description="Zone polygons (GeoJSON, GeoPackage or Shapefile) for "
+        "zones='polygons'; assumed EPSG:4326 if the file has no CRS.",
+    )
+    zone_column: Optional[str] = Field(
+        None, description="Boundary attribute naming each zone (default: row index)."
+    )
+    group_by: List[str] = Field(
+        default_factory=list,
+        description="Columns splitting each zone's summary (e.g. ['product']).",
+    )
+    crs: Optional[str] = Field(
+        None,
+        description="Projected CRS for grid cells and distances (default: "
+        "the UTM zone of the data).",
+    )
+    k_neighbors: int = Field(8, description="Neighbours per point for Moran's I.", ge=1)
+    moran_max_points: Optional[int] = Field(
+        200_000,
+        description="Random subsample size for Moran's I; None uses every point.",
+        ge=3,
+    )
+    adjust_for_product: bool = Field(
+        True,
+        description="Compute Moran's I on yield minus the product mean, so "
+        "product placement does not read as spatial autocorrelation.",
+    )
+    random_seed: int = Field(0, description="Seed of the Moran's I subsample.")
+
+    @model_validator(mode="after")
+    def _check_boundaries(self) -> "SpatialConfig":
+        if self.enabled and self.zones == "polygons" and self.boundaries is None:
+            raise ValueError("spatial.zones='polygons' needs spatial.boundaries.")
+        return self
 
 
 class ModelConfig(BaseModel):
@@ -27,6 +168,16 @@ class ModelConfig(BaseModel):
         description="Minimum records required for a group to be included in summaries.",
         ge=1,
     )
+    backend: Literal["summary", "hierarchical"] = Field(
+        "summary",
+        description="'summary' for descriptive statistics only, 'hierarchical' "
+        "to also fit the Bayesian partial-pooling model.",
+    )
+    hierarchical: HierarchicalConfig = Field(default_factory=HierarchicalConfig)
+    bootstrap: BootstrapConfig = Field(default_factory=BootstrapConfig)
+    quantiles: QuantileConfig = Field(default_factory=QuantileConfig)
+    comparisons: ComparisonConfig = Field(default_factory=ComparisonConfig)
+    spatial: SpatialConfig = Field(default_factory=SpatialConfig)
 
 
 class OutputConfig(BaseModel):
@@ -38,7 +189,106 @@ class OutputConfig(BaseModel):
     )
     save_intermediate: bool = Field(
         True,
-        description="Whether to save intermediate artifacts.",
+        description="Whether to save intermediate artifacts (per-group "
+        "moments and a manifest) for reuse and `fit --append`.",
+    )
+    save_data: bool = Field(
+        False,
+        description="Also save the cleaned, typed dataset with the "
+        "intermediate artifacts, so reruns with groupings the stored "
+        "moments do not cover skip parsing the raw data. Costs a full "
+        "Parquet copy of the input.",
+    )
+    results_format: Literal["json", "parquet", "both"] = Field(
+        "json",
+        description=(
+            "results.json, Parquet tables plus results_manifest.json, or both."
+        ),
+    )
+    histogram_bins: int = Field(
+        40,
+        ge=1,
+        description="Bins of the yield histogram stored for report plots.",
+    )
+
+
+class CleaningConfig(BaseModel):
+    """Configuration for the record cleaning stage run before inference."""
+
+    enabled: bool = Field(False, description="Clean records before inference.")
+    min_yield: Optional[float] = Field(
+        None, description="Drop records with a lower yield (e.g. 0 for stops)."
+    )
+    max_yield: Optional[float] = Field(
+        None, description="Drop records with a higher yield."
+    )
+    outliers: Literal["none", "mad", "iqr"] = Field(
+        "mad",
+        description="Per-group yield outlier filter: modified z-score on the "
+        "median absolute deviation, or Tukey fences on the interquartile range.",
+    )
+    outlier_by: List[str] = Field(
+        default_factory=lambda: ["field_id"],
+        description="Columns defining the groups the outlier filter runs in.",
+    )
+    mad_threshold: float = Field(
+        3.5,
+        description="Modified z-score (0.6745 * |y - median| / MAD) above "
+        "which a yield is an outlier.",
+        gt=0,
+    )
+    iqr_multiplier: float = Field(
+        1.5, description="Fences at Q1 - k*IQR and Q3 + k*IQR.", gt=0
+    )
+    thin_cell_size: Optional[float] = Field(
+        None,
+        description="Grid cell edge in metres for spatial thinning of "
+        "lat/lon points; None disables thinning.",
+        gt=0,
+    )
+    thin_method: Literal["first", "mean"] = Field(
+        "mean",
+        description="Per cell (and field, product, ...): keep the first point, "
+        "or bin the points into one record with their mean yield and position.",
+    )
+    crs: Optional[str] = Field(
+        None,
+        description="Projected CRS of the thinning grid (default: the UTM "
+        "zone of the data).",
+    )
+
+
+class ExecutionConfig(BaseModel):
+    """Configuration for parallel execution of the statistics."""
+
+    n_jobs: int = Field(
+        1,
+        description="Number of workers used to compute group statistics.",
+        ge=1,
+    )
+    backend: Literal["thread", "process"] = Field(
+        "thread",
+        description="Worker pool type used when n_jobs > 1.",
+    )
+
+
+class CacheConfig(BaseModel):
+    """Configuration for the content-addressed result cache."""
+
+    enabled: bool = Field(
+        False,
+        description="Restore results.json from the cache when the data, "
+        "config and package version are unchanged.",
+    )
+    directory: Path = Field(
+        Path(".trialflow-cache"),
+        description="Directory holding cached results.",
+    )
+    max_size_mb: float = Field(
+        512.0,
+        description="Size budget for cached results; least recently used "
+        "entries are evicted beyond it.",
+        gt=0,
     )
 
 
@@ -48,6 +298,9 @@ class TrialflowConfig(BaseModel):
     data: DataConfig
     model: ModelConfig
     output: OutputConfig
+    cleaning: CleaningConfig = Field(default_factory=CleaningConfig)
+    execution: ExecutionConfig = Field(default_factory=ExecutionConfig)
+    cache: CacheConfig = Field(default_factory=CacheConfig)
 
 
 class ConfigLoader:
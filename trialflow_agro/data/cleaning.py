@@ -0,0 +1,178 @@
+"""
+Record cleaning for trialflow-agro.
+
+Raw yield-monitor exports hold dense, overlapping points with artifacts
+from stops, turns and swath overlap. `RecordCleaner` runs, in order:
+
+1. range: drop yields outside [min_yield, max_yield]
+2. outliers: drop yield outliers within each `outlier_by` group (by
+   default each field), by the modified z-score on the median absolute
+   deviation or by Tukey's interquartile-range fences
+3. thinning: snap lat/lon to a metric grid and keep one record per cell
+   and identifier combination (field, product, year, ...): the first
+   point, or the mean yield and position of the cell's points
+
+Every step is a vectorized mask or groupby over whole columns. Records
+without a yield or without coordinates are never dropped here; the
+diagnostics count them. The rows removed by each step are reported.
+"""
+
+from typing import List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel, Field
+
+from trialflow_agro.config.schema import CleaningConfig
+from trialflow_agro.data.geo import grid_cells, project_lat_lon
+from trialflow_agro.data.schema import OPTIONAL_COLUMNS, REQUIRED_COLUMNS
+
+# Scales the MAD to the standard deviation of a normal distribution
+_MAD_SCALE = 0.6745
+_VALUE_COLUMNS = ("yield", "lat", "lon")
+
+
+class CleaningStep(BaseModel):
+    """Rows removed by one cleaning step."""
+
+    name: str
+    rows_removed: int
+
+
+class CleaningReport(BaseModel):
+    """Row counts before and after cleaning, per step."""
+
+    rows_in: int
+    rows_out: int
+    steps: List[CleaningStep] = Field(default_factory=list)
+
+
+class RecordCleaner:
+    """Applies the configured cleaning steps to a DataFrame of records."""
+
+    def __init__(self, config: CleaningConfig) -> None:
+        self.config = config
+
+    @property
+    def thins(self) -> bool:
+        return self.config.thin_cell_size is not None
+
+    def columns(self) -> List[str]:
+        """Columns the cleaning reads besides the required ones."""
+        columns: List[str] = []
+        if self.config.outliers != "none":
+            columns.extend(self.config.outlier_by)
+        if self.thins:
+            # Thinned records are identified by every schema column, so the
+            # result does not depend on which columns a run happens to load
+            columns.extend(OPTIONAL_COLUMNS)
+        return list(dict.fromkeys(columns))
+
+    def clean(
+        self, df: pd.DataFrame, keys: Sequence[str] = ()
+    ) -> Tuple[pd.DataFrame, CleaningReport]:
+        """
+        Cleaned records and the report. Thinning keeps cells apart by the
+        schema identifier columns plus `keys` (e.g. extra grouping columns).
+        """
+        cfg = self.config
+        rows_in = len(df)
+        steps: List[CleaningStep] = []
+
+        if cfg.min_yield is not None or cfg.max_yield is not None:
+            df, removed = _filtered(df, self._in_range(df))
+            steps.append(CleaningStep(name="yield_range", rows_removed=removed))
+        if cfg.outliers != "none":
+            df, removed = _filtered(df, self._not_outlier(df))
+            steps.append(
+                CleaningStep(name=f"outliers_{cfg.outliers}", rows_removed=removed)
+            )
+        if self.thins:
+            before = len(df)
+            df = self._thinned(df, keys)
+            steps.append(CleaningStep(name="thinning", rows_removed=before - len(df)))
+
+        return df, CleaningReport(rows_in=rows_in, rows_out=len(df), steps=steps)
+
+    def _in_range(self, df: pd.DataFrame) -> np.ndarray:
+        values = df["yield"].to_numpy(dtype="float64")
+        keep = np.ones(len(df), dtype=bool)
+        # NaN compares False, so missing yields are kept
+        if self.config.min_yield is not None:
+            keep &= ~(values < self.config.min_yield)
+        if self.config.max_yield is not None:
+            keep &= ~(values > self.config.max_yield)
+        return keep
+
+    def _not_outlier(self, df: pd.DataFrame) -> np.ndarray:
+        cfg = self.config
+        values = df["yield"].astype("float64")
+        missing = [col for col in cfg.outlier_by if col not in df.columns]
+        if missing:
+            raise ValueError(f"Outlier groups need the columns {missing}.")
+        if cfg.outlier_by:
+            keys = [df[col] for col in cfg.outlier_by]
+        else:
+            keys = np.zeros(len(df), dtype=np.int8)
+
+        def transform(series: pd.Series, how: str, *args) -> np.ndarray:
+            grouped = series.groupby(keys, observed=True, dropna=False, sort=False)
+            return grouped.transform(how, *args).to_numpy(dtype="float64")
+
+        y = values.to_numpy()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if cfg.outliers == "mad":
+                deviation = np.abs(y - transform(values, "median"))
+                mad = transform(pd.Series(deviation, index=values.index), "median")
+                score = _MAD_SCALE * deviation / mad
+                # A zero MAD gives no spread estimate; keep the group
+                outlier = (score > cfg.mad_threshold) & (mad > 0)
+            else:
+                q1 = transform(values, "quantile", 0.25)
+                q3 = transform(values, "quantile", 0.75)
+                fence = cfg.iqr_multiplier * (q3 - q1)
+                outlier = (y < q1 - fence) | (y > q3 + fence)
+        return ~outlier
+
+    def _thinned(self, df: pd.DataFrame, keys: Sequence[str]) -> pd.DataFrame:
+        missing = [col for col in ("lat", "lon") if col not in df.columns]
+        if missing:
+            raise ValueError(f"Spatial thinning needs the columns {missing}.")
+        if df.empty or df["lat"].isna().all() or df["lon"].isna().all():
+            return df
+
+        x, y, _ = project_lat_lon(df["lat"], df["lon"], self.config.crs)
+        cells, _, _ = grid_cells(x, y, self.config.thin_cell_size)
+        ids = [
+            col
+            for col in dict.fromkeys([*REQUIRED_COLUMNS, *OPTIONAL_COLUMNS, *keys])
+            if col in df.columns and col not in _VALUE_COLUMNS
+        ]
+        located = cells >= 0
+
+        if self.config.thin_method == "first":
+            duplicate = df[ids].assign(_cell=cells).duplicated().to_numpy()
+            return df[~(duplicate & located)]
+
+        points = df[located]
+        by = [points[col] for col in ids] + [
+            pd.Series(cells[located], index=points.index)
+        ]
+        binned = (
+            points[list(_VALUE_COLUMNS)]
+            .astype("float64")
+            .groupby(by, observed=True, dropna=False, sort=False)
+            .mean()
+        )
+        binned.index = binned.index.droplevel(-1)
+        binned = binned.reset_index()
+        binned = binned.astype({col: df[col].dtype for col in binned.columns})
+        columns = [*ids, *_VALUE_COLUMNS]
+        return pd.concat(
+            [binned[columns], df.loc[~located, columns]], ignore_index=True
+        )
+
+
+def _filtered(df: pd.DataFrame, keep: np.ndarray) -> Tuple[pd.DataFrame, int]:
+    removed = int((~keep).sum())
+    return (df[keep] if removed else df), removed
@@ -0,0 +1,59 @@
+"""
+Coordinate helpers for trialflow-agro.
+
+`lat`/`lon` (WGS 84) are projected to a metric CRS with one vectorized
+pyproj call, so grid cells and distances can be computed in metres.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+def utm_crs(lat: np.ndarray, lon: np.ndarray) -> str:
+    """EPSG code of the UTM zone containing the centre of the points."""
+    lon_c, lat_c = float(np.nanmean(lon)), float(np.nanmean(lat))
+    zone = int((lon_c + 180.0) // 6.0) % 60 + 1
+    return f"EPSG:{(32600 if lat_c >= 0 else 32700) + zone}"
+
+
+def project_lat_lon(
+    lat: np.ndarray, lon: np.ndarray, crs: Optional[str] = None
+) -> Tuple[np.ndarray, np.ndarray, str]:
+    """
+    Projected (x, y) of every point (NaN without coordinates) and the CRS
+    used: `crs`, or the UTM zone of the points.
+    """
+    from pyproj import Transformer
+
+    lat = np.asarray(lat, dtype="float64")
+    lon = np.asarray(lon, dtype="float64")
+    if np.isnan(lat).all() or np.isnan(lon).all():
+        raise ValueError("No records with lat/lon to project.")
+    crs = crs or utm_crs(lat, lon)
+    transformer = Transformer.from_crs("EPSG:4326", crs, always_xy=True)
+    x, y = transformer.transform(lon, lat)
+    return np.asarray(x), np.asarray(y), crs
+
+
+def grid_cells(
+    x: np.ndarray, y: np.ndarray, cell_size: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Square-grid cells of points: (code per point, -1 where a coordinate is
+    missing; column and row index of each code's cell in cell units).
+    """
+    valid = np.isfinite(x) & np.isfinite(y)
+    col = np.floor(x[valid] / cell_size).astype("int64")
+    row = np.floor(y[valid] / cell_size).astype("int64")
+    codes = np.full(len(x), -1, dtype="int64")
+    if not len(col):
+        return codes, col, row
+    # One int64 key per cell; 1-D unique is much faster than axis=0
+    col0, row0 = col.min(), row.min()
+    n_rows = int(row.max() - row0 + 1)
+    cells, inverse = np.unique(
+        (col - col0) * n_rows + (row - row0), return_inverse=True
+    )
+    codes[valid] = inverse.ravel()
+    return codes, cells // n_rows + col0, cells % n_rows + row0
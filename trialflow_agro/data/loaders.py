@@ -3,12 +3,12 @@ Data loading and validation utilities for trialflow-agro.
 """
 
 from pathlib import Path
-from typing import Tuple
+from typing import Dict, Iterator, List, Optional, Sequence
 
 import pandas as pd
-from pydantic import ValidationError
 
-from trialflow_agro.data.schema import REQUIRED_COLUMNS, TrialRow
+from trialflow_agro.data.schema import CATEGORICAL_COLUMNS, REQUIRED_COLUMNS
+from trialflow_agro.data.validation import validate_frame
 
 
 class TrialDataLoader:
@@ -17,27 +17,107 @@ class TrialDataLoader:
 
     - Supports CSV and Parquet inputs
     - Checks required columns
-    - Spot-validates a sample of rows with Pydantic
+    - Validates every row against the TrialRow schema (vectorized)
+    - Optionally streams the file in bounded-size chunks
+    - Reads only the requested columns and stores them in compact dtypes:
+      identifiers as `category`, `year` as the smallest integer type and
+      `yield` as `yield_dtype`
     """
 
+    def __init__(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        yield_dtype: str = "float64",
+    ) -> None:
+        # None reads every column; REQUIRED_COLUMNS are always read
+        self.columns: Optional[List[str]] = None
+        if columns is not None:
+            self.columns = list(dict.fromkeys([*REQUIRED_COLUMNS, *columns]))
+        self.yield_dtype = yield_dtype
+
     def load(self, path: Path) -> pd.DataFrame:
         """
         Load data from CSV or Parquet and run basic validation.
         """
         df = self._read(path)
         self._validate_columns(df)
-        self._validate_sample_rows(df)
-        return df
+        self._validate_rows(df)
+        return self._optimize_dtypes(df)
+
+    def iter_chunks(self, path: Path, chunk_size: int) -> Iterator[pd.DataFrame]:
+        """
+        Stream data from CSV (in `chunk_size`-row chunks) or Parquet (in
+        record batches of at most `chunk_size` rows), validating each chunk.
+
+        Only one chunk is held in memory at a time.
+        """
+        for chunk in self._read_chunks(path, chunk_size):
+            self._validate_columns(chunk)
+            self._validate_rows(chunk)
+            yield self._optimize_dtypes(chunk)
 
     def _read(self, path: Path) -> pd.DataFrame:
+        suffix = self._check_path(path)
+        if suffix == ".csv":
+            return pd.read_csv(path, **self._csv_options())
+        return pd.read_parquet(path, columns=self._parquet_columns(path))
+
+    def _read_chunks(self, path: Path, chunk_size: int) -> Iterator[pd.DataFrame]:
+        suffix = self._check_path(path)
+        if suffix == ".csv":
+            with pd.read_csv(
+                path, chunksize=chunk_size, **self._csv_options()
+            ) as reader:
+                yield from reader
+            return
+
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(
+            batch_size=chunk_size, columns=self._parquet_columns(path)
+        ):
+            yield batch.to_pandas()
+
+    def _csv_options(self) -> Dict[str, object]:
+        options: Dict[str, object] = {
+            "dtype": {col: "category" for col in CATEGORICAL_COLUMNS}
+        }
+        if self.columns is not None:
+            # A callable keeps missing columns from raising here, so that
+            # _validate_columns can report them consistently
+            wanted = set(self.columns)
+            options["usecols"] = lambda col: col in wanted
+        return options
+
+    def _parquet_columns(self, path: Path) -> Optional[List[str]]:
+        if self.columns is None:
+            return None
+
+        import pyarrow.parquet as pq
+
+        available = set(pq.read_schema(path).names)
+        return [col for col in self.columns if col in available]
+
+    def _optimize_dtypes(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Convert validated columns to their compact in-memory dtypes."""
+        converted: Dict[str, pd.Series] = {}
+        for col in CATEGORICAL_COLUMNS:
+            if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+                converted[col] = df[col].astype("category")
+        if "year" in df.columns:
+            converted["year"] = pd.to_numeric(df["year"], downcast="integer")
+        if "yield" in df.columns:
+            converted["yield"] = df["yield"].astype(self.yield_dtype)
+        return df.assign(**converted)
+
+    def _check_path(self, path: Path) -> str:
         if not path.exists():
             raise FileNotFoundError(f"Data file not found: {path}")
 
         suffix = path.suffix.lower()
-        if suffix == ".csv":
-            return pd.read_csv(path)
-        if suffix in {".parquet", ".pq"}:
-            return pd.read_parquet(path)
+        if suffix in {".csv", ".parquet", ".pq"}:
+            return suffix
 
         raise ValueError(f"Unsupported file type: {suffix}")
 
@@ -46,23 +126,14 @@ class TrialDataLoader:
         if missing:
             raise ValueError(f"Missing required columns: {missing}")
 
-    def _validate_sample_rows(self, df: pd.DataFrame, n: int = 50) -> None:
+    def _validate_rows(self, df: pd.DataFrame, max_reported: int = 5) -> None:
         """
-        Validate up to `n` rows using TrialRow (Pydantic) as a sanity check.
-        This avoids validating the entire dataset, which can be large.
+        Validate every row against the TrialRow schema with vectorized
+        column checks, reporting the first offending rows for each rule.
         """
-        sample = df.head(n)
-        errors: list[Tuple[int, str]] = []
-
-        for idx, row in sample.iterrows():
-            try:
-                TrialRow(**row.to_dict())
-            except ValidationError as exc:
-                errors.append((idx, str(exc)))
-
-        if errors:
-            msg = "\n".join([f"Row {i}: {e}" for i, e in errors[:5]])
+        violations = validate_frame(df, max_reported=max_reported)
+        if violations:
+            msg = "\n".join(v.describe() for v in violations)
             raise ValueError(
-                f"Sample validation failed for {len(errors)} row(s). "
-                f"First few errors:\n{msg}"
+                f"Data validation failed for {len(violations)} rule(s):\n{msg}"
             )
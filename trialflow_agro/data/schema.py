@@ -4,8 +4,7 @@ Data schema definitions for trialflow-agro.
 
 from typing import Optional
 
-from pydantic import BaseModel, Field, ConfigDict
-
+from pydantic import BaseModel, ConfigDict, Field
 
 REQUIRED_COLUMNS = [
     "field_id",
@@ -24,13 +23,24 @@ OPTIONAL_COLUMNS = [
     "lon",
 ]
 
+# String-valued columns stored as pandas `category` when loading
+CATEGORICAL_COLUMNS = [
+    "field_id",
+    "farm_id",
+    "region",
+    "product",
+    "treatment",
+    "variety",
+    "soil_class",
+]
+
 
 class TrialRow(BaseModel):
     """
     Pydantic model for a single row of trial data.
 
-    This is primarily used for spot-check validation of the
-    dataset (ensuring basic type consistency).
+    It is the source of truth for the column types, nullability and
+    value ranges enforced by `trialflow_agro.data.validation`.
     """
 
     field_id: str
@@ -43,8 +53,8 @@ class TrialRow(BaseModel):
     treatment: Optional[str] = None
     variety: Optional[str] = None
     soil_class: Optional[str] = None
-    lat: Optional[float] = None
-    lon: Optional[float] = None
+    lat: Optional[float] = Field(None, ge=-90, le=90)
+    lon: Optional[float] = Field(None, ge=-180, le=180)
 
     model_config = ConfigDict(
         populate_by_name=True,
@@ -0,0 +1,268 @@
+"""
+Seeded synthetic trial data for trialflow-agro.
+
+`SyntheticTrialSpec` describes a trial network: regions, farms nested in
+regions, fields nested in farms (each with a location and soil class),
+years, and a subset of products placed in strips on every field-year.
+Records are yield-monitor points inside their field, with yield built from
+
+    base + region + farm + field + year + product effects
+         + a smooth within-field spatial trend + noise
+
+plus optional stop/spike artifacts. Optional columns (treatment, variety,
+soil class) and positions are missing at configurable rates; yields are
+always generated.
+
+Rows are produced in fixed-size blocks with RNG streams derived from the
+seed and the block number, so the data for a seed is identical however it
+is written, and datasets of 1e8 rows can be written to CSV or Parquet block
+by block in bounded memory.
+"""
+
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel, Field
+
+# Rows per generated block; part of the data definition (changing it
+# changes the data produced for a seed)
+BLOCK_ROWS = 250_000
+
+# Approximate field extent, degrees of latitude / longitude
+_FIELD_DEG = 0.004
+
+# One RNG stream per drawn variable, so the first rows of a block do not
+# depend on its length and a longer dataset extends a shorter one
+_STREAMS = (
+    "field",
+    "year",
+    "u",
+    "v",
+    "noise",
+    "artifacts",
+    "spikes",
+    "treatment",
+    "missing_treatment",
+    "missing_variety",
+    "missing_soil_class",
+    "unlocated",
+)
+
+
+class SyntheticTrialSpec(BaseModel):
+    """Shape and noise of a synthetic trial dataset."""
+
+    rows: int = Field(10_000, ge=1)
+    regions: int = Field(4, ge=1)
+    farms: int = Field(40, ge=1)
+    fields: int = Field(200, ge=1)
+    years: int = Field(3, ge=1)
+    first_year: int = 2022
+    products: int = Field(8, ge=2)
+    products_per_field: int = Field(
+        3, description="Products placed on each field-year.", ge=1
+    )
+    base_yield: float = 60.0
+    noise_sd: float = Field(4.0, ge=0)
+    with_location: bool = Field(True, description="Add lat/lon columns.")
+    with_optional: bool = Field(
+        True, description="Add treatment, variety and soil_class columns."
+    )
+    missing_optional: float = Field(
+        0.02, description="Share of missing optional column values.", ge=0, le=1
+    )
+    missing_location: float = Field(
+        0.005, description="Share of records without lat/lon.", ge=0, le=1
+    )
+    artifact_rate: float = Field(
+        0.0, description="Share of stop (zero) and spike yields.", ge=0, le=1
+    )
+    seed: int = 0
+
+
+class _Network:
+    """Per-entity attributes and effects drawn once from the seed."""
+
+    def __init__(self, spec: SyntheticTrialSpec) -> None:
+        rng = np.random.default_rng([spec.seed, 0])
+        farms = max(spec.farms, spec.regions)
+        fields = max(spec.fields, farms)
+        self.farm_region = np.arange(farms) % spec.regions
+        self.field_farm = np.concatenate(
+            [np.arange(farms), rng.integers(0, farms, fields - farms)]
+        )
+        self.n_fields = fields
+        self.n_farms = farms
+
+        region_effect = rng.normal(0, 6, spec.regions)
+        farm_effect = rng.normal(0, 3, farms)
+        self.field_effect = (
+            region_effect[self.farm_region[self.field_farm]]
+            + farm_effect[self.field_farm]
+            + rng.normal(0, 2, fields)
+        )
+        self.year_effect = rng.normal(0, 3, spec.years)
+        self.product_effect = rng.normal(0, 2.5, spec.products)
+
+        # Region centres across the US corn belt, fields scattered around
+        region_lat = rng.uniform(38.0, 45.0, spec.regions)
+        region_lon = rng.uniform(-97.0, -86.0, spec.regions)
+        field_region = self.farm_region[self.field_farm]
+        self.field_lat = region_lat[field_region] + rng.normal(0, 0.3, fields)
+        self.field_lon = region_lon[field_region] + rng.normal(0, 0.3, fields)
+        self.field_soil = rng.integers(0, 4, fields)
+        self.trend_phase = rng.uniform(0, 2 * np.pi, (fields, 2))
+
+        # Products on each field-year: a random subset in strips
+        k = min(spec.products_per_field, spec.products)
+        self.placements = np.argsort(
+            rng.random((fields, spec.years, spec.products)), axis=2
+        )[:, :, :k]
+
+
+def _names(prefix: str, n: int) -> pd.Index:
+    width = len(str(n - 1))
+    return pd.Index([f"{prefix}{i:0{width}d}" for i in range(n)])
+
+
+def iter_synthetic(spec: SyntheticTrialSpec) -> Iterator[pd.DataFrame]:
+    """Yield the dataset as DataFrames of at most BLOCK_ROWS rows."""
+    net = _Network(spec)
+    field_names = _names("F", net.n_fields)
+    farm_names = _names("Farm", net.n_farms)
+    region_names = _names("R", spec.regions)
+    product_names = _names("P", spec.products)
+    variety_names = _names("V", spec.products)
+    soil_names = pd.Index(["clay", "loam", "sand", "silt"])
+    k = net.placements.shape[2]
+
+    for block, start in enumerate(range(0, spec.rows, BLOCK_ROWS)):
+        n = min(BLOCK_ROWS, spec.rows - start)
+        rng = dict(
+            zip(
+                _STREAMS,
+                np.random.default_rng([spec.seed, 1, block]).spawn(len(_STREAMS)),
+            )
+        )
+        field = rng["field"].integers(0, net.n_fields, n)
+        year = rng["year"].integers(0, spec.years, n)
+        # Strips: position across the field picks the product
+        u, v = rng["u"].random(n), rng["v"].random(n)
+        strip = np.minimum((u * k).astype(np.int64), k - 1)
+        product = net.placements[field, year, strip]
+        farm = net.field_farm[field]
+
+        phase = net.trend_phase[field]
+        trend = (
+            3.0
+            * np.sin(2 * np.pi * u + phase[:, 0])
+            * np.cos(2 * np.pi * v + phase[:, 1])
+        )
+        values = (
+            spec.base_yield
+            + net.field_effect[field]
+            + net.year_effect[year]
+            + net.product_effect[product]
+            + trend
+            + rng["noise"].normal(0, spec.noise_sd, n)
+        )
+        artifacts = rng["artifacts"].random(n)
+        values[artifacts < spec.artifact_rate / 2] = 0.0
+        spikes = (artifacts >= spec.artifact_rate / 2) & (
+            artifacts < spec.artifact_rate
+        )
+        values[spikes] *= rng["spikes"].uniform(3, 8, int(spikes.sum()))
+
+        columns: Dict[str, object] = {
+            "field_id": pd.Categorical.from_codes(field, field_names),
+            "farm_id": pd.Categorical.from_codes(farm, farm_names),
+            "region": pd.Categorical.from_codes(net.farm_region[farm], region_names),
+            "year": (spec.first_year + year).astype(np.int16),
+            "product": pd.Categorical.from_codes(product, product_names),
+            "yield": values,
+        }
+        if spec.with_optional:
+            optional = {
+                "treatment": (
+                    (rng["treatment"].random(n) < 0.5),
+                    ["control", "treated"],
+                ),
+                "variety": (product, variety_names),
+                "soil_class": (net.field_soil[field], soil_names),
+            }
+            for name, (codes, categories) in optional.items():
+                codes = codes.astype(np.int64)
+                codes[rng[f"missing_{name}"].random(n) < spec.missing_optional] = -1
+                columns[name] = pd.Categorical.from_codes(codes, categories)
+        if spec.with_location:
+            lat = net.field_lat[field] + v * _FIELD_DEG
+            lon = net.field_lon[field] + u * _FIELD_DEG
+            unlocated = rng["unlocated"].random(n) < spec.missing_location
+            lat[unlocated] = np.nan
+            lon[unlocated] = np.nan
+            columns["lat"] = lat
+            columns["lon"] = lon
+        yield pd.DataFrame(columns)
+
+
+def generate_trial_data(spec: SyntheticTrialSpec) -> pd.DataFrame:
+    """The whole dataset in memory."""
+    blocks = list(iter_synthetic(spec))
+    if len(blocks) == 1:
+        return blocks[0]
+    return pd.concat(blocks, ignore_index=True)
+
+
+def write_synthetic(
+    spec: SyntheticTrialSpec, path: Path, fmt: Optional[str] = None
+) -> Path:
+    """
+    Write the dataset block by block to CSV or Parquet (from `fmt`, else
+    the file suffix) with pyarrow's streaming writers; memory use is
+    bounded by one block.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+
+    fmt = fmt or path.suffix.lstrip(".").lower()
+    if fmt == "pq":
+        fmt = "parquet"
+    if fmt not in ("csv", "parquet"):
+        raise ValueError(f"Unsupported format: {fmt!r} (use csv or parquet)")
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    writer = None
+    try:
+        for block in iter_synthetic(spec):
+            # Categories are fixed per spec, so every block has the same schema
+            table = pa.Table.from_pandas(block, preserve_index=False)
+            if fmt == "csv":
+                table = table.cast(
+                    pa.schema(
+                        [
+                            (
+                                pa.field(f.name, pa.string())
+                                if pa.types.is_dictionary(f.type)
+                                else f
+                            )
+                            for f in table.schema
+                        ]
+                    )
+                )
+            if writer is None:
+                if fmt == "csv":
+                    writer = pa_csv.CSVWriter(
+                        path,
+                        table.schema,
+                        write_options=pa_csv.WriteOptions(quoting_style="needed"),
+                    )
+                else:
+                    writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    return path
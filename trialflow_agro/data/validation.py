@@ -0,0 +1,152 @@
+"""
+Vectorized dataset validation for trialflow-agro.
+
+Column rules are derived from the `TrialRow` Pydantic schema (types,
+nullability and numeric bounds) and evaluated as boolean masks over whole
+columns, so validating every row costs roughly one scan of the data
+instead of one Pydantic model per row.
+"""
+
+from typing import (
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+    get_args,
+    get_origin,
+)
+
+import annotated_types
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel
+
+from trialflow_agro.data.schema import TrialRow
+
+
+class ColumnRule(BaseModel):
+    """Validation rule for a single column, derived from a schema field."""
+
+    column: str
+    kind: str  # "str", "int" or "float"
+    required: bool
+    ge: Optional[float] = None
+    le: Optional[float] = None
+
+
+class RuleViolation(BaseModel):
+    """Rows of a column failing one rule."""
+
+    column: str
+    rule: str
+    n_rows: int
+    first_rows: List[object]
+
+    def describe(self) -> str:
+        return (
+            f"column '{self.column}' {self.rule}: {self.n_rows} row(s), "
+            f"first at index {self.first_rows}"
+        )
+
+
+def rules_from_schema(schema: Type[BaseModel] = TrialRow) -> List[ColumnRule]:
+    """Translate the fields of a Pydantic schema into column rules."""
+    rules: list[ColumnRule] = []
+    for name, field in schema.model_fields.items():
+        annotation = field.annotation
+        # Optional[X] -> X
+        if get_origin(annotation) is Union:
+            annotation = next(a for a in get_args(annotation) if a is not type(None))
+
+        ge = le = None
+        for constraint in field.metadata:
+            if isinstance(constraint, annotated_types.Ge):
+                ge = float(constraint.ge)
+            elif isinstance(constraint, annotated_types.Le):
+                le = float(constraint.le)
+
+        rules.append(
+            ColumnRule(
+                column=field.alias or name,
+                kind=annotation.__name__,
+                required=field.is_required(),
+                ge=ge,
+                le=le,
+            )
+        )
+    return rules
+
+
+def validate_frame(
+    df: pd.DataFrame,
+    rules: Optional[Sequence[ColumnRule]] = None,
+    max_reported: int = 5,
+) -> List[RuleViolation]:
+    """
+    Check every row of `df` against the column rules.
+
+    Returns one RuleViolation per failing (column, rule) pair, listing up to
+    `max_reported` offending row indices. Columns absent from `df` are
+    skipped; required columns are checked separately by the loader.
+    """
+    violations: list[RuleViolation] = []
+    for rule in rules if rules is not None else rules_from_schema():
+        if rule.column not in df.columns:
+            continue
+        for name, mask in _rule_masks(df[rule.column], rule):
+            n_bad = int(mask.sum())
+            if n_bad:
+                violations.append(
+                    RuleViolation(
+                        column=rule.column,
+                        rule=name,
+                        n_rows=n_bad,
+                        first_rows=df.index[mask][:max_reported].tolist(),
+                    )
+                )
+    return violations
+
+
+def _rule_masks(s: pd.Series, rule: ColumnRule) -> List[Tuple[str, np.ndarray]]:
+    missing = s.isna().to_numpy()
+    masks: list[Tuple[str, np.ndarray]] = []
+    # A Pydantic float accepts NaN, so missing values only fail str / int
+    if rule.required and rule.kind != "float":
+        masks.append(("is missing", missing))
+
+    if rule.kind == "str":
+        masks.append(("is not a string", ~missing & ~_is_str(s)))
+        return masks
+
+    numeric = pd.to_numeric(s, errors="coerce").to_numpy(dtype="float64")
+    not_numeric = ~missing & np.isnan(numeric)
+    masks.append((f"is not coercible to {rule.kind}", not_numeric))
+
+    with np.errstate(invalid="ignore"):
+        if rule.kind == "int":
+            fractional = ~np.isnan(numeric) & (numeric != np.floor(numeric))
+            masks.append(("has a fractional part", fractional))
+        if rule.ge is not None or rule.le is not None:
+            lo = rule.ge if rule.ge is not None else -np.inf
+            hi = rule.le if rule.le is not None else np.inf
+            masks.append(
+                (f"is outside [{lo:g}, {hi:g}]", (numeric < lo) | (numeric > hi))
+            )
+    return masks
+
+
+def _is_str(s: pd.Series) -> np.ndarray:
+    """Element-wise 'is a string' mask, vectorized for typed columns."""
+    dtype = s.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        # Check the (few) categories once and broadcast through the codes
+        ok_categories = np.append(_is_str(pd.Series(dtype.categories)), True)
+        # missing values have code -1, which maps to the trailing True
+        return ok_categories[s.cat.codes.to_numpy()]
+    if isinstance(dtype, pd.StringDtype):
+        return np.ones(len(s), dtype=bool)
+    if not pd.api.types.is_object_dtype(dtype):
+        return np.zeros(len(s), dtype=bool)
+    return s.map(lambda v: isinstance(v, str)).to_numpy(dtype=bool)
@@ -0,0 +1,222 @@
+"""
+Bayesian hierarchical fitting for trialflow-agro.
+
+Fits the partial-pooling model built by `TrialModel.build` from a moment
+table (one likelihood term per random-effect x product cell rather than
+per record) with one of:
+- "advi": mean-field ADVI, fast approximate posterior
+- "pathfinder": Pathfinder variational inference (needs `pymc-extras`)
+- "nuts": multi-chain NUTS, chains sampled in parallel processes
+
+PyMC and ArviZ are imported lazily.
+"""
+
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel, Field
+
+from trialflow_agro.inference.moments import rollup_moments
+from trialflow_agro.models.hierarchical import TrialModel
+
+# Number of points kept from the ADVI loss trace
+_LOSS_HISTORY_POINTS = 100
+
+
+class PosteriorSummary(BaseModel):
+    """Posterior mean, sd and 94% highest-density interval of one quantity."""
+
+    name: str
+    mean: float
+    sd: float
+    hdi_low: float
+    hdi_high: float
+    r_hat: Optional[float] = None
+    ess_bulk: Optional[float] = None
+
+
+class SamplingInfo(BaseModel):
+    """Progress and convergence information of the fit."""
+
+    method: str
+    draws: int
+    # NUTS
+    chains: Optional[int] = None
+    tune: Optional[int] = None
+    cores: Optional[int] = None
+    draws_per_chain: List[int] = Field(default_factory=list)
+    divergences: Optional[int] = None
+    max_r_hat: Optional[float] = None
+    min_ess_bulk: Optional[float] = None
+    # ADVI
+    iterations: Optional[int] = None
+    final_loss: Optional[float] = None
+    loss_history: List[float] = Field(default_factory=list)
+
+
+class HierarchicalResult(BaseModel):
+    """Posterior summaries of the hierarchical model."""
+
+    method: str
+    random_effects: List[str]
+    n_observations: int
+    # Sufficient-statistic cells the likelihood is built from
+    n_cells: int
+    wall_time_seconds: float
+    sampling: SamplingInfo
+    product_means: List[PosteriorSummary]
+    # Standard deviations of the random effects, plus the residual one,
+    # in yield units
+    variance_components: List[PosteriorSummary]
+
+
+def fit_hierarchical(model: TrialModel, moments: pd.DataFrame) -> HierarchicalResult:
+    """
+    Build and fit the hierarchical model, timing the whole fit.
+
+    `moments` may be grouped more finely than `model.moment_groups()`; it
+    is rolled up first.
+    """
+    import pymc as pm
+
+    cfg = model.spec.hierarchical
+    start = time.perf_counter()
+    cells = rollup_moments(moments, model.moment_groups())
+    cells = cells[cells["count"] > 0]
+    pm_model = model.build(cells)
+
+    with pm_model:
+        if cfg.method == "nuts":
+            idata = pm.sample(
+                draws=cfg.draws,
+                tune=cfg.tune,
+                chains=cfg.chains,
+                cores=cfg.cores,
+                target_accept=cfg.target_accept,
+                random_seed=cfg.random_seed,
+                progressbar=False,
+                compute_convergence_checks=False,
+            )
+            sampling = SamplingInfo(
+                method=cfg.method,
+                draws=cfg.draws,
+                chains=cfg.chains,
+                tune=cfg.tune,
+                cores=cfg.cores,
+                draws_per_chain=[idata.posterior.sizes["draw"]]
+                * idata.posterior.sizes["chain"],
+                divergences=int(idata.sample_stats["diverging"].sum()),
+            )
+        elif cfg.method == "advi":
+            approx = pm.fit(
+                n=cfg.advi_iterations,
+                method="advi",
+                obj_optimizer=pm.adam(learning_rate=cfg.advi_learning_rate),
+                random_seed=cfg.random_seed,
+                progressbar=False,
+            )
+            idata = approx.sample(cfg.draws, random_seed=cfg.random_seed)
+            loss = np.asarray(approx.hist, dtype="float64")
+            sampling = SamplingInfo(
+                method=cfg.method,
+                draws=cfg.draws,
+                iterations=int(loss.size),
+                final_loss=float(loss[-1]) if loss.size else None,
+                loss_history=_downsample(loss, _LOSS_HISTORY_POINTS),
+            )
+        else:
+            pmx = _import_pymc_extras()
+            idata = pmx.fit(
+                method="pathfinder",
+                num_draws=cfg.draws,
+                random_seed=cfg.random_seed,
+                progressbar=False,
+            )
+            sampling = SamplingInfo(method=cfg.method, draws=cfg.draws)
+
+    levels = [c for c in pm_model.coords if c != "product"]
+    with_diagnostics = cfg.method == "nuts" and idata.posterior.sizes["chain"] > 1
+    summaries = _summarize(
+        idata.posterior,
+        ["product_mean", *[f"sigma_{level}" for level in levels], "sigma"],
+        with_diagnostics,
+    )
+    if with_diagnostics:
+        r_hats = [s.r_hat for s in summaries.values() if s.r_hat is not None]
+        ess = [s.ess_bulk for s in summaries.values() if s.ess_bulk is not None]
+        sampling.max_r_hat = max(r_hats) if r_hats else None
+        sampling.min_ess_bulk = min(ess) if ess else None
+
+    products = list(pm_model.coords["product"])
+    return HierarchicalResult(
+        method=cfg.method,
+        random_effects=levels,
+        n_observations=int(cells["count"].sum()),
+        n_cells=len(cells),
+        wall_time_seconds=time.perf_counter() - start,
+        sampling=sampling,
+        product_means=[summaries[f"product_mean[{p}]"] for p in products],
+        variance_components=[
+            summaries[name]
+            for name in [*[f"sigma_{level}" for level in levels], "sigma"]
+        ],
+    )
+
+
+def _summarize(
+    posterior, var_names: List[str], with_diagnostics: bool
+) -> Dict[str, PosteriorSummary]:
+    """Posterior summaries keyed by "name" or "name[coord]"."""
+    import arviz as az
+
+    subset = posterior[var_names]
+    hdi = az.hdi(subset, hdi_prob=0.94)
+    r_hat = az.rhat(subset) if with_diagnostics else None
+    ess = az.ess(subset, method="bulk") if with_diagnostics else None
+
+    out: Dict[str, PosteriorSummary] = {}
+    for name in var_names:
+        values = subset[name]
+        mean = values.mean(("chain", "draw")).values
+        sd = values.std(("chain", "draw")).values
+        bounds = hdi[name].values
+        extra_dims = [d for d in values.dims if d not in ("chain", "draw")]
+        labels = (
+            [f"{name}[{c}]" for c in values[extra_dims[0]].values]
+            if extra_dims
+            else [name]
+        )
+        for i, label in enumerate(labels):
+            idx = (i,) if extra_dims else ()
+            out[label] = PosteriorSummary(
+                name=label,
+                mean=float(mean[idx]),
+                sd=float(sd[idx]),
+                hdi_low=float(bounds[idx][0]),
+                hdi_high=float(bounds[idx][1]),
+                r_hat=float(r_hat[name].values[idx]) if r_hat is not None else None,
+                ess_bulk=float(ess[name].values[idx]) if ess is not None else None,
+            )
+    return out
+
+
+def _downsample(values: np.ndarray, points: int) -> List[float]:
+    """Evenly spaced subset of `values` (always keeping the last one)."""
+    if values.size <= points:
+        return values.tolist()
+    idx = np.linspace(0, values.size - 1, points).round().astype(int)
+    return values[idx].tolist()
+
+
+def _import_pymc_extras():
+    try:
+        import pymc_extras
+    except ImportError as exc:
+        raise ImportError(
+            "Pathfinder inference requires the 'pymc-extras' package; install "
+            "the 'pathfinder' extra (`pip install \"trialflow-agro[pathfinder]\"`) "
+            "or use method 'advi' or 'nuts'."
+        ) from exc
+    return pymc_extras
@@ -0,0 +1,125 @@
+"""
+Vectorized bootstrap confidence intervals for per-group mean yield.
+
+Groups are bucketed by their number of non-missing yields n. All groups of
+a bucket share one batch of resamples: an (B, n) matrix of resampled row
+positions, turned into an (B, n) count matrix C so that the B bootstrap
+means of every group in the bucket are a single matrix product
+
+    means = values (groups x n) @ C.T / n
+
+Work is split into (bucket, group chunk) tasks sized to a memory budget,
+which can run on a thread or process pool. Each bucket's resamples come
+from an RNG seeded by (random_seed, n), so results do not depend on the
+budget, the chunking or the number of workers.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+_ITEM = np.dtype("float64").itemsize
+
+
+def bootstrap_mean_ci(
+    df: pd.DataFrame,
+    group_cols: Sequence[str],
+    value_col: str = "yield",
+    n_resamples: int = 1000,
+    confidence: float = 0.95,
+    random_seed: int = 0,
+    max_bytes: int = 256 * 1024 * 1024,
+    n_jobs: int = 1,
+    backend: str = "thread",
+) -> pd.DataFrame:
+    """
+    Percentile bootstrap CI of the mean of `value_col` per group.
+
+    Returns a DataFrame with columns "ci_low" / "ci_high", indexed like
+    `compute_moments(df, group_cols)`. Groups with fewer than two
+    non-missing values get NaN bounds.
+    """
+    values = df[value_col].astype("float64")
+    if group_cols:
+        keys = [df[col] for col in group_cols]
+    else:
+        keys = np.zeros(len(df), dtype=np.int8)
+    grouped = values.groupby(keys, dropna=False, observed=True, sort=True)
+    index = grouped.size().index
+    codes = grouped.ngroup().to_numpy()
+
+    # Non-missing values ordered by group, and each group's offset/length
+    valid = ~np.isnan(values.to_numpy())
+    order = np.argsort(codes[valid], kind="stable")
+    sorted_values = values.to_numpy()[valid][order]
+    counts = np.bincount(codes[valid], minlength=len(index))
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+    tasks = _plan(counts, starts, sorted_values, n_resamples, max_bytes)
+    args = (n_resamples, confidence, random_seed, max_bytes)
+    if n_jobs > 1 and len(tasks) > 1:
+        pool_cls = ProcessPoolExecutor if backend == "process" else ThreadPoolExecutor
+        with pool_cls(max_workers=n_jobs) as pool:
+            results = list(
+                pool.map(_bootstrap_task, tasks, *[[a] * len(tasks) for a in args])
+            )
+    else:
+        results = [_bootstrap_task(task, *args) for task in tasks]
+
+    bounds = np.full((len(index), 2), np.nan)
+    for (group_ids, _), task_bounds in zip(tasks, results):
+        bounds[group_ids] = task_bounds
+    return pd.DataFrame(bounds, index=index, columns=["ci_low", "ci_high"])
+
+
+def _plan(
+    counts: np.ndarray,
+    starts: np.ndarray,
+    sorted_values: np.ndarray,
+    n_resamples: int,
+    max_bytes: int,
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Split groups with n >= 2 into (group ids, values matrix) tasks: one
+    bucket per n, chunked so that a task's values and means fit in half
+    the budget (the count matrix gets the other half).
+    """
+    tasks: List[Tuple[np.ndarray, np.ndarray]] = []
+    for n in np.unique(counts[counts >= 2]):
+        group_ids = np.flatnonzero(counts == n)
+        chunk = max(1, (max_bytes // 2) // (_ITEM * (n_resamples + int(n))))
+        for i in range(0, len(group_ids), chunk):
+            ids = group_ids[i : i + chunk]
+            matrix = sorted_values[starts[ids][:, None] + np.arange(n)]
+            tasks.append((ids, matrix))
+    return tasks
+
+
+def _bootstrap_task(
+    task: Tuple[np.ndarray, np.ndarray],
+    n_resamples: int,
+    confidence: float,
+    random_seed: int,
+    max_bytes: int,
+) -> np.ndarray:
+    """CI bounds (groups x 2) for one chunk of equally sized groups."""
+    _, matrix = task
+    n_groups, n = matrix.shape
+    rng = np.random.default_rng([random_seed, n])
+    # Resamples per block, so that the (block, n) index and count matrices
+    # fit in half of the budget
+    block = int(np.clip((max_bytes // 2) // (2 * _ITEM * n), 1, n_resamples))
+
+    means = np.empty((n_groups, n_resamples))
+    for b in range(0, n_resamples, block):
+        size = min(block, n_resamples - b)
+        idx = rng.integers(0, n, size=(size, n))
+        offsets = (np.arange(size) * n)[:, None]
+        resample_counts = np.bincount((idx + offsets).ravel(), minlength=size * n)
+        means[:, b : b + size] = matrix @ resample_counts.reshape(size, n).T
+    means /= n
+
+    alpha = 1.0 - confidence
+    return np.quantile(means, [alpha / 2, 1 - alpha / 2], axis=1).T
@@ -0,0 +1,130 @@
+"""
+Paired product comparisons for trialflow-agro.
+
+Products are compared within pairing units (by default the same field in
+the same year). The moment table is rolled up to unit x product and
+pivoted once into a units x products matrix of mean yields X with a
+presence mask M. For every product pair (a, b) the per-unit differences
+d = X[:, a] - X[:, b] over units where both are present then reduce to
+matrix products:
+
+    n       = M.T @ M
+    sum d   = (X.T @ M) - (M.T @ X)
+    sum d^2 = (X^2).T @ M + M.T @ X^2 - 2 X.T @ X
+
+with X zero-filled where a product is missing. Win counts, which are not
+bilinear, are computed in blocks of products to bound memory.
+"""
+
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel
+
+from trialflow_agro.inference.moments import rollup_moments
+
+# Upper bound on units x block x products elements compared at once
+_MAX_BLOCK_CELLS = 1 << 24
+
+
+class ProductComparison(BaseModel):
+    """Within-unit comparison of product_a against product_b."""
+
+    product_a: str
+    product_b: str
+    # Units (e.g. field-years) where both products were observed
+    n: int
+    # Mean and standard deviation of (yield_a - yield_b) over those units
+    mean_diff: float
+    std_diff: Optional[float] = None
+    # Share of units where a out-yields b (ties count half)
+    win_rate: float
+
+
+class PairedComparisons:
+    """
+    Computes paired differences for all product pairs from a moment table
+    grouped by (at least) `pair_on` + product.
+    """
+
+    def __init__(
+        self,
+        pair_on: Sequence[str] = ("field_id", "year"),
+        min_pairs: int = 1,
+    ):
+        if not pair_on:
+            raise ValueError("Paired comparisons need at least one pair_on column.")
+        self.pair_on = list(pair_on)
+        self.min_pairs = min_pairs
+
+    def grouping(self) -> List[str]:
+        """Moment-table grouping the comparisons are derived from."""
+        return [*self.pair_on, "product"]
+
+    def run_moments(self, moments: pd.DataFrame) -> List[ProductComparison]:
+        """Comparisons of every product pair observed together in a unit."""
+        cells = rollup_moments(moments, self.grouping())
+        cells = cells[cells["count"] > 0]
+        if cells.empty:
+            return []
+        means = (cells["sum"] / cells["count"]).to_numpy()
+
+        # The rolled-up table is sorted by unit, so a new unit starts
+        # wherever any pairing level's code changes
+        index = cells.index
+        unit_levels = np.stack([index.codes[i] for i in range(len(self.pair_on))])
+        new_unit = np.concatenate([[True], (np.diff(unit_levels, axis=1) != 0).any(0)])
+        unit_codes = np.cumsum(new_unit) - 1
+        product_level = index.codes[len(self.pair_on)]
+        used, product_codes = np.unique(product_level, return_inverse=True)
+        products = index.levels[len(self.pair_on)][used]
+        n_units, n_products = int(unit_codes[-1]) + 1, len(products)
+
+        values = np.zeros((n_units, n_products))
+        present = np.zeros((n_units, n_products))
+        values[unit_codes, product_codes] = means
+        present[unit_codes, product_codes] = 1.0
+
+        n = present.T @ present
+        cross = values.T @ present
+        sum_d = cross - cross.T
+        squares = (values**2).T @ present
+        sum_d2 = squares + squares.T - 2 * (values.T @ values)
+        wins = self._win_counts(values, present)
+
+        out: List[ProductComparison] = []
+        for a, b in zip(*np.triu_indices(n_products, k=1)):
+            pairs = int(n[a, b])
+            if pairs < max(self.min_pairs, 1):
+                continue
+            mean = sum_d[a, b] / pairs
+            var = (sum_d2[a, b] - pairs * mean**2) / (pairs - 1) if pairs > 1 else None
+            out.append(
+                ProductComparison(
+                    product_a=str(products[a]),
+                    product_b=str(products[b]),
+                    n=pairs,
+                    mean_diff=float(mean),
+                    std_diff=float(np.sqrt(max(var, 0.0))) if var is not None else None,
+                    win_rate=float(wins[a, b] / pairs),
+                )
+            )
+        return out
+
+    def _win_counts(self, values: np.ndarray, present: np.ndarray) -> np.ndarray:
+        """wins[a, b]: units where a beats b, plus half the ties."""
+        n_units, n_products = values.shape
+        mask = present.astype(bool)
+        wins = np.zeros((n_products, n_products))
+        step = max(1, _MAX_BLOCK_CELLS // max(n_units * n_products, 1))
+        for start in range(0, n_products, step):
+            block = slice(start, start + step)
+            # units x block x products
+            both = mask[:, block, None] & mask[:, None, :]
+            a = values[:, block, None]
+            b = values[:, None, :]
+            beats = ((a > b) & both).sum(axis=0)
+            ties = ((a == b) & both).sum(axis=0)
+            wins[block] = beats + 0.5 * ties
+        return wins
@@ -2,23 +2,136 @@
 Basic diagnostics for trialflow-agro.
 """
 
-from typing import Dict
+from typing import ClassVar, Dict, List, Optional
 
+import numpy as np
 import pandas as pd
 
+from trialflow_agro.inference.quantiles import bin_values, value_bins
 
-def compute_diagnostics(df: pd.DataFrame) -> Dict[str, object]:
+# Resolution of the yield histogram kept for report plots
+HISTOGRAM_RELATIVE_ERROR = 0.01
+
+
+def compute_diagnostics(
+    df: pd.DataFrame, moments: Optional[pd.DataFrame] = None
+) -> Dict[str, object]:
     """
     Compute a few simple diagnostics for the dataset.
+
+    If a moment table from the inference pass is given, columns that are
+    part of its group keys are counted from the (much smaller) index
+    instead of rescanning the full dataset.
+    """
+    accumulator = DiagnosticsAccumulator()
+    accumulator.update(df, moments)
+    return accumulator.result()
+
+
+class DiagnosticsAccumulator:
+    """
+    Computes the same diagnostics as `compute_diagnostics` from a stream of
+    DataFrame chunks, keeping only the distinct values of each column.
+
+    Its state is JSON-serializable, so diagnostics can be updated
+    incrementally across runs (see `state` / `from_state`).
+
+    It also counts yields in relative-error sketch bins (see `quantiles`),
+    from which `yield_histogram` derives plot bins without the records.
+
+    If the records were cleaned, `cleaning` holds the cleaning report
+    (rows in and out, rows removed per step); it is reported and persisted
+    with the rest of the state.
     """
-    return {
-        "n_records": int(df.shape[0]),
-        "n_fields": int(df["field_id"].nunique()) if "field_id" in df.columns else None,
-        "n_farms": int(df["farm_id"].nunique()) if "farm_id" in df.columns else None,
-        "n_products": int(df["product"].nunique()) if "product" in df.columns else None,
-        "years": (
-            sorted(df["year"].dropna().unique().tolist())
-            if "year" in df.columns
-            else []
-        ),
+
+    _UNIQUE_COLUMNS: ClassVar[Dict[str, str]] = {
+        "n_fields": "field_id",
+        "n_farms": "farm_id",
+        "n_products": "product",
     }
+
+    def __init__(self) -> None:
+        self.n_records = 0
+        self._unique: Dict[str, Optional[set]] = {
+            col: None for col in [*self._UNIQUE_COLUMNS.values(), "year"]
+        }
+        # sketch bin -> number of yields
+        self._yield_bins: Dict[int, int] = {}
+        self.cleaning: Optional[Dict[str, object]] = None
+
+    def update(
+        self, chunk: pd.DataFrame, moments: Optional[pd.DataFrame] = None
+    ) -> None:
+        """
+        Add a chunk of records. If `moments` (the chunk's moment table) is
+        given, its group keys are used instead of scanning those columns.
+        """
+        self.n_records += int(chunk.shape[0])
+        for col in self._unique:
+            if moments is not None and col in moments.index.names:
+                values = moments.index.get_level_values(col)
+            elif col in chunk.columns:
+                values = chunk[col]
+            else:
+                continue
+            seen = self._unique[col]
+            if seen is None:
+                seen = self._unique[col] = set()
+            seen.update(values.dropna().unique().tolist())
+
+        if "yield" in chunk.columns:
+            values = chunk["yield"].to_numpy(dtype="float64")
+            bins, counts = np.unique(
+                value_bins(values[~np.isnan(values)], HISTOGRAM_RELATIVE_ERROR),
+                return_counts=True,
+            )
+            for b, c in zip(bins.tolist(), counts.tolist()):
+                self._yield_bins[b] = self._yield_bins.get(b, 0) + c
+
+    def result(self) -> Dict[str, object]:
+        out: Dict[str, object] = {"n_records": self.n_records}
+        for key, col in self._UNIQUE_COLUMNS.items():
+            seen = self._unique[col]
+            out[key] = len(seen) if seen is not None else None
+        years = self._unique["year"]
+        out["years"] = sorted(years) if years is not None else []
+        if self.cleaning is not None:
+            out["cleaning"] = self.cleaning
+        return out
+
+    def yield_histogram(self, n_bins: int = 40) -> Optional[Dict[str, List]]:
+        """
+        Equal-width histogram of the yields ({"edges", "counts"}), rebinned
+        from the sketch bins; None if no yields were seen.
+        """
+        if not self._yield_bins:
+            return None
+        bins = np.fromiter(self._yield_bins, dtype=np.int64)
+        weights = np.fromiter(self._yield_bins.values(), dtype=np.int64)
+        values = bin_values(bins, HISTOGRAM_RELATIVE_ERROR)
+        counts, edges = np.histogram(values, bins=n_bins, weights=weights)
+        return {"edges": edges.tolist(), "counts": counts.astype(int).tolist()}
+
+    def state(self) -> Dict[str, object]:
+        """JSON-serializable snapshot of the accumulator."""
+        return {
+            "n_records": self.n_records,
+            "unique": {
+                col: sorted(seen, key=str) if seen is not None else None
+                for col, seen in self._unique.items()
+            },
+            "yield_bins": {str(b): c for b, c in sorted(self._yield_bins.items())},
+            "cleaning": self.cleaning,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, object]) -> "DiagnosticsAccumulator":
+        accumulator = cls()
+        accumulator.n_records = int(state["n_records"])
+        for col, values in state["unique"].items():
+            accumulator._unique[col] = set(values) if values is not None else None
+        accumulator._yield_bins = {
+            int(b): int(c) for b, c in state.get("yield_bins", {}).items()
+        }
+        accumulator.cleaning = state.get("cleaning")
+        return accumulator
@@ -1,40 +1,47 @@
 """
 Inference logic for trialflow-agro.
 
-For v0.1, "inference" consists of computing descriptive statistics
-for overall data, per-product, and optional grouped summaries.
+"Inference" consists of computing descriptive statistics for overall
+data, per-product, and optional grouped summaries, plus, with the
+hierarchical backend, a Bayesian partial-pooling fit (see `bayes`).
 """
 
-from typing import Dict, List, Optional
+from contextlib import closing
+from typing import Dict, Iterable, List, Optional
 
+import numpy as np
 import pandas as pd
 from pydantic import BaseModel, Field
 
-
-class StatBlock(BaseModel):
-    """
-    Internal block of statistics used to compute summaries.
-
-    Using Pydantic keeps the entire inference stack consistent
-    and ensures everything is JSON-serializable.
-    """
-
-    n: int
-    mean: float
-    std: Optional[float] = None
-    min: float
-    max: float
-
-
-class GroupSummary(BaseModel):
-    """Summary statistics for a single group."""
-
-    group_values: Dict[str, object]
-    n: int
-    mean_yield: float
-    std_yield: Optional[float] = None
-    min_yield: float
-    max_yield: float
+from trialflow_agro.config.schema import (
+    BootstrapConfig,
+    ComparisonConfig,
+    QuantileConfig,
+    SpatialConfig,
+)
+from trialflow_agro.inference.bayes import HierarchicalResult, fit_hierarchical
+from trialflow_agro.inference.bootstrap import bootstrap_mean_ci
+from trialflow_agro.inference.comparisons import PairedComparisons, ProductComparison
+from trialflow_agro.inference.moments import (
+    MomentAccumulator,
+    compute_moments,
+    finest_grouping,
+    rollup_moments,
+)
+from trialflow_agro.inference.quantiles import (
+    SketchAccumulator,
+    compute_sketch,
+    exact_quantiles,
+    sketch_quantiles,
+)
+from trialflow_agro.inference.spatial import (
+    ZONE_COLUMN,
+    SpatialAnalysis,
+    SpatialResult,
+    SpatialTables,
+)
+from trialflow_agro.inference.summaries import GroupSummary, SummaryTable
+from trialflow_agro.models.hierarchical import TrialModel
 
 
 class TrialInferenceResult(BaseModel):
@@ -45,90 +52,411 @@ class TrialInferenceResult(BaseModel):
     overall: GroupSummary
     by_product: List[GroupSummary]
     by_groups: List[GroupSummary] = Field(default_factory=list)
+    hierarchical: Optional[HierarchicalResult] = None
+    comparisons: List[ProductComparison] = Field(default_factory=list)
+    spatial: Optional[SpatialResult] = None
+
+
+class TrialInferenceTables:
+    """
+    Array-backed counterpart of `TrialInferenceResult`, used internally and
+    for writing results: every summary level is a `SummaryTable`.
+    """
+
+    __slots__ = (
+        "by_groups",
+        "by_product",
+        "comparisons",
+        "hierarchical",
+        "overall",
+        "spatial",
+    )
+
+    def __init__(
+        self,
+        overall: SummaryTable,
+        by_product: SummaryTable,
+        by_groups: Optional[SummaryTable] = None,
+        hierarchical: Optional[HierarchicalResult] = None,
+        comparisons: Optional[List[ProductComparison]] = None,
+        spatial: Optional[SpatialTables] = None,
+    ):
+        self.overall = overall
+        self.by_product = by_product
+        self.by_groups = by_groups
+        self.hierarchical = hierarchical
+        self.comparisons = comparisons or []
+        self.spatial = spatial
+
+    def n_groups(self) -> int:
+        """Number of summary rows at the finest reported level."""
+        if self.by_groups is not None:
+            return len(self.by_groups)
+        return len(self.by_product)
+
+    def to_result(self) -> TrialInferenceResult:
+        """The public Pydantic result."""
+        return TrialInferenceResult.model_construct(
+            overall=self.overall.summaries()[0],
+            by_product=self.by_product.summaries(),
+            by_groups=self.by_groups.summaries() if self.by_groups else [],
+            hierarchical=self.hierarchical,
+            comparisons=self.comparisons,
+            spatial=self.spatial.to_result() if self.spatial else None,
+        )
+
+    def to_dict(self) -> Dict[str, object]:
+        """JSON-ready dict, equal to `to_result().model_dump(mode="json")`."""
+        return {
+            "overall": self.overall.records()[0],
+            "by_product": self.by_product.records(),
+            "by_groups": self.by_groups.records() if self.by_groups else [],
+            "hierarchical": (
+                self.hierarchical.model_dump(mode="json")
+                if self.hierarchical is not None
+                else None
+            ),
+            "comparisons": [c.model_dump(mode="json") for c in self.comparisons],
+            "spatial": self.spatial.to_dict() if self.spatial else None,
+        }
 
 
 class TrialInference:
     """
     Computes grouped summary statistics for trial data.
+
+    With `n_jobs > 1`, group moments are computed on hash partitions of the
+    data in parallel (`backend` "thread" or "process"); results are
+    identical to the serial path.
+
+    If `model` uses the "hierarchical" backend, the Bayesian hierarchical
+    model is also fitted, from the same moment table: the finest grouping
+    then includes the model's random-effect levels.
+
+    If `bootstrap` is enabled, per-product and per-group summaries also get
+    bootstrap confidence intervals of the mean (see `bootstrap`), which
+    need the records themselves rather than only the moment table.
+
+    If `quantiles` lists levels, every summary also reports those yield
+    quantiles, computed exactly from the records or from a mergeable
+    sketch built alongside the moments (see `quantiles`).
+
+    If `comparisons` is enabled, every product pair is also compared within
+    field/year units (see `comparisons`); the finest grouping then includes
+    the pairing columns.
+
+    If `spatial` is enabled, records with lat/lon are also summarized by
+    grid cell or boundary polygon, with Moran's I of yield (see `spatial`);
+    like bootstrap, this needs the records.
     """
 
     def __init__(
-        self, groups: Optional[list[str]] = None, min_records_per_group: int = 5
+        self,
+        groups: Optional[list[str]] = None,
+        min_records_per_group: int = 5,
+        n_jobs: int = 1,
+        backend: str = "thread",
+        model: Optional[TrialModel] = None,
+        bootstrap: Optional[BootstrapConfig] = None,
+        quantiles: Optional[QuantileConfig] = None,
+        comparisons: Optional[ComparisonConfig] = None,
+        spatial: Optional[SpatialConfig] = None,
     ):
         self.groups = groups or []
         self.min_records_per_group = min_records_per_group
+        self.n_jobs = n_jobs
+        self.backend = backend
+        self.model = model
+        self.bootstrap = bootstrap
+        self.quantiles = quantiles
+        self.comparisons: Optional[PairedComparisons] = None
+        if comparisons is not None and comparisons.enabled:
+            self.comparisons = PairedComparisons(
+                comparisons.pair_on, comparisons.min_pairs
+            )
+        self.spatial: Optional[SpatialAnalysis] = None
+        if spatial is not None and spatial.enabled:
+            self.spatial = SpatialAnalysis(spatial)
 
     def run(self, df: pd.DataFrame) -> TrialInferenceResult:
-        """Compute overall and grouped summary statistics."""
-        overall = self._compute_summary(df, group_values={})
+        """
+        Compute overall and grouped summary statistics.
+
+        The data is aggregated once at the finest grouping required by any
+        summary level; every coarser level is rolled up from that table.
+        """
+        return self.run_moments(self.compute_moments(df), df)
+
+    @property
+    def bootstrap_enabled(self) -> bool:
+        return self.bootstrap is not None and self.bootstrap.enabled
+
+    @property
+    def quantiles_enabled(self) -> bool:
+        return self.quantiles is not None and bool(self.quantiles.levels)
+
+    def uses_sketch(self, streaming: bool = False) -> bool:
+        """Whether quantiles come from a sketch for in-memory/streamed data."""
+        if not self.quantiles_enabled:
+            return False
+        method = self.quantiles.method
+        return method == "sketch" or (method == "auto" and streaming)
+
+    @property
+    def spatial_enabled(self) -> bool:
+        return self.spatial is not None
+
+    @property
+    def needs_records(self) -> bool:
+        """Whether summaries need the records, not only the moment table."""
+        return self.bootstrap_enabled or self.spatial_enabled
 
-        by_product = self._compute_grouped(df, ["product"])
+    @property
+    def is_hierarchical(self) -> bool:
+        return self.model is not None and self.model.is_hierarchical
 
-        by_groups: list[GroupSummary] = []
+    def run_chunks(self, chunks: Iterable[pd.DataFrame]) -> TrialInferenceResult:
+        """
+        Compute the same summaries as `run` from a stream of DataFrame
+        chunks, holding only one chunk and the running moments in memory.
+
+        Quantiles, if enabled, come from a sketch.
+        """
+        sketches = self.sketch_accumulator() if self.uses_sketch(True) else None
+        with closing(self.moment_accumulator()) as accumulator:
+            for chunk in chunks:
+                accumulator.update(chunk)
+                if sketches is not None:
+                    sketches.update(chunk)
+        sketch = sketches.result() if sketches is not None else None
+        return self.run_moments(accumulator.result(), sketch=sketch)
+
+    def finest_grouping(self) -> List[str]:
+        """Grouping columns that all summary levels can be derived from."""
+        levels = [["product"], self.groups]
+        if self.is_hierarchical:
+            levels.append(self.model.moment_groups())
+        if self.comparisons is not None:
+            levels.append(self.comparisons.grouping())
+        return finest_grouping(levels)
+
+    def record_columns(self) -> List[str]:
+        """Columns the moments and the record-level steps read."""
+        columns = self.finest_grouping()
+        if self.spatial is not None:
+            columns = [*columns, *self.spatial.columns()]
+        return list(dict.fromkeys(columns))
+
+    def compute_moments(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Moment table of `df` at the finest grouping."""
+        return compute_moments(
+            df, self.finest_grouping(), n_jobs=self.n_jobs, backend=self.backend
+        )
+
+    def moment_accumulator(self) -> MomentAccumulator:
+        """Accumulator building the finest-grouping moment table chunk by chunk."""
+        return MomentAccumulator(
+            self.finest_grouping(), n_jobs=self.n_jobs, backend=self.backend
+        )
+
+    def sketch_accumulator(self) -> SketchAccumulator:
+        """Accumulator building the finest-grouping quantile sketch."""
+        return SketchAccumulator(
+            self.finest_grouping(), relative_error=self.quantiles.relative_error
+        )
+
+    def run_moments(
+        self,
+        moments: pd.DataFrame,
+        data: Optional[pd.DataFrame] = None,
+        sketch: Optional[pd.DataFrame] = None,
+    ) -> TrialInferenceResult:
+        """
+        Derive all summary levels from a precomputed moment table.
+
+        `data` (the records the moments were computed from) is only needed
+        for bootstrap confidence intervals, spatial summaries and for
+        quantiles without a precomputed `sketch` table.
+        """
+        return self.summarize_moments(moments, data, sketch).to_result()
+
+    def summarize_moments(
+        self,
+        moments: pd.DataFrame,
+        data: Optional[pd.DataFrame] = None,
+        sketch: Optional[pd.DataFrame] = None,
+    ) -> TrialInferenceTables:
+        """`run_moments`, returning the array-backed tables."""
+        if self.bootstrap_enabled and data is None:
+            raise ValueError(
+                "Bootstrap confidence intervals need the records; pass `data`."
+            )
+        if self.spatial_enabled and data is None:
+            raise ValueError("Spatial summaries need the records; pass `data`.")
+        if self.quantiles_enabled and sketch is None:
+            if data is None:
+                raise ValueError("Quantiles need the records or a sketch table.")
+            if self.uses_sketch():
+                sketch = compute_sketch(
+                    data, self.finest_grouping(), self.quantiles.relative_error
+                )
+
+        overall = self._table(
+            rollup_moments(moments, []),
+            [],
+            quantiles=self._quantiles(data, sketch, []),
+        )
+        by_product = self._table(
+            rollup_moments(moments, ["product"]),
+            ["product"],
+            self.min_records_per_group,
+            self._mean_ci(data, ["product"]),
+            self._quantiles(data, sketch, ["product"]),
+        )
+
+        by_groups: Optional[SummaryTable] = None
         if self.groups:
-            by_groups = self._compute_grouped(df, self.groups)
+            by_groups = self._table(
+                rollup_moments(moments, self.groups),
+                self.groups,
+                self.min_records_per_group,
+                self._mean_ci(data, self.groups),
+                self._quantiles(data, sketch, self.groups),
+            )
+
+        hierarchical: Optional[HierarchicalResult] = None
+        if self.is_hierarchical:
+            hierarchical = fit_hierarchical(self.model, moments)
+
+        comparisons: List[ProductComparison] = []
+        if self.comparisons is not None:
+            comparisons = self.comparisons.run_moments(moments)
 
-        return TrialInferenceResult(
+        spatial: Optional[SpatialTables] = None
+        if self.spatial is not None:
+            spatial = self._spatial(data)
+
+        return TrialInferenceTables(
             overall=overall,
             by_product=by_product,
             by_groups=by_groups,
+            hierarchical=hierarchical,
+            comparisons=comparisons,
+            spatial=spatial,
         )
 
-    def _compute_summary(
-        self, df: pd.DataFrame, group_values: Dict[str, object]
-    ) -> GroupSummary:
-        stats = self._stats_for_series(df["yield"])
-        return GroupSummary(
-            group_values=group_values,
-            n=stats.n,
-            mean_yield=stats.mean,
-            std_yield=stats.std,
-            min_yield=stats.min,
-            max_yield=stats.max,
+    def _spatial(self, data: pd.DataFrame) -> SpatialTables:
+        """Zone summaries (from a zone-level moment table) and Moran's I."""
+        zones, crs = self.spatial.zones(data)
+        group_cols = self.spatial.grouping()
+        zoned = data.assign(**{ZONE_COLUMN: zones.zone})[zones.zone.codes >= 0]
+        moments = compute_moments(
+            zoned[[*group_cols, "yield"]],
+            group_cols,
+            n_jobs=self.n_jobs,
+            backend=self.backend,
+        )
+        return SpatialTables(
+            zones_kind=self.spatial.config.zones,
+            crs=crs,
+            n_assigned=zones.n_assigned,
+            n_unassigned=zones.n_unassigned,
+            zones=self._table(moments, group_cols, self.min_records_per_group),
+            moran=self.spatial.morans_i(data, zones),
         )
 
-    def _compute_grouped(
-        self, df: pd.DataFrame, group_cols: list[str]
-    ) -> List[GroupSummary]:
-        summaries: list[GroupSummary] = []
-        g = df.groupby(group_cols, dropna=False)
-
-        for keys, group_df in g:
-            if len(group_df) < self.min_records_per_group:
-                continue
-
-            # Normalize keys to dict
-            if isinstance(keys, tuple):
-                group_values = {col: val for col, val in zip(group_cols, keys)}
-            else:
-                group_values = {group_cols[0]: keys}
-
-            stats = self._stats_for_series(group_df["yield"])
-            summaries.append(
-                GroupSummary(
-                    group_values=group_values,
-                    n=stats.n,
-                    mean_yield=stats.mean,
-                    std_yield=stats.std,
-                    min_yield=stats.min,
-                    max_yield=stats.max,
-                )
-            )
+    def _mean_ci(
+        self, data: Optional[pd.DataFrame], group_cols: list[str]
+    ) -> Optional[pd.DataFrame]:
+        """Bootstrap CI table for `group_cols`, if enabled."""
+        if not self.bootstrap_enabled:
+            return None
+        cfg = self.bootstrap
+        return bootstrap_mean_ci(
+            data,
+            group_cols,
+            n_resamples=cfg.n_resamples,
+            confidence=cfg.confidence,
+            random_seed=cfg.random_seed,
+            max_bytes=int(cfg.memory_budget_mb * 1024 * 1024),
+            n_jobs=self.n_jobs,
+            backend=self.backend,
+        )
 
-        return summaries
+    def _quantiles(
+        self,
+        data: Optional[pd.DataFrame],
+        sketch: Optional[pd.DataFrame],
+        group_cols: list[str],
+    ) -> Optional[pd.DataFrame]:
+        """Quantile table for `group_cols`: from the sketch, else exact."""
+        if not self.quantiles_enabled:
+            return None
+        cfg = self.quantiles
+        if sketch is not None:
+            return sketch_quantiles(sketch, group_cols, cfg.levels, cfg.relative_error)
+        return exact_quantiles(data, group_cols, cfg.levels)
 
-    def _stats_for_series(self, s: pd.Series) -> StatBlock:
-        s_clean = s.dropna()
-        n = int(s_clean.shape[0])
-        if n == 0:
-            return StatBlock(
-                n=0, mean=float("nan"), std=None, min=float("nan"), max=float("nan")
-            )
+    def _table(
+        self,
+        moments: pd.DataFrame,
+        group_cols: list[str],
+        min_records: int = 0,
+        ci: Optional[pd.DataFrame] = None,
+        quantiles: Optional[pd.DataFrame] = None,
+    ) -> SummaryTable:
+        """
+        Build a SummaryTable from a moment table.
+
+        Groups below `min_records` are dropped with a boolean mask, and all
+        statistics are derived column-wise; no per-group object is created.
+        """
+        moments = moments[moments["size"] >= min_records]
+        count = moments["count"].to_numpy(dtype="int64")
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = moments["sum"].to_numpy(dtype="float64") / count
+            std = np.sqrt(moments["m2"].to_numpy(dtype="float64") / (count - 1))
+        # mean/min/max of a group without any non-missing yield are NaN
+        mean[count == 0] = np.nan
+        std[count <= 1] = np.nan
+
+        ci_low = ci_high = None
+        if ci is not None:
+            ci = _aligned(ci, moments.index)
+            ci_low = ci["ci_low"].to_numpy(dtype="float64")
+            ci_high = ci["ci_high"].to_numpy(dtype="float64")
+        quantile_columns = None
+        if quantiles is not None:
+            quantiles = _aligned(quantiles, moments.index)
+            quantile_columns = {
+                label: quantiles[label].to_numpy(dtype="float64")
+                for label in quantiles.columns
+            }
 
-        return StatBlock(
-            n=n,
-            mean=float(s_clean.mean()),
-            std=float(s_clean.std()) if n > 1 else None,
-            min=float(s_clean.min()),
-            max=float(s_clean.max()),
+        return SummaryTable(
+            group_cols,
+            [moments.index.get_level_values(col).tolist() for col in group_cols],
+            n=count,
+            mean_yield=mean,
+            std_yield=std,
+            min_yield=moments["min"].to_numpy(dtype="float64"),
+            max_yield=moments["max"].to_numpy(dtype="float64"),
+            mean_ci_low=ci_low,
+            mean_ci_high=ci_high,
+            quantiles=quantile_columns,
         )
+
+
+def _aligned(table: pd.DataFrame, index: pd.Index) -> pd.DataFrame:
+    """
+    `table.reindex(index)`, also matching missing group keys: reindexing
+    a MultiIndex never matches NaN, so multi-level keys are joined instead.
+    """
+    if not isinstance(index, pd.MultiIndex):
+        return table.reindex(index)
+    keys = index.to_frame(index=False)
+    rows = table.index.to_frame(index=False).assign(_row=np.arange(len(table)))
+    positions = keys.merge(rows, on=list(keys.columns), how="left")["_row"]
+    out = table.reset_index(drop=True).reindex(positions.to_numpy())
+    out.index = index
+    return out
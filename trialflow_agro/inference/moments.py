@@ -0,0 +1,239 @@
+"""
+Mergeable per-group moments for trialflow-agro.
+
+A moment table is a DataFrame indexed by group keys with the columns in
+MOMENT_COLUMNS:
+
+- size:  number of rows in the group (including missing yields)
+- count: number of non-missing yields
+- sum:   sum of yields
+- m2:    sum of squared deviations from the group mean
+- min / max
+
+Moment tables computed at a fine grouping can be rolled up exactly to any
+coarser grouping (Chan et al. parallel variance update), so overall,
+per-product and custom grouped summaries can all be derived from a
+single aggregation pass over the data.
+"""
+
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+MOMENT_COLUMNS = ["size", "count", "sum", "m2", "min", "max"]
+
+
+def finest_grouping(levels: Iterable[Sequence[str]]) -> List[str]:
+    """
+    Return the finest grouping that every level in `levels` can be rolled
+    up from: the ordered union of their columns.
+    """
+    finest: list[str] = []
+    for level in levels:
+        for col in level:
+            if col not in finest:
+                finest.append(col)
+    return finest
+
+
+def compute_moments(
+    df: pd.DataFrame,
+    group_cols: Sequence[str],
+    value_col: str = "yield",
+    n_jobs: int = 1,
+    backend: str = "thread",
+    pool: Optional[Executor] = None,
+) -> pd.DataFrame:
+    """
+    Aggregate `value_col` into a moment table with one groupby pass.
+
+    With `n_jobs > 1` the rows are hash-partitioned by group key and the
+    partitions are aggregated concurrently on a thread or process pool
+    (`pool` if given, else one created for this call). Every group lands
+    in exactly one partition with its rows in their original order, so the
+    result is identical to the serial path.
+    """
+    if n_jobs > 1 and group_cols and len(df) > 1:
+        return _compute_moments_parallel(
+            df, group_cols, value_col, n_jobs, backend, pool
+        )
+
+    # Accumulate in float64 even when yields are stored more compactly
+    values = df[value_col].astype("float64")
+    if group_cols:
+        keys = [df[col] for col in group_cols]
+    else:
+        keys = np.zeros(len(df), dtype=np.int8)
+    agg = values.groupby(keys, dropna=False, observed=True, sort=True).agg(
+        ["size", "count", "sum", "var", "min", "max"]
+    )
+    # var is NaN for groups with fewer than two values, where M2 is 0
+    agg["m2"] = (agg.pop("var") * (agg["count"] - 1)).fillna(0.0)
+    return agg[MOMENT_COLUMNS]
+
+
+def partition_by_keys(
+    df: pd.DataFrame, group_cols: Sequence[str], n_parts: int
+) -> List[pd.DataFrame]:
+    """
+    Split `df` into `n_parts` row subsets such that all rows sharing the
+    same `group_cols` keys fall into the same subset (stable row order).
+    """
+    hashes = pd.util.hash_pandas_object(df[list(group_cols)], index=False)
+    part = (hashes.to_numpy() % np.uint64(n_parts)).astype(np.intp)
+    order = np.argsort(part, kind="stable")
+    bounds = np.searchsorted(part[order], np.arange(n_parts + 1))
+    return [df.iloc[order[lo:hi]] for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo]
+
+
+def make_pool(n_jobs: int, backend: str) -> Executor:
+    """Thread or process pool of `n_jobs` workers for `compute_moments`."""
+    if backend not in {"thread", "process"}:
+        raise ValueError(f"Unknown execution backend: {backend}")
+    pool_cls = ThreadPoolExecutor if backend == "thread" else ProcessPoolExecutor
+    return pool_cls(max_workers=n_jobs)
+
+
+def _compute_moments_parallel(
+    df: pd.DataFrame,
+    group_cols: Sequence[str],
+    value_col: str,
+    n_jobs: int,
+    backend: str,
+    pool: Optional[Executor] = None,
+) -> pd.DataFrame:
+    if pool is None:
+        with make_pool(n_jobs, backend) as own_pool:
+            return _compute_moments_parallel(
+                df, group_cols, value_col, n_jobs, backend, own_pool
+            )
+
+    parts = partition_by_keys(df[[*group_cols, value_col]], group_cols, n_jobs)
+    partials = list(
+        pool.map(
+            compute_moments,
+            parts,
+            [list(group_cols)] * len(parts),
+            [value_col] * len(parts),
+        )
+    )
+    # Partitions hold disjoint groups, so merging is a concat + re-sort
+    return pd.concat(partials).sort_index()
+
+
+def rollup_moments(moments: pd.DataFrame, group_cols: Sequence[str]) -> pd.DataFrame:
+    """
+    Combine rows of a moment table that share the same `group_cols` keys.
+
+    `group_cols` must be a subset of the table's index levels; an empty
+    list collapses the whole table into a single overall row, which has
+    zero counts if the table is empty.
+    """
+    if not group_cols and moments.empty:
+        return pd.DataFrame(
+            {
+                "size": [0],
+                "count": [0],
+                "sum": [0.0],
+                "m2": [0.0],
+                "min": [np.nan],
+                "max": [np.nan],
+            },
+            index=pd.Index([0], dtype=np.int8),
+        )
+    if group_cols:
+        grouper = {
+            "level": list(group_cols),
+            "dropna": False,
+            "observed": True,
+            "sort": True,
+        }
+    else:
+        grouper = {"by": np.zeros(len(moments), dtype=np.int8)}
+
+    g = moments.groupby(**grouper)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        group_mean = g["sum"].transform("sum") / g["count"].transform("sum")
+        part_mean = moments["sum"] / moments["count"]
+    shift = (moments["count"] * (part_mean - group_mean) ** 2).fillna(0.0)
+
+    return (
+        moments.assign(m2=moments["m2"] + shift)
+        .groupby(**grouper)
+        .agg(
+            {
+                "size": "sum",
+                "count": "sum",
+                "sum": "sum",
+                "m2": "sum",
+                "min": "min",
+                "max": "max",
+            }
+        )
+    )
+
+
+def merge_moments(tables: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Exactly merge moment tables computed on disjoint slices of the data.
+
+    All tables must share the same index levels.
+    """
+    combined = pd.concat(list(tables))
+    keys = [name for name in combined.index.names if name is not None]
+    return rollup_moments(combined, keys)
+
+
+class MomentAccumulator:
+    """
+    Incrementally builds a moment table from a stream of DataFrame chunks.
+
+    Each chunk is aggregated and merged into the running table right away,
+    so memory is bounded by the chunk size plus the number of groups.
+
+    With `n_jobs > 1` one worker pool serves every chunk; call `close`
+    (e.g. via `contextlib.closing`) to shut it down.
+    """
+
+    def __init__(
+        self,
+        group_cols: Sequence[str],
+        value_col: str = "yield",
+        n_jobs: int = 1,
+        backend: str = "thread",
+    ):
+        self.group_cols = list(group_cols)
+        self.value_col = value_col
+        self.n_jobs = n_jobs
+        self.backend = backend
+        self._moments: Optional[pd.DataFrame] = None
+        self._pool: Optional[Executor] = None
+
+    def close(self) -> None:
+        """Shut down the worker pool, if one was started."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        if self.n_jobs > 1 and self._pool is None:
+            self._pool = make_pool(self.n_jobs, self.backend)
+        part = compute_moments(
+            chunk,
+            self.group_cols,
+            self.value_col,
+            self.n_jobs,
+            self.backend,
+            self._pool,
+        )
+        if self._moments is None:
+            self._moments = part
+        else:
+            self._moments = merge_moments([self._moments, part])
+
+    def result(self) -> pd.DataFrame:
+        if self._moments is None:
+            raise ValueError("No data was passed to the moment accumulator.")
+        return self._moments
@@ -0,0 +1,202 @@
+"""
+Per-group yield quantiles for trialflow-agro.
+
+Two modes:
+
+- exact: a vectorized groupby quantile over in-memory records (linear
+  interpolation, as `pandas.Series.quantile`)
+- sketch: a mergeable relative-error sketch (DDSketch-style) that can be
+  built chunk by chunk or on disjoint partitions and merged exactly
+
+A sketch table is a DataFrame indexed by the group keys plus a "bin"
+level, with a single "count" column. Values are mapped to logarithmically
+spaced bins, bin i covering (gamma**(i-1), gamma**i] with
+gamma = (1 + a) / (1 - a), so reporting a bin's midpoint
+2 * gamma**i / (gamma + 1) is within relative error `a` of every value in
+it. Negative values use mirrored bins and |x| < MIN_VALUE falls into a
+zero bin. Merging or rolling up sketches only sums counts, like moment
+tables (see `moments`).
+
+The sketch quantile for q is the value at rank floor(q * (n - 1)) in the
+sorted group, estimated within relative error `a`.
+"""
+
+from typing import Dict, Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Smallest magnitude with a relative-error guarantee; smaller values are
+# treated as zero
+MIN_VALUE = 1e-9
+
+
+def quantile_label(q: float) -> str:
+    """Key of quantile `q` in summaries (e.g. 0.5 -> "0.5")."""
+    return f"{q:g}"
+
+
+def exact_quantiles(
+    df: pd.DataFrame,
+    group_cols: Sequence[str],
+    quantiles: Sequence[float],
+    value_col: str = "yield",
+) -> pd.DataFrame:
+    """
+    Exact quantiles of `value_col` per group, one column per quantile,
+    indexed like `compute_moments(df, group_cols)`.
+    """
+    values = df[value_col].astype("float64")
+    if group_cols:
+        keys = [df[col] for col in group_cols]
+    else:
+        keys = np.zeros(len(df), dtype=np.int8)
+    table = (
+        values.groupby(keys, dropna=False, observed=True, sort=True)
+        .quantile(list(quantiles))
+        .unstack(-1)
+    )
+    table.columns = [quantile_label(q) for q in quantiles]
+    return table
+
+
+def _gamma(relative_error: float) -> float:
+    return (1.0 + relative_error) / (1.0 - relative_error)
+
+
+def _offset(relative_error: float) -> int:
+    """Shift making every bin of a magnitude >= MIN_VALUE positive."""
+    return int(np.ceil(-np.log(MIN_VALUE) / np.log(_gamma(relative_error)))) + 1
+
+
+def value_bins(values: np.ndarray, relative_error: float = 0.01) -> np.ndarray:
+    """Sketch bin of each (non-missing) value."""
+    magnitude = np.abs(values)
+    bins = np.zeros(len(values), dtype=np.int64)
+    nonzero = magnitude >= MIN_VALUE
+    bins[nonzero] = np.ceil(
+        np.log(magnitude[nonzero]) / np.log(_gamma(relative_error))
+    ).astype(np.int64) + _offset(relative_error)
+    return np.where(values < 0, -bins, bins)
+
+
+def bin_values(bins: np.ndarray, relative_error: float = 0.01) -> np.ndarray:
+    """Representative value of each sketch bin (within `relative_error`)."""
+    gamma = _gamma(relative_error)
+    magnitude = np.abs(bins) - _offset(relative_error)
+    estimates = np.where(
+        bins == 0, 0.0, 2 * gamma ** magnitude.astype(float) / (gamma + 1)
+    )
+    return np.where(bins < 0, -estimates, estimates)
+
+
+def compute_sketch(
+    df: pd.DataFrame,
+    group_cols: Sequence[str],
+    relative_error: float = 0.01,
+    value_col: str = "yield",
+) -> pd.DataFrame:
+    """Sketch table of `value_col` per group (missing values are skipped)."""
+    values = df[value_col].to_numpy(dtype="float64")
+    valid = ~np.isnan(values)
+    values = values[valid]
+    bins = value_bins(values, relative_error)
+
+    keys = [df[col].array[valid] for col in group_cols]
+    counts = (
+        pd.Series(np.ones(len(values), dtype=np.int64))
+        .groupby([*keys, bins], dropna=False, observed=True, sort=True)
+        .sum()
+    )
+    counts.index.names = [*group_cols, "bin"]
+    return counts.to_frame("count")
+
+
+def rollup_sketch(sketch: pd.DataFrame, group_cols: Sequence[str]) -> pd.DataFrame:
+    """Combine sketch rows sharing the same `group_cols` keys."""
+    return sketch.groupby(
+        level=[*group_cols, "bin"], dropna=False, observed=True, sort=True
+    ).sum()
+
+
+def merge_sketches(tables: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """Exactly merge sketch tables with the same index levels."""
+    combined = pd.concat(list(tables))
+    group_cols = [name for name in combined.index.names if name != "bin"]
+    return rollup_sketch(combined, group_cols)
+
+
+def sketch_quantiles(
+    sketch: pd.DataFrame,
+    group_cols: Sequence[str],
+    quantiles: Sequence[float],
+    relative_error: float = 0.01,
+) -> pd.DataFrame:
+    """
+    Quantiles per group from a sketch table, one column per quantile.
+
+    `group_cols` may be coarser than the sketch's grouping (it is rolled up
+    first); an empty list gives a single overall row.
+    """
+    table = rollup_sketch(sketch, group_cols)
+    counts = table["count"].to_numpy()
+    bins = table.index.get_level_values("bin").to_numpy()
+
+    if group_cols:
+        group_index = table.index.droplevel("bin")
+        # Missing keys (e.g. a blank treatment) are groups of their own
+        codes, _ = pd.factorize(group_index, sort=False, use_na_sentinel=False)
+        # index with the same dtypes as a moment table of these groups
+        index = group_index[~pd.Index(codes).duplicated()]
+    else:
+        codes = np.zeros(len(table), dtype=np.intp)
+        index = pd.Index([0])
+    n_groups = len(index)
+
+    totals = np.bincount(codes, weights=counts, minlength=n_groups)
+    # running count within each group (rows are sorted by group, then bin)
+    cumulative = np.cumsum(counts)
+    group_start = np.concatenate([[0], np.cumsum(totals)[:-1]])
+    within = cumulative - group_start[codes]
+
+    estimates = bin_values(bins, relative_error)
+
+    out: Dict[str, np.ndarray] = {}
+    for q in quantiles:
+        rank = np.floor(q * (totals - 1))
+        hit = within > rank[codes]
+        # first bin per group whose running count passes the rank
+        groups, first = np.unique(codes[hit], return_index=True)
+        column = np.full(n_groups, np.nan)
+        column[groups] = estimates[hit][first]
+        out[quantile_label(q)] = column
+    return pd.DataFrame(out, index=index)
+
+
+class SketchAccumulator:
+    """Incrementally builds a sketch table from a stream of DataFrame chunks."""
+
+    def __init__(
+        self,
+        group_cols: Sequence[str],
+        relative_error: float = 0.01,
+        value_col: str = "yield",
+    ):
+        self.group_cols = list(group_cols)
+        self.relative_error = relative_error
+        self.value_col = value_col
+        self._sketch: Optional[pd.DataFrame] = None
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        part = compute_sketch(
+            chunk, self.group_cols, self.relative_error, self.value_col
+        )
+        if self._sketch is None:
+            self._sketch = part
+        else:
+            self._sketch = merge_sketches([self._sketch, part])
+
+    def result(self) -> pd.DataFrame:
+        if self._sketch is None:
+            raise ValueError("No data was passed to the sketch accumulator.")
+        return self._sketch
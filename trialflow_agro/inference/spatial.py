@@ -0,0 +1,259 @@
+"""
+Spatial summaries for trialflow-agro.
+
+Records with `lat`/`lon` are projected once (vectorized, see `data.geo`)
+to a metric CRS and assigned to zones:
+
+- "grid": square cells of `cell_size` metres, by integer division of the
+  projected coordinates
+- "polygons": user-supplied boundaries (e.g. field outlines), joined with
+  a bulk STRtree query over all points at once instead of a point-in-polygon
+  test per record
+
+Spatial autocorrelation of yield is reported as global Moran's I on a
+row-standardized k-nearest-neighbour weights matrix, built as a sparse
+matrix from a KD-tree query. For very large yield-monitor datasets the
+statistic is computed on a seeded random subsample of points.
+"""
+
+import math
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel, Field
+
+from trialflow_agro.config.schema import SpatialConfig
+from trialflow_agro.data.geo import grid_cells, project_lat_lon
+from trialflow_agro.inference.summaries import GroupSummary, SummaryTable
+
+ZONE_COLUMN = "zone"
+
+
+class MoransI(BaseModel):
+    """Global Moran's I with its normality-assumption significance test."""
+
+    variable: str
+    n: int
+    k_neighbors: int
+    statistic: float
+    expected: float
+    variance: float
+    z_score: Optional[float] = None
+    p_value: Optional[float] = None
+
+
+class SpatialZones:
+    """Zone assignment of the records passed to `SpatialAnalysis.zones`."""
+
+    __slots__ = ("n_assigned", "n_unassigned", "x", "y", "zone")
+
+    def __init__(self, zone: pd.Categorical, x: np.ndarray, y: np.ndarray) -> None:
+        # Zone per record (NaN where unassigned) and projected coordinates
+        self.zone = zone
+        self.x = x
+        self.y = y
+        self.n_assigned = int((zone.codes >= 0).sum())
+        self.n_unassigned = len(zone) - self.n_assigned
+
+
+class SpatialAnalysis:
+    """Zone assignment and Moran's I for records with lat/lon."""
+
+    def __init__(self, config: SpatialConfig) -> None:
+        self.config = config
+
+    def columns(self) -> List[str]:
+        """Record columns the analysis reads besides the yield."""
+        return ["lat", "lon", "product", *self.config.group_by]
+
+    def grouping(self) -> List[str]:
+        """Grouping of the per-zone summaries."""
+        return [ZONE_COLUMN, *self.config.group_by]
+
+    def project(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, str]:
+        """Projected (x, y) of every record (NaN without coordinates), CRS."""
+        missing = [col for col in ("lat", "lon") if col not in df.columns]
+        if missing:
+            raise ValueError(f"Spatial summaries need the columns {missing}.")
+        return project_lat_lon(df["lat"], df["lon"], self.config.crs)
+
+    def zones(self, df: pd.DataFrame) -> Tuple[SpatialZones, str]:
+        """Assign every record to a zone; returns (zones, CRS)."""
+        x, y, crs = self.project(df)
+        valid = np.isfinite(x) & np.isfinite(y)
+        if self.config.zones == "grid":
+            zone = self._grid_zones(x, y)
+        else:
+            zone = self._polygon_zones(x, y, valid, crs)
+        return SpatialZones(zone, x, y), crs
+
+    def _grid_zones(self, x: np.ndarray, y: np.ndarray) -> pd.Categorical:
+        codes, cols, rows = grid_cells(x, y, self.config.cell_size)
+        # Cell ids are the cell's lower-left corner in cell units
+        labels = [f"{c}_{r}" for c, r in zip(cols.tolist(), rows.tolist())]
+        return pd.Categorical.from_codes(codes, categories=labels)
+
+    def _polygon_zones(
+        self, x: np.ndarray, y: np.ndarray, valid: np.ndarray, crs: str
+    ) -> pd.Categorical:
+        import geopandas as gpd
+        import shapely
+
+        boundaries = gpd.read_file(self.config.boundaries)
+        if boundaries.crs is None:
+            boundaries = boundaries.set_crs("EPSG:4326")
+        boundaries = boundaries.to_crs(crs)
+        if self.config.zone_column is not None:
+            labels = boundaries[self.config.zone_column].astype(str).tolist()
+        else:
+            labels = [str(i) for i in boundaries.index]
+        if len(set(labels)) != len(labels):
+            raise ValueError("Boundary zone ids must be unique.")
+
+        tree = shapely.STRtree(boundaries.geometry.values)
+        points_idx = np.flatnonzero(valid)
+        points = shapely.points(x[points_idx], y[points_idx])
+        hit_point, hit_zone = tree.query(points, predicate="intersects")
+        # Points on shared edges match several zones; keep the first
+        order = np.lexsort((hit_zone, hit_point))
+        hit_point, hit_zone = hit_point[order], hit_zone[order]
+        first = np.concatenate([[True], np.diff(hit_point) != 0])
+        codes = np.full(len(x), -1, dtype="int64")
+        codes[points_idx[hit_point[first]]] = hit_zone[first]
+        return pd.Categorical.from_codes(codes, categories=labels)
+
+    def morans_i(self, df: pd.DataFrame, zones: SpatialZones) -> Optional[MoransI]:
+        """Moran's I of yield (minus product means, if configured)."""
+        cfg = self.config
+        values = df["yield"].to_numpy(dtype="float64")
+        variable = "yield"
+        if cfg.adjust_for_product:
+            product_mean = df.groupby("product", observed=True)["yield"].transform(
+                "mean"
+            )
+            values = values - product_mean.to_numpy(dtype="float64")
+            variable = "yield_minus_product_mean"
+
+        usable = np.flatnonzero(
+            np.isfinite(zones.x) & np.isfinite(zones.y) & np.isfinite(values)
+        )
+        if cfg.moran_max_points is not None and len(usable) > cfg.moran_max_points:
+            rng = np.random.default_rng(cfg.random_seed)
+            usable = np.sort(rng.choice(usable, cfg.moran_max_points, replace=False))
+        if len(usable) <= cfg.k_neighbors + 1:
+            return None
+        coords = np.column_stack([zones.x[usable], zones.y[usable]])
+        return morans_i(coords, values[usable], cfg.k_neighbors, variable)
+
+
+def knn_weights(coords: np.ndarray, k: int):
+    """Row-standardized sparse k-nearest-neighbour weights (CSR)."""
+    from scipy.sparse import csr_matrix
+    from scipy.spatial import cKDTree
+
+    n = len(coords)
+    _, idx = cKDTree(coords).query(coords, k=k + 1)
+    # Drop each point itself; with more than k coincident points it may not
+    # be returned, then drop the farthest neighbour instead
+    keep = idx != np.arange(n)[:, None]
+    no_self = keep.all(axis=1)
+    keep[no_self, -1] = False
+    neighbours = idx[keep].reshape(n, k)
+    rows = np.repeat(np.arange(n), k)
+    data = np.full(n * k, 1.0 / k)
+    return csr_matrix((data, (rows, neighbours.ravel())), shape=(n, n))
+
+
+def morans_i(
+    coords: np.ndarray, values: np.ndarray, k: int = 8, variable: str = "yield"
+) -> MoransI:
+    """
+    Global Moran's I of `values` at `coords` on KNN weights, with the
+    expectation and variance under the normality assumption.
+    """
+    n = len(values)
+    weights = knn_weights(coords, k)
+    z = values - values.mean()
+    denom = float(z @ z)
+    # Row-standardized: S0 = n, so I = z'Wz / z'z
+    statistic = float(z @ (weights @ z)) / denom if denom > 0 else float("nan")
+
+    s0 = float(n)
+    s1 = 0.5 * float((weights + weights.T).power(2).sum())
+    col_sums = np.asarray(weights.sum(axis=0)).ravel()
+    s2 = float(((1.0 + col_sums) ** 2).sum())
+    expected = -1.0 / (n - 1)
+    second_moment = (n * n * s1 - n * s2 + 3 * s0 * s0) / ((n * n - 1) * s0 * s0)
+    variance = second_moment - expected**2
+
+    z_score = p_value = None
+    if variance > 0 and math.isfinite(statistic):
+        z_score = (statistic - expected) / math.sqrt(variance)
+        p_value = math.erfc(abs(z_score) / math.sqrt(2))
+    return MoransI(
+        variable=variable,
+        n=n,
+        k_neighbors=k,
+        statistic=statistic,
+        expected=expected,
+        variance=variance,
+        z_score=z_score,
+        p_value=p_value,
+    )
+
+
+class SpatialResult(BaseModel):
+    """Per-zone yield summaries and spatial autocorrelation."""
+
+    zones_kind: str
+    crs: str
+    n_assigned: int
+    # Records without coordinates or outside every boundary polygon
+    n_unassigned: int
+    zones: List[GroupSummary] = Field(default_factory=list)
+    moran: Optional[MoransI] = None
+
+
+class SpatialTables:
+    """Array-backed counterpart of `SpatialResult`."""
+
+    __slots__ = ("crs", "moran", "n_assigned", "n_unassigned", "zones", "zones_kind")
+
+    def __init__(
+        self,
+        zones_kind: str,
+        crs: str,
+        n_assigned: int,
+        n_unassigned: int,
+        zones: SummaryTable,
+        moran: Optional[MoransI] = None,
+    ) -> None:
+        self.zones_kind = zones_kind
+        self.crs = crs
+        self.n_assigned = n_assigned
+        self.n_unassigned = n_unassigned
+        self.zones = zones
+        self.moran = moran
+
+    def info(self) -> Dict[str, object]:
+        """Everything but the zone summaries, JSON-ready."""
+        return {
+            "zones_kind": self.zones_kind,
+            "crs": self.crs,
+            "n_assigned": self.n_assigned,
+            "n_unassigned": self.n_unassigned,
+            "moran": self.moran.model_dump(mode="json") if self.moran else None,
+        }
+
+    def to_result(self) -> SpatialResult:
+        return SpatialResult.model_construct(
+            **{k: getattr(self, k) for k in self.__slots__ if k != "zones"},
+            zones=self.zones.summaries(),
+        )
+
+    def to_dict(self) -> Dict[str, object]:
+        """JSON-ready dict, equal to `to_result().model_dump(mode="json")`."""
+        out = self.info()
+        out["zones"] = self.zones.records()
+        return {k: out[k] for k in SpatialResult.model_fields}
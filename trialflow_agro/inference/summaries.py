@@ -0,0 +1,163 @@
+"""
+Summary result types for trialflow-agro.
+
+`GroupSummary` is the public, Pydantic representation of one group.
+Internally, each summary level is held as a `SummaryTable`: one array per
+statistic, with one entry per group. Tables serialize straight to
+JSON-ready dicts or Arrow arrays, and are only turned into `GroupSummary`
+objects at the API boundary.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from pydantic import BaseModel
+
+from trialflow_agro.results import quantile_column
+
+
+class GroupSummary(BaseModel):
+    """Summary statistics for a single group."""
+
+    group_values: Dict[str, object]
+    n: int
+    mean_yield: float
+    std_yield: Optional[float] = None
+    min_yield: float
+    max_yield: float
+    # Bootstrap confidence interval of mean_yield, when enabled
+    mean_ci_low: Optional[float] = None
+    mean_ci_high: Optional[float] = None
+    # Requested yield quantiles keyed by level (e.g. "0.5"), when enabled
+    quantiles: Optional[Dict[str, Optional[float]]] = None
+
+
+def _nullable(values: Optional[np.ndarray], size: int) -> List[Optional[float]]:
+    """Python floats with NaN (or a missing column) as None."""
+    if values is None:
+        return [None] * size
+    out = values.astype(object)
+    out[np.isnan(values)] = None
+    return out.tolist()
+
+
+class SummaryTable:
+    """
+    Column-oriented summaries of one grouping level.
+
+    `keys` holds one list of group values per group column; statistics are
+    float arrays except `n`. Optional statistics (std_yield, the CI bounds
+    and quantiles) are NaN where missing; std_yield is NaN for n <= 1.
+    """
+
+    __slots__ = (
+        "group_cols",
+        "keys",
+        "max_yield",
+        "mean_ci_high",
+        "mean_ci_low",
+        "mean_yield",
+        "min_yield",
+        "n",
+        "quantiles",
+        "std_yield",
+    )
+
+    def __init__(
+        self,
+        group_cols: Sequence[str],
+        keys: Sequence[List[object]],
+        n: np.ndarray,
+        mean_yield: np.ndarray,
+        std_yield: np.ndarray,
+        min_yield: np.ndarray,
+        max_yield: np.ndarray,
+        mean_ci_low: Optional[np.ndarray] = None,
+        mean_ci_high: Optional[np.ndarray] = None,
+        quantiles: Optional[Dict[str, np.ndarray]] = None,
+    ):
+        self.group_cols = list(group_cols)
+        self.keys = list(keys)
+        self.n = n
+        self.mean_yield = mean_yield
+        self.std_yield = std_yield
+        self.min_yield = min_yield
+        self.max_yield = max_yield
+        self.mean_ci_low = mean_ci_low
+        self.mean_ci_high = mean_ci_high
+        self.quantiles = quantiles
+
+    def __len__(self) -> int:
+        return len(self.n)
+
+    def _group_values(self) -> List[Dict[str, object]]:
+        if not self.group_cols:
+            return [{} for _ in range(len(self))]
+        return [dict(zip(self.group_cols, key)) for key in zip(*self.keys)]
+
+    def _quantile_rows(self) -> List[Optional[Dict[str, Optional[float]]]]:
+        if self.quantiles is None:
+            return [None] * len(self)
+        labels = list(self.quantiles)
+        columns = [_nullable(self.quantiles[label], len(self)) for label in labels]
+        return [dict(zip(labels, row)) for row in zip(*columns)]
+
+    def records(self) -> List[Dict[str, Any]]:
+        """One JSON-ready dict per group, shaped like `GroupSummary`."""
+        size = len(self)
+        return [
+            {
+                "group_values": values,
+                "n": n,
+                "mean_yield": mean,
+                "std_yield": std,
+                "min_yield": min_,
+                "max_yield": max_,
+                "mean_ci_low": low,
+                "mean_ci_high": high,
+                "quantiles": q,
+            }
+            for values, n, mean, std, min_, max_, low, high, q in zip(
+                self._group_values(),
+                self.n.tolist(),
+                self.mean_yield.tolist(),
+                _nullable(self.std_yield, size),
+                self.min_yield.tolist(),
+                self.max_yield.tolist(),
+                _nullable(self.mean_ci_low, size),
+                _nullable(self.mean_ci_high, size),
+                self._quantile_rows(),
+            )
+        ]
+
+    def summaries(self) -> List[GroupSummary]:
+        """`GroupSummary` objects (built without re-validation)."""
+        return [GroupSummary.model_construct(**record) for record in self.records()]
+
+    def arrow_columns(self) -> Dict[str, Any]:
+        """
+        Flat pyarrow arrays: group columns, `results.SUMMARY_COLUMNS` and
+        one `quantile_column` per level. Missing optional values are nulls.
+        """
+        import pyarrow as pa
+
+        size = len(self)
+        empty = np.full(size, np.nan)
+        # Missing group keys are NaN in the key lists
+        columns: Dict[str, Any] = {
+            col: pa.array(values, from_pandas=True)
+            for col, values in zip(self.group_cols, self.keys)
+        }
+        columns["n"] = pa.array(self.n)
+        columns["mean_yield"] = pa.array(self.mean_yield)
+        columns["std_yield"] = pa.array(self.std_yield, from_pandas=True)
+        columns["min_yield"] = pa.array(self.min_yield)
+        columns["max_yield"] = pa.array(self.max_yield)
+        for name in ("mean_ci_low", "mean_ci_high"):
+            values = getattr(self, name)
+            columns[name] = pa.array(
+                empty if values is None else values, from_pandas=True
+            )
+        for label, values in (self.quantiles or {}).items():
+            columns[quantile_column(label)] = pa.array(values, from_pandas=True)
+        return columns
@@ -0,0 +1,244 @@
+"""
+Persisted intermediate artifacts for trialflow-agro.
+
+When `output.save_intermediate` is set, a run writes under
+`<output>/intermediate/`:
+
+- moments.parquet  per-group moment table at the run's finest grouping
+- data.parquet   the cleaned, typed dataset (with `output.save_data`;
+                 in-memory runs only)
+- manifest.json  data fingerprint, stored grouping/columns and the
+                 diagnostics accumulator state
+
+Later runs against the same (unchanged) data file reuse these instead of
+parsing the raw input: summaries are rolled up from the stored moments
+when the new grouping is covered by them, otherwise the typed Parquet (if
+saved) is read with column projection.
+
+The stored moments and diagnostics state are also the mergeable state used
+by `fit --append`, which folds new records into them without touching the
+history. Once records have been appended, the artifacts no longer describe
+the configured data file alone and are not reused by plain `fit` runs.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import pandas as pd
+from pydantic import BaseModel, Field
+
+from trialflow_agro import __version__
+from trialflow_agro.cache import file_fingerprint
+from trialflow_agro.inference.moments import rollup_moments
+
+
+class IntermediateManifest(BaseModel):
+    """Describes what an intermediate directory holds and what it was built from."""
+
+    version: str
+    data_path: str
+    data_fingerprint: Dict[str, object]
+    yield_dtype: str
+    moment_groups: List[str]
+    data_columns: Optional[List[str]] = None
+    # Cleaning settings the stored records and moments were built with
+    cleaning: Optional[Dict[str, object]] = None
+    diagnostics_state: Dict[str, object]
+    # Fingerprints of record files merged in with `fit --append`
+    appended: List[Dict[str, object]] = Field(default_factory=list)
+
+
+class IntermediateStore:
+    """Reads and writes the intermediate artifacts of one output directory."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.manifest_path = directory / "manifest.json"
+        self.data_path = directory / "data.parquet"
+        self.moments_path = directory / "moments.parquet"
+        self._manifest: Optional[IntermediateManifest] = None
+        if self.manifest_path.exists():
+            self._manifest = IntermediateManifest.model_validate_json(
+                self.manifest_path.read_text(encoding="utf-8")
+            )
+
+    @property
+    def manifest(self) -> Optional[IntermediateManifest]:
+        return self._manifest
+
+    def matches(
+        self,
+        data_path: Path,
+        yield_dtype: str,
+        cleaning: Optional[Dict[str, object]] = None,
+    ) -> bool:
+        """
+        Whether the stored artifacts were built from this exact data file
+        (with the same cleaning settings, None if uncleaned).
+        """
+        m = self._manifest
+        if m is None or m.version != __version__ or m.yield_dtype != yield_dtype:
+            return False
+        if m.cleaning != cleaning:
+            return False
+        if m.appended:
+            return False
+        if m.data_path != str(data_path.resolve()) or not data_path.exists():
+            return False
+        fingerprint = file_fingerprint(data_path, known=m.data_fingerprint)
+        return fingerprint["sha256"] == m.data_fingerprint["sha256"]
+
+    def load_moments(
+        self, group_cols: Optional[Sequence[str]] = None
+    ) -> Optional[pd.DataFrame]:
+        """
+        Stored moments rolled up to `group_cols` (default: as stored), if
+        their grouping covers it.
+        """
+        m = self._manifest
+        if m is None or not self.moments_path.exists():
+            return None
+        if group_cols is None:
+            group_cols = m.moment_groups
+        if not set(group_cols) <= set(m.moment_groups):
+            return None
+        stored = pd.read_parquet(self.moments_path)
+        if list(group_cols) == m.moment_groups:
+            return stored
+        return rollup_moments(stored, group_cols)
+
+    def load_data(self, columns: Sequence[str]) -> Optional[pd.DataFrame]:
+        """The typed dataset projected to `columns`, if they were all stored."""
+        m = self._manifest
+        if m is None or m.data_columns is None or not self.data_path.exists():
+            return None
+        if not set(columns) <= set(m.data_columns):
+            return None
+        return pd.read_parquet(self.data_path, columns=list(columns))
+
+    def save(
+        self,
+        data_path: Path,
+        yield_dtype: str,
+        moments: pd.DataFrame,
+        diagnostics_state: Dict[str, object],
+        df: Optional[pd.DataFrame] = None,
+        cleaning: Optional[Dict[str, object]] = None,
+    ) -> None:
+        """
+        Replace all artifacts: moments, the typed dataset (if given; chunked
+        runs have none) and the manifest, which records the `cleaning`
+        settings the records went through.
+        """
+        previous = self._manifest
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Drop the manifest first so a failed write never leaves it pointing
+        # at mismatched artifacts
+        self.manifest_path.unlink(missing_ok=True)
+        self._manifest = None
+
+        moments.to_parquet(self.moments_path)
+        if df is not None:
+            df.to_parquet(self.data_path, index=False)
+        else:
+            self.data_path.unlink(missing_ok=True)
+
+        known = None
+        if previous is not None and previous.data_path == str(data_path.resolve()):
+            known = previous.data_fingerprint
+        self._write_manifest(
+            IntermediateManifest(
+                version=__version__,
+                data_path=str(data_path.resolve()),
+                data_fingerprint=file_fingerprint(data_path, known=known),
+                yield_dtype=yield_dtype,
+                moment_groups=list(moments.index.names),
+                data_columns=list(df.columns) if df is not None else None,
+                cleaning=cleaning,
+                diagnostics_state=diagnostics_state,
+            )
+        )
+
+    def update_moments(self, moments: pd.DataFrame) -> None:
+        """Replace only the stored moment table, keeping the typed dataset."""
+        if self._manifest is None:
+            raise RuntimeError("No intermediate manifest to update.")
+        moments.to_parquet(self.moments_path)
+        self._write_manifest(
+            self._manifest.model_copy(
+                update={"moment_groups": list(moments.index.names)}
+            )
+        )
+
+    def check_append(self, records_path: Path, yield_dtype: str) -> Dict[str, object]:
+        """
+        Check that the records of `records_path` can be merged into the
+        stored state and return their fingerprint (for `append`).
+
+        Raises FileNotFoundError if there is no stored state, and ValueError
+        if it was built by another version, with another yield dtype or from
+        cleaned records, or if the file was already merged in (same path and
+        contents).
+        """
+        m = self._manifest
+        if m is None:
+            raise FileNotFoundError(
+                f"No persisted state found in {self.directory}; run `fit` with "
+                "output.save_intermediate enabled before appending."
+            )
+        if m.version != __version__ or m.yield_dtype != yield_dtype:
+            raise ValueError(
+                f"Persisted state was built by version {m.version} with yield "
+                f"dtype {m.yield_dtype}; re-run `fit` before appending."
+            )
+        if m.cleaning is not None:
+            raise ValueError(
+                "Persisted state was built from cleaned records and new records "
+                "cannot be cleaned consistently; re-run `fit` instead."
+            )
+        path = str(records_path.resolve())
+        merged = [
+            (m.data_path, m.data_fingerprint),
+            *((a["path"], a) for a in m.appended),
+        ]
+        fingerprint = file_fingerprint(records_path)
+        for merged_path, known in merged:
+            if merged_path == path and known["sha256"] == fingerprint["sha256"]:
+                raise ValueError(
+                    f"{records_path} is already part of the persisted state."
+                )
+        return {"path": path, **fingerprint}
+
+    def append(
+        self,
+        moments: pd.DataFrame,
+        diagnostics_state: Dict[str, object],
+        records: Dict[str, object],
+    ) -> None:
+        """
+        Replace the stored state after merging in the records fingerprinted
+        by `check_append`. The typed dataset no longer matches and is
+        dropped.
+        """
+        if self._manifest is None:
+            raise RuntimeError("No intermediate manifest to update.")
+        self.data_path.unlink(missing_ok=True)
+        moments.to_parquet(self.moments_path)
+        self._write_manifest(
+            self._manifest.model_copy(
+                update={
+                    "moment_groups": list(moments.index.names),
+                    "data_columns": None,
+                    "diagnostics_state": diagnostics_state,
+                    "appended": [*self._manifest.appended, records],
+                }
+            )
+        )
+
+    def _write_manifest(self, manifest: IntermediateManifest) -> None:
+        self.manifest_path.write_text(
+            manifest.model_dump_json(indent=2), encoding="utf-8"
+        )
+        self._manifest = manifest
@@ -1,13 +1,27 @@
 """
 Model specification for trialflow-agro.
 
-For v0.1 this provides a lightweight container describing
-how groups should be summarized. Statistical computation
-is handled in the inference module.
+`TrialModel` describes how groups should be summarized and, with the
+"hierarchical" backend, builds a Bayesian partial-pooling model of yield
+from per-cell sufficient statistics:
+
+    yield ~ Normal(product_mean[p] + sum_l level_l[g_l], sigma)
+
+where each random-effect level (e.g. region > farm > field) is a
+zero-mean random intercept nested within the levels before it, so product
+means are compared net of site effects. Random effects use a non-centered
+parameterization, which samples efficiently with NUTS.
+
+PyMC is imported lazily so summary-only runs do not pay for it.
 """
 
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
 from pydantic import BaseModel
-from trialflow_agro.config.schema import ModelConfig
+
+from trialflow_agro.config.schema import HierarchicalConfig, ModelConfig
 
 
 class TrialModelSpec(BaseModel):
@@ -16,22 +30,120 @@ class TrialModelSpec(BaseModel):
 
     - groups: list of columns to group by (e.g. ["product", "region"])
     - min_records_per_group: minimum records required for group statistics
+    - backend: "summary" or "hierarchical"
+    - hierarchical: settings of the hierarchical model
     """
 
     groups: list[str]
     min_records_per_group: int
+    backend: str = "summary"
+    hierarchical: HierarchicalConfig = HierarchicalConfig()
 
 
 class TrialModel:
     """
-    Thin wrapper over TrialModelSpec.
-
-    In future versions this could be extended to define full
-    Bayesian/hierarchical model structures.
+    Wrapper over TrialModelSpec that can build the PyMC hierarchical model.
     """
 
     def __init__(self, config: ModelConfig):
         self.spec = TrialModelSpec(
             groups=config.groups,
             min_records_per_group=config.min_records_per_group,
+            backend=config.backend,
+            hierarchical=config.hierarchical,
         )
+
+    @property
+    def is_hierarchical(self) -> bool:
+        return self.spec.backend == "hierarchical"
+
+    def moment_groups(self) -> List[str]:
+        """Grouping of the moment table the model is fitted from."""
+        levels = self.spec.hierarchical.random_effects
+        return [*levels, *(["product"] if "product" not in levels else [])]
+
+    def build(self, moments: pd.DataFrame):
+        """
+        Build the PyMC model from a moment table grouped by
+        `moment_groups()` (see `trialflow_agro.inference.moments`).
+
+        Every row of a cell (random-effect units x product) shares the same
+        mean, so for a Gaussian likelihood the cell's (n, mean, M2) are
+        sufficient statistics: the rows' joint log-likelihood equals
+
+            Normal(mean | mu, sigma / sqrt(n))
+            - (n - 1) * log(sigma) - M2 / (2 * sigma**2)
+
+        up to a constant. The likelihood therefore has one term per cell
+        instead of one per row, and the posterior is unchanged.
+
+        Returns a `pymc.Model` with coordinates "product" and one per
+        random-effect level.
+        """
+        import pymc as pm
+
+        moments = moments[moments["count"] > 0]
+        n = moments["count"].to_numpy(dtype="float64")
+        cell_mean = moments["sum"].to_numpy(dtype="float64") / n
+        m2 = moments["m2"].to_numpy(dtype="float64")
+
+        cells = moments.index.to_frame(index=False)
+        product_idx, products = pd.factorize(cells["product"], sort=True)
+        levels = self.spec.hierarchical.random_effects
+        level_idx, coords = self._nested_levels(cells, levels)
+        coords["product"] = [str(p) for p in products]
+
+        # Fit on standardized yield so every parameter is O(1) (much faster
+        # ADVI convergence and NUTS adaptation); report in yield units
+        total = n.sum()
+        y_mean = float((cell_mean * n).sum() / total)
+        y_var = (m2.sum() + (n * (cell_mean - y_mean) ** 2).sum()) / total
+        y_scale = float(np.sqrt(y_var)) or 1.0
+        z_mean = (cell_mean - y_mean) / y_scale
+        z_m2 = m2 / y_scale**2
+
+        with pm.Model(coords=coords) as model:
+            product_z = pm.Normal("product_z", 0.0, 2.5, dims="product")
+            pm.Deterministic(
+                "product_mean", y_mean + y_scale * product_z, dims="product"
+            )
+
+            mu = product_z[product_idx]
+            for level in levels:
+                tau = pm.HalfNormal(f"tau_{level}", sigma=1.0)
+                pm.Deterministic(f"sigma_{level}", y_scale * tau)
+                offset = pm.Normal(f"z_{level}", 0.0, 1.0, dims=level)
+                effect = tau * offset
+                pm.Deterministic(f"{level}_effect", y_scale * effect, dims=level)
+                mu = mu + effect[level_idx[level]]
+
+            tau = pm.HalfNormal("tau", sigma=1.0)
+            pm.Deterministic("sigma", y_scale * tau)
+            pm.Normal("yield_mean", mu=mu, sigma=tau / np.sqrt(n), observed=z_mean)
+            pm.Potential(
+                "yield_within",
+                -((n - 1).sum()) * pm.math.log(tau) - z_m2.sum() / (2 * tau**2),
+            )
+
+        return model
+
+    @staticmethod
+    def _nested_levels(
+        df: pd.DataFrame, levels: List[str]
+    ) -> Tuple[Dict[str, np.ndarray], Dict[str, List[str]]]:
+        """
+        Integer codes per level, where a level's units are identified by
+        the combination of its key with all outer levels (so "F1" on two
+        different farms are two different fields).
+        """
+        level_idx: Dict[str, np.ndarray] = {}
+        coords: Dict[str, List[str]] = {}
+        for i, level in enumerate(levels):
+            keys = levels[: i + 1]
+            grouped = df.groupby(keys, dropna=False, observed=True, sort=True)
+            level_idx[level] = grouped.ngroup().to_numpy()
+            coords[level] = [
+                "/".join(str(k) for k in (key if isinstance(key, tuple) else (key,)))
+                for key in grouped.size().index
+            ]
+        return level_idx, coords
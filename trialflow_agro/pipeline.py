@@ -3,23 +3,39 @@ Pipeline orchestrator for trialflow-agro.
 
 Ties together:
 - config loading (YAML + Pydantic)
-- data loading and validation
-- summary "inference"
+- data loading, validation and optional cleaning (see `data.cleaning`)
+- summary "inference" and the optional hierarchical model fit, both
+  from one moment table
 - diagnostics
-- writing results.json
+- writing results.json and/or the columnar results (see `results`)
+- per-stage timings (see `profiling`)
 """
 
 from __future__ import annotations
 
 import json
+from contextlib import closing
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
+import pandas as pd
+
+from trialflow_agro.cache import ResultCache
 from trialflow_agro.config.schema import ConfigLoader, TrialflowConfig
+from trialflow_agro.data.cleaning import RecordCleaner
 from trialflow_agro.data.loaders import TrialDataLoader
-from trialflow_agro.inference.diagnostics import compute_diagnostics
-from trialflow_agro.inference.fit import TrialInference
+from trialflow_agro.data.schema import OPTIONAL_COLUMNS, REQUIRED_COLUMNS
+from trialflow_agro.inference.diagnostics import DiagnosticsAccumulator
+from trialflow_agro.inference.fit import TrialInference, TrialInferenceTables
+from trialflow_agro.inference.moments import (
+    compute_moments,
+    merge_moments,
+    rollup_moments,
+)
+from trialflow_agro.intermediate import IntermediateStore
 from trialflow_agro.models.hierarchical import TrialModel
+from trialflow_agro.profiling import StageTimer
+from trialflow_agro.results import MANIFEST_NAME, write_parquet_results
 
 
 class Pipeline:
@@ -27,17 +43,49 @@ class Pipeline:
     High-level runner for a single trialflow-agro analysis.
 
     - Reads YAML config
-    - Loads data from config.data.path
+    - Loads data from config.data.path (in memory, or streamed in chunks)
+      and cleans it if config.cleaning is enabled (in memory)
     - Builds TrialModel and runs TrialInference
     - Computes basic diagnostics
-    - Writes results.json under the chosen output directory
+    - Writes results.json and/or Parquet results (output.results_format)
+      under the chosen output directory
+    - Saves/reuses intermediate artifacts when output.save_intermediate is set
+    - Optionally restores results.json from the result cache instead (JSON
+      results written to disk only)
+    - Records per-stage wall/CPU time, peak RSS and row/group counts in
+      `timings` and in the `timings` block of the results
+
+    An already validated `config` can be passed instead of `config_path`.
+    With `write_results=False` nothing is written to the output directory
+    and the results document is only kept in `results`.
     """
 
-    def __init__(self, config_path: Path, output_dir: Optional[Path] = None) -> None:
+    def __init__(
+        self,
+        config_path: Optional[Path] = None,
+        output_dir: Optional[Path] = None,
+        use_cache: Optional[bool] = None,
+        config: Optional[TrialflowConfig] = None,
+        write_results: bool = True,
+    ) -> None:
+        if (config_path is None) == (config is None):
+            raise ValueError("Pass exactly one of config_path and config.")
         self.config_path = config_path
+        self._config = config
+        self.write_results = write_results
         # Optional CLI override; if None we use config.output.directory
         self._output_dir_override = output_dir
         self._output_dir: Optional[Path] = None
+        # Optional CLI override; if None we use config.cache.enabled
+        self._use_cache = use_cache
+        # "hit" / "miss" after run() when the cache is enabled
+        self.cache_status: Optional[str] = None
+        self.cache_stats: Optional[Dict[str, int]] = None
+        # Stage timings of the last run() / append()
+        self.timings: Optional[StageTimer] = None
+        # results.json document of the last run() / append(), when JSON
+        # results were written or write_results is off
+        self.results: Optional[Dict[str, object]] = None
 
     @property
     def output_dir(self) -> Path:
@@ -49,38 +97,408 @@ class Pipeline:
             raise RuntimeError("Pipeline.run() has not been executed yet.")
         return self._output_dir
 
-    def run(self) -> None:
+    def _load_config(self) -> TrialflowConfig:
+        if self._config is not None:
+            return self._config
+        return ConfigLoader().load(self.config_path)
+
+    def data_columns(self) -> List[str]:
+        """Columns of the data file a run of this config loads."""
+        cfg = self._load_config()
+        return self._loaded_columns(
+            cfg, self._data_columns(cfg, self._inference_engine(cfg))
+        )
+
+    def run(self, data: Optional[pd.DataFrame] = None) -> None:
+        """
+        Run the analysis.
+
+        `data` optionally supplies an already loaded and validated dataset
+        for config.data.path (e.g. shared across a batch of configs); it
+        must contain REQUIRED_COLUMNS and the configured groups.
+        """
+        timer = self.timings = StageTimer()
+
         # Load config
-        cfg: TrialflowConfig = ConfigLoader().load(self.config_path)
+        with timer.stage("config"):
+            cfg = self._load_config()
+
+        # Decide output directory: CLI override or config default
+        out_dir = self._output_dir_override or cfg.output.directory
+        self._output_dir = out_dir
+        results_path = out_dir / "results.json"
+
+        cache: Optional[ResultCache] = None
+        use_cache = cfg.cache.enabled if self._use_cache is None else self._use_cache
+        # Cache entries are single results.json files, restored by copying
+        # them into the output directory
+        if use_cache and cfg.output.results_format == "json" and self.write_results:
+            with timer.stage("cache"):
+                cache = ResultCache(
+                    cfg.cache.directory, int(cfg.cache.max_size_mb * 1024 * 1024)
+                )
+                cache_key = cache.key(cfg)
+                hit = cache.get(cache_key, results_path)
+            self.cache_status = "hit" if hit else "miss"
+            self.cache_stats = cache.stats()
+            if hit:
+                self.results = json.loads(results_path.read_text(encoding="utf-8"))
+                return
 
-        # Load data based purely on config (config-driven workflow)
-        data_path = cfg.data.path
-        df = TrialDataLoader().load(data_path)
+        inference_engine = self._inference_engine(cfg)
 
-        # Build model spec & run inference
+        # Load data based purely on config (config-driven workflow) and run
+        # one aggregation pass shared by every summary level and diagnostics
+        moments, diagnostics, df, sketch = self._aggregate(
+            cfg, inference_engine, out_dir, timer, data
+        )
+        needs_records = inference_engine.needs_records or (
+            inference_engine.quantiles_enabled and sketch is None
+        )
+        if needs_records and df is None:
+            with timer.stage("records") as stage:
+                df = self._records(cfg, inference_engine, out_dir)
+                stage.rows = len(df)
+        with timer.stage("inference") as stage:
+            inference_result = inference_engine.summarize_moments(moments, df, sketch)
+            stage.groups = inference_result.n_groups()
+        with timer.stage("write"):
+            self._write_results(results_path, cfg, inference_result, diagnostics, timer)
+
+        if cache is not None:
+            cache.put(cache_key, results_path)
+
+    def append(self, records_path: Path) -> None:
+        """
+        Fold new trial records into a previous run's results.
+
+        Merges the moments of `records_path` into the persisted per-group
+        state in `<output>/intermediate` (Chan/Welford merge) and rewrites
+        results.json. Cost scales with the new records and the number of
+        groups, not with the size of the history.
+        """
+        timer = self.timings = StageTimer()
+        with timer.stage("config"):
+            cfg = self._load_config()
+        out_dir = self._output_dir_override or cfg.output.directory
+        self._output_dir = out_dir
+
+        store = IntermediateStore(out_dir / "intermediate")
+        inference_engine = self._inference_engine(cfg)
+        manifest = store.manifest
+        stored = store.load_moments()
+        if manifest is None or stored is None:
+            raise FileNotFoundError(
+                f"No persisted state found in {store.directory}; run `fit` with "
+                "output.save_intermediate enabled before appending."
+            )
+        if not set(inference_engine.finest_grouping()) <= set(manifest.moment_groups):
+            raise ValueError(
+                f"Persisted state is grouped by {manifest.moment_groups} and "
+                f"cannot be rolled up to {inference_engine.finest_grouping()}; "
+                "re-run `fit` on the full dataset instead."
+            )
+        if cfg.cleaning.enabled:
+            raise ValueError(
+                "Cleaning filters records against per-field statistics of the "
+                "whole dataset and cannot be applied to appended records; "
+                "re-run `fit` instead."
+            )
+        if inference_engine.needs_records or inference_engine.quantiles_enabled:
+            raise ValueError(
+                "Bootstrap confidence intervals, quantiles and spatial summaries "
+                "are not part of the persisted state and cannot be updated by "
+                "appending; re-run `fit` instead."
+            )
+        records = store.check_append(records_path, cfg.data.yield_dtype)
+
+        # Aggregate the new records at the stored grouping and merge exactly
+        with timer.stage("load") as stage:
+            delta = TrialDataLoader(
+                columns=manifest.moment_groups, yield_dtype=cfg.data.yield_dtype
+            ).load(records_path)
+            stage.rows = len(delta)
+        with timer.stage("aggregate") as stage:
+            delta_moments = compute_moments(
+                delta,
+                manifest.moment_groups,
+                n_jobs=cfg.execution.n_jobs,
+                backend=cfg.execution.backend,
+            )
+            moments = merge_moments([stored, delta_moments])
+
+            diagnostics = DiagnosticsAccumulator.from_state(manifest.diagnostics_state)
+            diagnostics.update(delta, delta_moments)
+            store.append(moments, diagnostics.state(), records)
+            stage.rows, stage.groups = len(delta), len(moments)
+
+        with timer.stage("inference") as stage:
+            inference_result = inference_engine.summarize_moments(
+                rollup_moments(moments, inference_engine.finest_grouping())
+            )
+            stage.groups = inference_result.n_groups()
+        with timer.stage("write"):
+            self._write_results(
+                out_dir / "results.json", cfg, inference_result, diagnostics, timer
+            )
+
+    def _inference_engine(self, cfg: TrialflowConfig) -> TrialInference:
+        """Build model spec & inference engine from the config."""
         model = TrialModel(cfg.model)
-        inference_engine = TrialInference(
+        return TrialInference(
             groups=model.spec.groups,
             min_records_per_group=model.spec.min_records_per_group,
+            n_jobs=cfg.execution.n_jobs,
+            backend=cfg.execution.backend,
+            model=model,
+            bootstrap=cfg.model.bootstrap,
+            quantiles=cfg.model.quantiles,
+            comparisons=cfg.model.comparisons,
+            spatial=cfg.model.spatial,
         )
-        inference_result = inference_engine.run(df)
 
-        # Diagnostics
-        diagnostics = compute_diagnostics(df)
+    @staticmethod
+    def _cleaner(cfg: TrialflowConfig) -> Optional[RecordCleaner]:
+        return RecordCleaner(cfg.cleaning) if cfg.cleaning.enabled else None
 
-        # Decide output directory: CLI override or config default
-        out_dir = self._output_dir_override or cfg.output.directory
-        self._output_dir = out_dir
+    @staticmethod
+    def _cleaning_key(cfg: TrialflowConfig) -> Optional[Dict[str, object]]:
+        """Cleaning settings intermediate artifacts must have been built with."""
+        return cfg.cleaning.model_dump(mode="json") if cfg.cleaning.enabled else None
 
+    def _data_columns(
+        self, cfg: TrialflowConfig, inference_engine: TrialInference
+    ) -> List[str]:
+        """Columns a run reads: moments, record-level steps and cleaning."""
+        cleaner = self._cleaner(cfg)
+        return list(
+            dict.fromkeys(
+                [
+                    *REQUIRED_COLUMNS,
+                    *inference_engine.record_columns(),
+                    *(cleaner.columns() if cleaner is not None else []),
+                ]
+            )
+        )
+
+    @staticmethod
+    def _loaded_columns(cfg: TrialflowConfig, columns: List[str]) -> List[str]:
+        """
+        Columns to load from the data file: `columns`, plus every schema
+        column when the typed copy is saved, so later runs with other
+        groupings can reuse it.
+        """
+        if cfg.output.save_intermediate and cfg.output.save_data:
+            return list(dict.fromkeys([*columns, *OPTIONAL_COLUMNS]))
+        return columns
+
+    def _records(
+        self, cfg: TrialflowConfig, inference_engine: TrialInference, out_dir: Path
+    ) -> pd.DataFrame:
+        """
+        Records for the steps that need more than moments (bootstrap) when
+        the aggregation did not load them: the intermediate typed Parquet,
+        or the data file projected to the grouping and yield columns (and
+        cleaned like in the aggregation).
+        """
+        columns = self._data_columns(cfg, inference_engine)
+        if cfg.output.save_intermediate:
+            store = IntermediateStore(out_dir / "intermediate")
+            if store.matches(
+                cfg.data.path, cfg.data.yield_dtype, self._cleaning_key(cfg)
+            ):
+                typed = store.load_data(columns)
+                if typed is not None:
+                    return typed
+        loader = TrialDataLoader(columns=columns, yield_dtype=cfg.data.yield_dtype)
+        df = loader.load(cfg.data.path)
+        cleaner = self._cleaner(cfg)
+        if cleaner is not None:
+            df, _ = cleaner.clean(df, inference_engine.record_columns())
+        return df
+
+    def _write_results(
+        self,
+        results_path: Path,
+        cfg: TrialflowConfig,
+        inference_result: TrialInferenceTables,
+        diagnostics: DiagnosticsAccumulator,
+        timer: StageTimer,
+    ) -> None:
+        """
+        Write the results in the configured format(s). The `timings` block
+        covers the stages recorded so far, i.e. not the write itself.
+        """
+        out_dir = results_path.parent
+        results_format = cfg.output.results_format
+        config = cfg.model_dump(mode="json")
+        # Precomputed plot data, so reports never need the records
+        plots = {
+            "yield_histogram": diagnostics.yield_histogram(cfg.output.histogram_bins)
+        }
+
+        self.results = None
+        if results_format in ("json", "both") or not self.write_results:
+            self.results = {
+                "config": config,
+                "inference": inference_result.to_dict(),
+                "diagnostics": diagnostics.result(),
+                "plots": plots,
+                "timings": timer.result(),
+            }
+        if not self.write_results:
+            return
+
+        # Drop outputs of the other format so readers never see stale results
         out_dir.mkdir(parents=True, exist_ok=True)
-        (out_dir / "results.json").write_text(
-            json.dumps(
-                {
-                    "config": cfg.model_dump(mode="json"),
-                    "inference": inference_result.model_dump(mode="json"),
-                    "diagnostics": diagnostics,
-                },
-                indent=2,
-            ),
-            encoding="utf-8",
+        stale = []
+        if results_format == "json":
+            stale.append(out_dir / MANIFEST_NAME)
+        if results_format == "parquet":
+            stale.append(results_path)
+        for path in stale:
+            path.unlink(missing_ok=True)
+
+        if results_format in ("json", "both"):
+            results_path.write_text(
+                json.dumps(self.results, indent=2), encoding="utf-8"
+            )
+        if results_format in ("parquet", "both"):
+            write_parquet_results(
+                out_dir,
+                config,
+                inference_result,
+                diagnostics.result(),
+                plots,
+                timer.result(),
+            )
+
+    def _aggregate(
+        self,
+        cfg: TrialflowConfig,
+        inference_engine: TrialInference,
+        out_dir: Path,
+        timer: StageTimer,
+        data: Optional[pd.DataFrame] = None,
+    ) -> Tuple[
+        pd.DataFrame,
+        DiagnosticsAccumulator,
+        Optional[pd.DataFrame],
+        Optional[pd.DataFrame],
+    ]:
+        """
+        Build the moment table and diagnostics for the configured dataset,
+        plus the records when they were loaded in memory and the quantile
+        sketch when the data was streamed with sketch quantiles.
+
+        Sources, in order of preference:
+        - a dataset passed in by the caller
+        - intermediate moments from a previous run on the same data
+        - the intermediate typed Parquet from a previous run
+        - the raw data file, fully loaded or chunk by chunk
+
+        Sketches are not persisted, so streamed runs with sketch quantiles
+        always re-read the data file.
+
+        Records `timer` stages: "reuse" for reading stored artifacts, "load"
+        for a full load of the data file and "aggregate" for the rest
+        (streamed chunks are read within it).
+        """
+        data_columns = self._data_columns(cfg, inference_engine)
+        diagnostics = DiagnosticsAccumulator()
+        cleaner = self._cleaner(cfg)
+        cleaning_key = self._cleaning_key(cfg)
+
+        # Cleaning needs whole fields at once, so cleaned runs load in memory
+        streaming = cfg.data.streaming and data is None and cleaner is None
+        stream_sketch = streaming and inference_engine.uses_sketch(streaming=True)
+
+        store: Optional[IntermediateStore] = None
+        if cfg.output.save_intermediate:
+            store = IntermediateStore(out_dir / "intermediate")
+            # A requested typed copy that is missing is written by a full run
+            wants_data = cfg.output.save_data and not streaming
+            reusable = (
+                data is None
+                and not stream_sketch
+                and (store.data_path.exists() or not wants_data)
+            )
+            if reusable and store.matches(
+                cfg.data.path, cfg.data.yield_dtype, cleaning_key
+            ):
+                with timer.stage("reuse") as stage:
+                    reused = self._reuse(store, inference_engine, data_columns)
+                    if reused is not None:
+                        moments, diagnostics, typed = reused
+                        stage.rows, stage.groups = diagnostics.n_records, len(moments)
+                        return moments, diagnostics, typed, None
+
+            data_columns = self._loaded_columns(cfg, data_columns)
+
+        # Only read the columns this run needs
+        loader = TrialDataLoader(columns=data_columns, yield_dtype=cfg.data.yield_dtype)
+
+        df: Optional[pd.DataFrame] = data
+        sketch: Optional[pd.DataFrame] = None
+        if not streaming and df is None:
+            with timer.stage("load") as stage:
+                df = loader.load(cfg.data.path)
+                stage.rows = len(df)
+
+        with timer.stage("aggregate") as stage:
+            if streaming:
+                sketch_acc = (
+                    inference_engine.sketch_accumulator() if stream_sketch else None
+                )
+                with closing(inference_engine.moment_accumulator()) as moments_acc:
+                    chunks = loader.iter_chunks(cfg.data.path, cfg.data.chunk_size)
+                    for chunk in chunks:
+                        moments_acc.update(chunk)
+                        diagnostics.update(chunk)
+                        if sketch_acc is not None:
+                            sketch_acc.update(chunk)
+                moments = moments_acc.result()
+                if sketch_acc is not None:
+                    sketch = sketch_acc.result()
+            else:
+                if cleaner is not None:
+                    df, report = cleaner.clean(df, inference_engine.record_columns())
+                    diagnostics.cleaning = report.model_dump(mode="json")
+                moments = inference_engine.compute_moments(df)
+                diagnostics.update(df, moments)
+
+            if store is not None:
+                store.save(
+                    cfg.data.path,
+                    cfg.data.yield_dtype,
+                    moments,
+                    diagnostics.state(),
+                    df if cfg.output.save_data else None,
+                    cleaning=cleaning_key,
+                )
+            stage.rows, stage.groups = diagnostics.n_records, len(moments)
+        return moments, diagnostics, df, sketch
+
+    @staticmethod
+    def _reuse(
+        store: IntermediateStore,
+        inference_engine: TrialInference,
+        data_columns: List[str],
+    ) -> Optional[Tuple[pd.DataFrame, DiagnosticsAccumulator, Optional[pd.DataFrame]]]:
+        """
+        Moments, diagnostics and (if read) records from matching stored
+        artifacts, or None if they do not cover this run.
+        """
+        diagnostics = DiagnosticsAccumulator.from_state(
+            store.manifest.diagnostics_state
         )
+        moments = store.load_moments(inference_engine.finest_grouping())
+        if moments is not None:
+            return moments, diagnostics, None
+
+        typed = store.load_data(data_columns)
+        if typed is None:
+            return None
+        moments = inference_engine.compute_moments(typed)
+        store.update_moments(moments)
+        return moments, diagnostics, typed
@@ -0,0 +1,109 @@
+"""
+Stage timing and profiling instrumentation for trialflow-agro.
+
+`StageTimer` records, for each named pipeline stage, the wall time, the
+process CPU time, the process peak RSS after the stage, and optional row
+and group counts. `Pipeline` writes these to the `timings` block of its
+results and `fit --profile` prints them. `profiled` wraps a call in
+cProfile and dumps pstats output.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far (None if unknown)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes elsewhere
+    scale = 1.0 if sys.platform == "darwin" else 1024.0
+    return peak * scale / (1024 * 1024)
+
+
+class StageTiming(BaseModel):
+    """Resources used by one pipeline stage."""
+
+    name: str
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    # Process-wide high-water mark after the stage, not the stage's own use
+    peak_rss_mb: Optional[float] = None
+    rows: Optional[int] = None
+    groups: Optional[int] = None
+
+
+class StageTimer:
+    """Collects StageTiming records for consecutive stages."""
+
+    def __init__(self) -> None:
+        self.stages: List[StageTiming] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageTiming]:
+        """
+        Time the enclosed block; set `rows` / `groups` on the yielded record
+        to report counts.
+        """
+        record = StageTiming(name=name)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record.wall_seconds = time.perf_counter() - wall
+            record.cpu_seconds = time.process_time() - cpu
+            record.peak_rss_mb = peak_rss_mb()
+            self.stages.append(record)
+
+    def result(self) -> dict:
+        """JSON-ready timings block."""
+        return {
+            "total_wall_seconds": sum(s.wall_seconds for s in self.stages),
+            "total_cpu_seconds": sum(s.cpu_seconds for s in self.stages),
+            "stages": [s.model_dump(mode="json") for s in self.stages],
+        }
+
+    def format(self) -> str:
+        """Fixed-width table of the stages, for terminal output."""
+        header = (
+            f"{'stage':<14}{'wall s':>10}{'cpu s':>10}{'peak MB':>10}"
+            f"{'rows':>12}{'groups':>10}"
+        )
+        lines = [header]
+        for s in self.stages:
+            rss = f"{s.peak_rss_mb:.1f}" if s.peak_rss_mb is not None else "-"
+            rows = s.rows if s.rows is not None else "-"
+            groups = s.groups if s.groups is not None else "-"
+            lines.append(
+                f"{s.name:<14}{s.wall_seconds:>10.3f}{s.cpu_seconds:>10.3f}"
+                f"{rss:>10}{rows:>12}{groups:>10}"
+            )
+        result = self.result()
+        lines.append(
+            f"{'total':<14}{result['total_wall_seconds']:>10.3f}"
+            f"{result['total_cpu_seconds']:>10.3f}"
+        )
+        return "\n".join(lines)
+
+
+def profiled(fn: Callable[[], T], pstats_path: Path) -> T:
+    """Run `fn` under cProfile and dump its stats to `pstats_path`."""
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(fn)
+    finally:
+        pstats_path.parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(str(pstats_path))
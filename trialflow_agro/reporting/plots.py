@@ -1,11 +1,18 @@
 """
 Lightweight HTML rendering helpers for trialflow-agro.
 
-No actual plotting libraries yet; instead we render simple
-HTML tables that can be embedded in reports.
+Renders simple HTML tables and inline SVG charts that can be embedded in
+reports. Charts are drawn from precomputed histogram bins or per-group
+summaries, never from records, and need no plotting library or network
+assets.
 """
 
-from typing import List, Mapping
+import math
+from typing import List, Mapping, Optional, Sequence
+
+_WIDTH = 640
+_MARGIN = {"left": 56, "right": 16, "top": 28, "bottom": 40}
+_BAR = "#4c78a8"
 
 
 def _html_escape(text: str) -> str:
@@ -38,3 +45,132 @@ def table_from_summaries(title: str, rows: List[Mapping[str, object]]) -> str:
       </tbody>
     </table>
     """
+
+
+def _tick(value: float) -> str:
+    return f"{value:.4g}"
+
+
+def _svg(title: str, height: int, body: List[str]) -> str:
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{_WIDTH}" '
+        f'height="{height}" viewBox="0 0 {_WIDTH} {height}" '
+        'font-family="sans-serif" font-size="11">'
+        f'<text x="{_WIDTH / 2}" y="16" text-anchor="middle" font-size="13">'
+        f"{_html_escape(title)}</text>" + "".join(body) + "</svg>"
+    )
+
+
+def svg_histogram(
+    title: str,
+    edges: Sequence[float],
+    counts: Sequence[int],
+    height: int = 240,
+) -> str:
+    """Bar chart of a histogram given by bin `edges` and `counts`."""
+    left, top = _MARGIN["left"], _MARGIN["top"]
+    plot_w = _WIDTH - left - _MARGIN["right"]
+    plot_h = height - top - _MARGIN["bottom"]
+    lo, hi = edges[0], edges[-1]
+    span = (hi - lo) or 1.0
+    peak = max(counts) or 1
+
+    body = []
+    for i, count in enumerate(counts):
+        x0 = left + (edges[i] - lo) / span * plot_w
+        x1 = left + (edges[i + 1] - lo) / span * plot_w
+        h = count / peak * plot_h
+        body.append(
+            f'<rect x="{x0:.1f}" y="{top + plot_h - h:.1f}" '
+            f'width="{max(x1 - x0 - 1, 0.5):.1f}" height="{h:.1f}" fill="{_BAR}">'
+            f"<title>{_tick(edges[i])}–{_tick(edges[i + 1])}: {count}</title></rect>"
+        )
+    base = top + plot_h
+    body.append(
+        f'<line x1="{left}" y1="{base}" x2="{left + plot_w}" y2="{base}" '
+        'stroke="#333"/>'
+    )
+    for frac in (0.0, 0.25, 0.5, 0.75, 1.0):
+        x = left + frac * plot_w
+        body.append(
+            f'<text x="{x:.1f}" y="{base + 14}" text-anchor="middle">'
+            f"{_tick(lo + frac * span)}</text>"
+        )
+    body.append(
+        f'<text x="{left - 6}" y="{top + 4}" text-anchor="end">{peak}</text>'
+        f'<text x="{left - 6}" y="{base}" text-anchor="end">0</text>'
+        f'<text x="{left + plot_w / 2}" y="{height - 6}" text-anchor="middle">'
+        "yield</text>"
+    )
+    return _svg(title, height, body)
+
+
+def svg_group_means(
+    title: str,
+    rows: Sequence[Mapping[str, object]],
+    label_col: str = "product",
+    max_groups: int = 30,
+) -> str:
+    """
+    Dot plot of mean_yield per group, with whiskers for the bootstrap CI
+    when present, else mean +/- one standard deviation.
+
+    Only the `max_groups` groups with the most records are drawn.
+    """
+    rows = [r for r in rows if _finite(r.get("mean_yield"))]
+    rows = sorted(rows, key=lambda r: -int(r.get("n") or 0))[:max_groups]
+    row_h = 18
+    top = _MARGIN["top"]
+    height = top + row_h * max(len(rows), 1) + _MARGIN["bottom"]
+    left = 120
+    plot_w = _WIDTH - left - _MARGIN["right"]
+
+    spans = [_whiskers(r) for r in rows]
+    lows = [lo for lo, _ in spans]
+    highs = [hi for _, hi in spans]
+    lo = min(lows, default=0.0)
+    hi = max(highs, default=1.0)
+    span = (hi - lo) or 1.0
+
+    def x(value: float) -> float:
+        return left + (value - lo) / span * plot_w
+
+    body = []
+    for i, (row, (w_lo, w_hi)) in enumerate(zip(rows, spans)):
+        y = top + row_h * i + row_h / 2
+        mean = float(row["mean_yield"])
+        label = _html_escape(str(row.get(label_col, "")))
+        body.append(
+            f'<text x="{left - 8}" y="{y + 4:.1f}" text-anchor="end">{label}</text>'
+            f'<line x1="{x(w_lo):.1f}" y1="{y:.1f}" x2="{x(w_hi):.1f}" '
+            f'y2="{y:.1f}" stroke="#888"/>'
+            f'<circle cx="{x(mean):.1f}" cy="{y:.1f}" r="4" fill="{_BAR}">'
+            f"<title>{label}: mean {_tick(mean)} (n={row.get('n')})</title>"
+            "</circle>"
+        )
+    base = top + row_h * max(len(rows), 1)
+    for frac in (0.0, 0.5, 1.0):
+        body.append(
+            f'<text x="{left + frac * plot_w:.1f}" y="{base + 14}" '
+            f'text-anchor="middle">{_tick(lo + frac * span)}</text>'
+        )
+    body.append(
+        f'<text x="{left + plot_w / 2}" y="{height - 6}" text-anchor="middle">'
+        "mean yield</text>"
+    )
+    return _svg(title, height, body)
+
+
+def _finite(value: object) -> bool:
+    return isinstance(value, (int, float)) and math.isfinite(value)
+
+
+def _whiskers(row: Mapping[str, object]) -> tuple:
+    mean = float(row["mean_yield"])
+    low, high = row.get("mean_ci_low"), row.get("mean_ci_high")
+    if _finite(low) and _finite(high):
+        return float(low), float(high)
+    std: Optional[object] = row.get("std_yield")
+    if _finite(std):
+        return mean - float(std), mean + float(std)
+    return mean, mean
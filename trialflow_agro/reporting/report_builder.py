@@ -1,21 +1,167 @@
 """
 Report generation for trialflow-agro.
+
+The report is rendered with a streaming Jinja2 template: table rows are
+formatted and written to the file one at a time. Each summary section shows
+at most `max_rows` rows inline, optionally sorted (e.g. the worst groups by
+mean yield first). With `chunks`, the remaining rows are written as JSON
+pages next to the report and loaded by the pager on demand.
+
+Charts (inline SVG) are drawn from the histogram bins and per-product
+summaries stored with the results, so their cost does not grow with the
+number of records.
 """
 
+import itertools
 import json
+import math
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional
+
+from trialflow_agro.reporting.plots import svg_group_means, svg_histogram
+from trialflow_agro.reporting.templates import REPORT_TEMPLATE
+from trialflow_agro.results import ResultsReader, quantile_column
+
+SECTIONS = [
+    ("overall", "Overall Summary"),
+    ("by_product", "Per-Product Summary"),
+    ("by_groups", "Grouped Summary"),
+    ("spatial_zones", "Spatial Zones"),
+]
+
+
+def flatten_summary(summary: Mapping[str, Any]) -> Dict[str, Any]:
+    """A results.json summary as a flat row, like the Parquet tables."""
+    row = dict(summary.get("group_values") or {})
+    for key, value in summary.items():
+        if key not in ("group_values", "quantiles"):
+            row[key] = value
+    for label, value in (summary.get("quantiles") or {}).items():
+        row[quantile_column(label)] = value
+    return row
+
+
+def format_cell(value: object) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return f"{value:.6g}"
+    return str(value)
+
+
+def _missing(value: object) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _charts(plots: Mapping[str, Any], products: List[Mapping[str, Any]]) -> List[str]:
+    """Inline SVG charts from the stored histogram and per-product rows."""
+    charts = []
+    histogram = plots.get("yield_histogram")
+    if histogram:
+        charts.append(
+            svg_histogram("Yield distribution", histogram["edges"], histogram["counts"])
+        )
+    if products:
+        bootstrap = any(row.get("mean_ci_low") is not None for row in products)
+        whiskers = "bootstrap CI" if bootstrap else "mean ± 1 sd"
+        charts.append(svg_group_means(f"Mean yield by product ({whiskers})", products))
+    return charts
+
+
+def _spatial_diagnostics(spatial: Optional[Mapping[str, Any]]) -> Dict[str, str]:
+    """Diagnostics lines for the zone assignment and Moran's I."""
+    if not spatial:
+        return {}
+    lines = {
+        "spatial_zones": (
+            f"{spatial['zones_kind']} in {spatial['crs']}: "
+            f"{spatial['n_assigned']} records assigned, "
+            f"{spatial['n_unassigned']} unassigned"
+        )
+    }
+    moran = spatial.get("moran")
+    if moran:
+        test = ""
+        if moran.get("z_score") is not None:
+            test = f", z = {moran['z_score']:.3g}, p = {moran['p_value']:.3g}"
+        lines["morans_i"] = (
+            f"{moran['statistic']:.4g} on {moran['variable']} "
+            f"({moran['n']} points, {moran['k_neighbors']} neighbours{test})"
+        )
+    return lines
+
+
+class _Section:
+    """Rows of one report table, consumed once: inline page, then chunks."""
 
-from trialflow_agro.reporting.plots import table_from_summaries
+    def __init__(
+        self,
+        key: str,
+        title: str,
+        columns: List[str],
+        total: int,
+        rows: Iterator[Mapping[str, Any]],
+        max_rows: int,
+        chunks: bool,
+        sort_by: Optional[str] = None,
+    ):
+        self.key = key
+        self.title = title
+        self.columns = columns
+        self.total = total
+        self.shown = min(total, max_rows)
+        self.pages = math.ceil(total / max_rows) if chunks else 1
+        # Column the rows are sorted by, if any
+        self.sort_by = sort_by
+        self._rows = rows
+
+    def _cells(self, limit: Optional[int] = None) -> Iterator[List[str]]:
+        for row in itertools.islice(self._rows, limit):
+            yield [format_cell(row.get(col)) for col in self.columns]
+
+    @property
+    def rows(self) -> Iterator[List[str]]:
+        return self._cells(self.shown)
+
+    def write_chunks(self, directory: Path) -> None:
+        """Write pages 2.. (the rows left after the inline page)."""
+        page_size = self.shown
+        for page in range(2, self.pages + 1):
+            path = directory / f"{self.key}-{page}.json"
+            path.write_text(
+                json.dumps({"rows": list(self._cells(page_size))}),
+                encoding="utf-8",
+            )
 
 
 class ReportBuilder:
     """
-    Assembles a simple HTML report from saved results.json.
+    Assembles an HTML report from saved results: the columnar results
+    (results_manifest.json + Parquet tables) when present, else results.json.
+
+    `max_rows` caps the rows shown per table; `sort_by` orders them by a
+    column (ascending unless `descending`, missing values last), so e.g.
+    sort_by="mean_yield" shows the lowest-yielding groups. With `chunks`,
+    the rows past the first page are written as JSON pages to
+    `<report stem>_data/` and paged in by the browser (serve the report over
+    HTTP for this, as browsers block fetching local files).
     """
 
-    def __init__(self, results_dir: Path):
+    def __init__(
+        self,
+        results_dir: Path,
+        max_rows: int = 1000,
+        sort_by: Optional[str] = None,
+        descending: bool = False,
+        chunks: bool = False,
+    ):
+        if max_rows < 1:
+            raise ValueError("max_rows must be at least 1.")
         self.results_dir = results_dir
+        self.max_rows = max_rows
+        self.sort_by = sort_by
+        self.descending = descending
+        self.chunks = chunks
 
     def _load_results(self) -> Dict[str, Any]:
         f = self.results_dir / "results.json"
@@ -23,46 +169,136 @@ class ReportBuilder:
             raise FileNotFoundError(f"No results.json found in {self.results_dir}")
         return json.loads(f.read_text())
 
-    def render(self, out_path: Path) -> None:
-        data = self._load_results()
+    def _content(self) -> tuple[Dict[str, Any], List[str], List[_Section]]:
+        """
+        Diagnostics, charts (SVG) and table sections, from Parquet or JSON
+        results.
+        """
+        reader = ResultsReader(self.results_dir)
+        if reader.exists():
+            manifest = reader.manifest
+            overall = [flatten_summary(manifest["overall"])]
+            sections = [self._section("overall", list(overall[0]), 1, iter(overall))]
+            spatial = manifest.get("spatial")
+            keys = ["by_product", "by_groups", *(["spatial_zones"] if spatial else [])]
+            for key in keys:
+                sections.append(self._parquet_section(reader, key))
+            charts = _charts(manifest.get("plots", {}), reader.rows("by_product"))
+            diagnostics = {**manifest["diagnostics"], **_spatial_diagnostics(spatial)}
+            return diagnostics, charts, self._checked(sections)
 
+        data = self._load_results()
         inference = data.get("inference", {})
-        diagnostics = data.get("diagnostics", {})
-
-        # tables: overall, by_product, by_groups
         overall = inference.get("overall")
-        by_product = inference.get("by_product", [])
-        by_groups = inference.get("by_groups", [])
+        charts = _charts(
+            data.get("plots", {}),
+            [flatten_summary(s) for s in inference.get("by_product", [])],
+        )
+        spatial = inference.get("spatial")
+        sections = []
+        for key, _ in SECTIONS:
+            if key == "overall":
+                summaries = [overall] if overall else []
+            elif key == "spatial_zones":
+                if not spatial:
+                    continue
+                summaries = spatial["zones"]
+            else:
+                summaries = inference.get(key, [])
+            rows = [flatten_summary(s) for s in summaries]
+            columns = list(rows[0]) if rows else []
+            sorted_ = self._sortable(key, columns)
+            if sorted_:
+                rows = self._sorted(rows)
+            sections.append(self._section(key, columns, len(rows), iter(rows), sorted_))
+        diagnostics = {**data.get("diagnostics", {}), **_spatial_diagnostics(spatial)}
+        return diagnostics, charts, self._checked(sections)
 
-        overall_rows = [overall] if overall else []
+    def _section(
+        self,
+        key: str,
+        columns: List[str],
+        total: int,
+        rows: Iterator,
+        sorted_: bool = False,
+    ) -> _Section:
+        title = dict(SECTIONS)[key]
+        return _Section(
+            key,
+            title,
+            columns,
+            total,
+            rows,
+            self.max_rows,
+            self.chunks,
+            self.sort_by if sorted_ else None,
+        )
 
-        html_overall = table_from_summaries("Overall Summary", overall_rows)
-        html_by_product = table_from_summaries("Per-Product Summary", by_product)
-        html_by_groups = table_from_summaries("Grouped Summary", by_groups)
+    def _sortable(self, key: str, columns: List[str]) -> bool:
+        """Grouped sections are sorted when they have the sort column."""
+        return self.sort_by is not None and key != "overall" and self.sort_by in columns
 
-        html_diag_list = "".join(
-            f"<li><strong>{k}</strong>: {v}</li>" for k, v in diagnostics.items()
-        )
+    def _checked(self, sections: List[_Section]) -> List[_Section]:
+        if self.sort_by is not None and not any(
+            self.sort_by in section.columns for section in sections[1:]
+        ):
+            raise ValueError(f"Unknown sort column: {self.sort_by}")
+        return sections
+
+    def _sorted(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Rows ordered by sort_by, missing values last."""
+        present = [r for r in rows if not _missing(r[self.sort_by])]
+        missing = [r for r in rows if _missing(r[self.sort_by])]
+        present.sort(key=lambda r: r[self.sort_by], reverse=self.descending)
+        return present + missing
+
+    def _parquet_section(self, reader: ResultsReader, key: str) -> _Section:
+        info = reader.manifest["tables"].get(key)
+        if info is None:
+            return self._section(key, [], 0, iter(()))
+        columns = info["columns"]
+        sorted_ = self._sortable(key, columns)
+        if not sorted_:
+            batches: Iterable = reader.iter_batches(key, batch_size=self.max_rows)
+        else:
+            import pyarrow as pa
+            import pyarrow.compute as pc
 
-        html = f"""<!DOCTYPE html>
-                <html>
-                <head>
-                <meta charset="utf-8">
-                <title>trialflow-agro Report</title>
-                </head>
-                <body>
-                <h1>trialflow-agro Report</h1>
-
-                <h2>Diagnostics</h2>
-                <ul>
-                    {html_diag_list}
-                </ul>
-
-                {html_overall}
-                {html_by_product}
-                {html_by_groups}
-                </body>
-                </html>
-                """
+            table = reader.table(key)
+            order = "descending" if self.descending else "ascending"
+            keys = table[self.sort_by]
+            if pa.types.is_floating(keys.type):
+                # NaN sorts like null: after every value (a typed null
+                # scalar, as converting Python None imports pandas)
+                keys = pc.if_else(pc.is_nan(keys), pa.nulls(1, keys.type)[0], keys)
+            indices = pc.array_sort_indices(keys, order=order, null_placement="at_end")
+            batches = table.take(indices).to_batches(max_chunksize=self.max_rows)
+        rows = (row for batch in batches for row in batch.to_pylist())
+        return self._section(key, columns, info["rows"], rows, sorted_)
+
+    def render(self, out_path: Path) -> None:
+        from jinja2 import Environment
+        from markupsafe import Markup
+
+        diagnostics, charts, sections = self._content()
+        chunk_dir = out_path.parent / f"{out_path.stem}_data"
+        paged = any(section.pages > 1 for section in sections)
+
+        template = Environment(autoescape=True).from_string(REPORT_TEMPLATE)
+        stream = template.stream(
+            diagnostics=diagnostics,
+            charts=[Markup(chart) for chart in charts],
+            sections=sections,
+            order="descending" if self.descending else "ascending",
+            chunk_dir=chunk_dir.name,
+            paged=paged,
+        )
+        stream.enable_buffering(64)
         out_path.parent.mkdir(parents=True, exist_ok=True)
-        out_path.write_text(html, encoding="utf-8")
+        with out_path.open("w", encoding="utf-8") as f:
+            stream.dump(f)
+
+        if paged:
+            chunk_dir.mkdir(parents=True, exist_ok=True)
+            for section in sections:
+                section.write_chunks(chunk_dir)
@@ -0,0 +1,102 @@
+"""
+Jinja2 templates for trialflow-agro reports.
+
+Templates are rendered with `Template.stream`, so table rows are written
+to the output file as they are produced rather than built in memory.
+"""
+
+REPORT_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>trialflow-agro Report</title>
+<style>
+  table { border-collapse: collapse; }
+  td, th { border: 1px solid #999; padding: 4px; }
+  .note { color: #555; }
+</style>
+</head>
+<body>
+<h1>trialflow-agro Report</h1>
+
+<h2>Diagnostics</h2>
+<ul>
+{%- for key, value in diagnostics.items() %}
+  <li><strong>{{ key }}</strong>: {{ value }}</li>
+{%- endfor %}
+</ul>
+{%- if charts %}
+
+<h2>Charts</h2>
+{%- for chart in charts %}
+<figure>{{ chart }}</figure>
+{%- endfor %}
+{%- endif %}
+{% for section in sections %}
+<h3>{{ section.title }}</h3>
+{%- if not section.total %}
+<p>No data available.</p>
+{%- else %}
+{%- if section.total > section.shown %}
+<p class="note">Showing {{ section.shown }} of {{ section.total }} rows
+{%- if section.sort_by %}, sorted by {{ section.sort_by }} ({{ order }}){% endif %}.</p>
+{%- endif %}
+<table id="{{ section.key }}"
+{%- if section.pages > 1 %} data-pages="{{ section.pages }}" data-src="{{ chunk_dir }}/{{ section.key }}"{% endif %}>
+<thead><tr>{% for col in section.columns %}<th>{{ col }}</th>{% endfor %}</tr></thead>
+<tbody>
+{%- for row in section.rows %}
+<tr>{% for value in row %}<td>{{ value }}</td>{% endfor %}</tr>
+{%- endfor %}
+</tbody>
+</table>
+{%- if section.pages > 1 %}
+<p class="pager" data-table="{{ section.key }}">
+  <button data-step="-1">Previous</button>
+  <span>Page 1 of {{ section.pages }}</span>
+  <button data-step="1">Next</button>
+</p>
+{%- endif %}
+{%- endif %}
+{% endfor %}
+{%- if paged %}
+<script>
+// Pages after the first are loaded on demand from JSON chunks
+// ({"rows": [[cell, ...], ...]}, cells already formatted).
+document.querySelectorAll(".pager").forEach(function (pager) {
+  var table = document.getElementById(pager.dataset.table);
+  var body = table.querySelector("tbody");
+  var label = pager.querySelector("span");
+  var pages = Number(table.dataset.pages);
+  var first = body.innerHTML;
+  var page = 1;
+  function escape(text) {
+    var div = document.createElement("div");
+    div.textContent = text;
+    return div.innerHTML;
+  }
+  function show(rows) {
+    body.innerHTML = rows.map(function (row) {
+      return "<tr>" + row.map(function (cell) {
+        return "<td>" + escape(cell) + "</td>";
+      }).join("") + "</tr>";
+    }).join("");
+  }
+  pager.querySelectorAll("button").forEach(function (button) {
+    button.addEventListener("click", function () {
+      var next = page + Number(button.dataset.step);
+      if (next < 1 || next > pages) return;
+      page = next;
+      label.textContent = "Page " + page + " of " + pages;
+      if (page === 1) { body.innerHTML = first; return; }
+      fetch(table.dataset.src + "-" + page + ".json")
+        .then(function (response) { return response.json(); })
+        .then(function (chunk) { show(chunk.rows); });
+    });
+  });
+});
+</script>
+{%- endif %}
+</body>
+</html>
+"""
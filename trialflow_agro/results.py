@@ -0,0 +1,168 @@
+"""
+Columnar results format for trialflow-agro.
+
+Alongside (or instead of) results.json, a run can write:
+- results_manifest.json: config, diagnostics, plot data, stage timings,
+  the overall summary, the hierarchical fit, spatial diagnostics and a
+  description of every table
+- tables/<name>.parquet: one row per group for by_product, by_groups,
+  spatial_zones and comparisons
+
+Summary tables are flat (see `SummaryTable.arrow_columns`): the group
+columns, the summary statistics and, when enabled, one "yield_q<level>"
+column per quantile.
+
+`ResultsReader` only needs pyarrow (and does not import pandas): tables
+are opened lazily, and can be read with column projection or in record
+batches.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+MANIFEST_NAME = "results_manifest.json"
+TABLES_DIR = "tables"
+FORMAT_VERSION = 1
+
+# Flat statistic columns of a summary table, in output order
+SUMMARY_COLUMNS = [
+    "n",
+    "mean_yield",
+    "std_yield",
+    "min_yield",
+    "max_yield",
+    "mean_ci_low",
+    "mean_ci_high",
+]
+
+
+def quantile_column(label: str) -> str:
+    """Flat column of a quantile level label (e.g. "0.5" -> "yield_q0.5")."""
+    return f"yield_q{label}"
+
+
+def write_parquet_results(
+    out_dir: Path,
+    config: Dict[str, Any],
+    inference: Any,
+    diagnostics: Dict[str, object],
+    plots: Optional[Dict[str, object]] = None,
+    timings: Optional[Dict[str, object]] = None,
+) -> Path:
+    """Write the manifest and Parquet tables for a TrialInferenceTables."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    tables = {"by_product": inference.by_product.arrow_columns()}
+    if inference.by_groups is not None:
+        tables["by_groups"] = inference.by_groups.arrow_columns()
+    if inference.spatial is not None:
+        tables["spatial_zones"] = inference.spatial.zones.arrow_columns()
+    if inference.comparisons:
+        tables["comparisons"] = {
+            field: [getattr(c, field) for c in inference.comparisons]
+            for field in type(inference.comparisons[0]).model_fields
+        }
+
+    tables_dir = out_dir / TABLES_DIR
+    tables_dir.mkdir(parents=True, exist_ok=True)
+    described: Dict[str, Dict[str, Any]] = {}
+    for name, columns in tables.items():
+        path = tables_dir / f"{name}.parquet"
+        table = pa.Table.from_pydict(columns)
+        pq.write_table(table, path)
+        described[name] = {
+            "path": f"{TABLES_DIR}/{name}.parquet",
+            "rows": table.num_rows,
+            "columns": table.column_names,
+        }
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "config": config,
+        "diagnostics": diagnostics,
+        "plots": plots or {},
+        "timings": timings,
+        "overall": inference.overall.records()[0],
+        "hierarchical": (
+            inference.hierarchical.model_dump(mode="json")
+            if inference.hierarchical is not None
+            else None
+        ),
+        "spatial": (
+            inference.spatial.info() if inference.spatial is not None else None
+        ),
+        "tables": described,
+    }
+    manifest_path = out_dir / MANIFEST_NAME
+    manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return manifest_path
+
+
+class ResultsReader:
+    """Lazy reader for the columnar results of a run."""
+
+    def __init__(self, results_dir: Path) -> None:
+        self.results_dir = results_dir
+        self._manifest: Optional[Dict[str, Any]] = None
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.results_dir / MANIFEST_NAME
+
+    def exists(self) -> bool:
+        return self.manifest_path.exists()
+
+    @property
+    def manifest(self) -> Dict[str, Any]:
+        if self._manifest is None:
+            if not self.exists():
+                raise FileNotFoundError(
+                    f"No {MANIFEST_NAME} found in {self.results_dir}"
+                )
+            self._manifest = json.loads(self.manifest_path.read_text())
+        return self._manifest
+
+    def table_names(self) -> List[str]:
+        return list(self.manifest["tables"])
+
+    def table(self, name: str, columns: Optional[Sequence[str]] = None):
+        """Read a table as a pyarrow.Table, optionally projecting `columns`."""
+        import pyarrow.parquet as pq
+
+        # ParquetFile rather than read_table, whose dataset layer imports
+        # pandas
+        return pq.ParquetFile(self._path(name)).read(
+            columns=list(columns) if columns else None
+        )
+
+    def iter_batches(
+        self,
+        name: str,
+        batch_size: int = 65_536,
+        columns: Optional[Sequence[str]] = None,
+    ) -> Iterator[Any]:
+        """Stream a table as pyarrow RecordBatches."""
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(self._path(name))
+        yield from parquet_file.iter_batches(
+            batch_size=batch_size, columns=list(columns) if columns else None
+        )
+
+    def rows(
+        self, name: str, columns: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """A table as a list of row dicts (empty if the run has no such table)."""
+        if name not in self.manifest["tables"]:
+            return []
+        return self.table(name, columns).to_pylist()
+
+    def _path(self, name: str) -> Path:
+        tables = self.manifest["tables"]
+        if name not in tables:
+            raise KeyError(f"Unknown results table: {name}")
+        return self.results_dir / tables[name]["path"]
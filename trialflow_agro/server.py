@@ -0,0 +1,359 @@
+"""
+Long-running fit server for trialflow-agro.
+
+`FitServer` is a small asyncio HTTP/1.1 server, listening on TCP or on a
+Unix socket, that runs fits from JSON config payloads. Parsed, typed
+datasets are kept in an LRU `DatasetCache` keyed by path and modification
+time, so repeated re-analyses of the same trial data (e.g. with different
+`model.groups`) skip interpreter startup, imports and parsing. Fits run on
+a thread pool, which shares the cache with the event loop.
+
+Endpoints:
+
+- `GET /health`: server status and dataset cache statistics
+- `POST /fit`: body `{"config": {...}, "write": false}`; responds with
+  the results document (as in `results.json`). With `"write": true` the
+  results are also written to `output.directory`.
+
+`FitClient` and `UnixFitClient` are minimal blocking clients.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import http.client
+import json
+import socket
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+from pydantic import ValidationError
+
+from trialflow_agro.config.schema import TrialflowConfig
+from trialflow_agro.data.loaders import TrialDataLoader
+from trialflow_agro.pipeline import Pipeline
+
+# (resolved path, mtime in ns, size in bytes, yield dtype)
+_DatasetKey = Tuple[str, int, int, str]
+
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+class HTTPError(Exception):
+    """Request error reported to the client with `status`."""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class DatasetCache:
+    """
+    Thread-safe LRU cache of loaded, validated datasets.
+
+    Entries are keyed by resolved path, modification time and size (plus the
+    yield dtype), so an edited file is reloaded rather than served stale.
+    Every column of the file is loaded, so any grouping can be served from
+    one entry. Concurrent requests for the same dataset load it once.
+    """
+
+    def __init__(self, max_entries: int = 4) -> None:
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[_DatasetKey, pd.DataFrame]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks: Dict[_DatasetKey, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(path: Path, yield_dtype: str) -> _DatasetKey:
+        resolved = path.resolve()
+        stat = resolved.stat()
+        return (str(resolved), stat.st_mtime_ns, stat.st_size, yield_dtype)
+
+    def get(self, path: Path, yield_dtype: str) -> Tuple[pd.DataFrame, bool]:
+        """Return (dataset, whether it was cached), loading it on a miss."""
+        key = self.key(path, yield_dtype)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._entries[key], True
+            data = TrialDataLoader(yield_dtype=yield_dtype).load(Path(key[0]))
+            with self._lock:
+                self.misses += 1
+                self._entries[key] = data
+                # Older versions of a changed file are never requested again
+                for stale in [k for k in self._entries if k[0] == key[0] and k != key]:
+                    del self._entries[stale]
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                self._key_locks.pop(key, None)
+            return data, False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "datasets": [k[0] for k in self._entries],
+            }
+
+
+class FitServer:
+    """
+    Asyncio fit server.
+
+    - Listens on `host`:`port` (port 0 picks a free port) or, when
+      `socket_path` is set, on a Unix socket
+    - Runs fits on a pool of `workers` threads
+    - Caches up to `cache_entries` datasets in memory
+
+    Served fits never use the result cache or save intermediates: the warm
+    dataset cache replaces both. Streaming configs read their data in
+    chunks and bypass the dataset cache.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        socket_path: Optional[Path] = None,
+        workers: int = 2,
+        cache_entries: int = 4,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.socket_path = socket_path
+        self.workers = max(1, workers)
+        self.cache = DatasetCache(cache_entries)
+        # "host:port" or the socket path, once listening
+        self.address: Optional[str] = None
+        self.ready = threading.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopped: Optional[asyncio.Event] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def run(self) -> None:
+        """Serve until stop() is called (blocking)."""
+        asyncio.run(self.serve())
+
+    def stop(self) -> None:
+        """Stop serving; safe to call from any thread."""
+        if self._loop is not None and self._stopped is not None:
+            self._loop.call_soon_threadsafe(self._stopped.set)
+
+    async def serve(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        executor = self._executor = ThreadPoolExecutor(max_workers=self.workers)
+
+        if self.socket_path is not None:
+            self.socket_path.unlink(missing_ok=True)
+            server = await asyncio.start_unix_server(
+                self._handle, path=str(self.socket_path)
+            )
+            self.address = str(self.socket_path)
+        else:
+            server = await asyncio.start_server(self._handle, self.host, self.port)
+            host, port = server.sockets[0].getsockname()[:2]
+            self.address = f"{host}:{port}"
+            self.port = port
+
+        self.ready.set()
+        try:
+            async with server:
+                await self._stopped.wait()
+        finally:
+            executor.shutdown(wait=True)
+            if self.socket_path is not None:
+                self.socket_path.unlink(missing_ok=True)
+            self.ready.clear()
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            try:
+                method, path, body = await _read_request(reader)
+                status, payload = 200, await self._dispatch(method, path, body)
+            except HTTPError as exc:
+                status, payload = exc.status, {"error": str(exc)}
+            except (ValueError, ValidationError, KeyError) as exc:
+                status, payload = 400, {"error": f"{type(exc).__name__}: {exc}"}
+            except FileNotFoundError as exc:
+                status, payload = 404, {"error": f"{type(exc).__name__}: {exc}"}
+            except Exception as exc:  # noqa: BLE001
+                # Any other failure of a request is answered with a 500, so
+                # one bad fit never takes the server down
+                status, payload = 500, {"error": f"{type(exc).__name__}: {exc}"}
+            _write_response(writer, status, payload)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method: str, path: str, body: bytes) -> dict:
+        route = path.split("?", 1)[0]
+        if route == "/health":
+            if method != "GET":
+                raise HTTPError(405, f"{method} not allowed on {route}")
+            return {"status": "ok", "cache": self.cache.stats()}
+        if route == "/fit":
+            if method != "POST":
+                raise HTTPError(405, f"{method} not allowed on {route}")
+            request = json.loads(body or b"{}")
+            if not isinstance(request, dict) or "config" not in request:
+                raise HTTPError(400, 'Expected a JSON object with a "config" key.')
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor,
+                self.fit,
+                request["config"],
+                bool(request.get("write", False)),
+            )
+        raise HTTPError(404, f"Unknown path: {route}")
+
+    def fit(self, config: dict, write: bool = False) -> dict:
+        """Run one fit from a config mapping; returns the response body."""
+        start = time.perf_counter()
+        cfg = TrialflowConfig(**config)
+        cfg.output.save_intermediate = False
+
+        data: Optional[pd.DataFrame] = None
+        cache_status: Optional[str] = None
+        if not cfg.data.streaming:
+            data, hit = self.cache.get(cfg.data.path, cfg.data.yield_dtype)
+            cache_status = "hit" if hit else "miss"
+
+        pipeline = Pipeline(config=cfg, use_cache=False, write_results=write)
+        pipeline.run(data=data)
+        results = pipeline.results
+        if results is None:
+            # Written in a non-JSON results format only
+            results = {"output_dir": str(pipeline.output_dir)}
+        return {
+            "status": "ok",
+            "dataset_cache": cache_status,
+            "seconds": time.perf_counter() - start,
+            "results": results,
+        }
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Tuple[str, str, bytes]:
+    """Parse one HTTP/1.1 request: (method, path, body)."""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as exc:
+        raise HTTPError(400, "Incomplete request.") from exc
+    except asyncio.LimitOverrunError as exc:
+        raise HTTPError(413, "Request headers too large.") from exc
+
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, path, _ = lines[0].split(" ", 2)
+    except ValueError as exc:
+        raise HTTPError(400, f"Malformed request line: {lines[0]!r}") from exc
+
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", 0) or 0)
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, f"Request body over {MAX_BODY_BYTES} bytes.")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), path, body
+
+
+def _write_response(writer: asyncio.StreamWriter, status: int, payload: dict) -> None:
+    body = json.dumps(payload).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Connection: close\r\n\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+
+
+class FitClient:
+    """Blocking client for a FitServer listening on TCP."""
+
+    def __init__(
+        self, host: str = "127.0.0.1", port: int = 8765, timeout: float = 60.0
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+
+    def _connection(self) -> http.client.HTTPConnection:
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def request(self, method: str, path: str, payload: Optional[dict] = None):
+        """Send a request; returns (status, decoded JSON body)."""
+        conn = self._connection()
+        try:
+            body = json.dumps(payload) if payload is not None else None
+            headers = {"Content-Type": "application/json"} if body else {}
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            return response.status, json.loads(response.read() or b"{}")
+        finally:
+            conn.close()
+
+    def health(self) -> dict:
+        return self._checked(*self.request("GET", "/health"))
+
+    def fit(self, config: dict, write: bool = False) -> dict:
+        """Run a fit; raises RuntimeError with the server's message on error."""
+        payload = {"config": config, "write": write}
+        return self._checked(*self.request("POST", "/fit", payload))
+
+    @staticmethod
+    def _checked(status: int, body: dict) -> dict:
+        if status != 200:
+            raise RuntimeError(f"Server error {status}: {body.get('error')}")
+        return body
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str, timeout: float) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class UnixFitClient(FitClient):
+    """Blocking client for a FitServer listening on a Unix socket."""
+
+    def __init__(self, socket_path: Path, timeout: float = 60.0) -> None:
+        super().__init__(timeout=timeout)
+        self.socket_path = socket_path
+
+    def _connection(self) -> http.client.HTTPConnection:
+        return _UnixHTTPConnection(str(self.socket_path), self.timeout)